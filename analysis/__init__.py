@@ -0,0 +1,18 @@
+"""分析模块"""
+
+from analysis.citation_graph import CitationGraph
+from analysis.search_index import SearchIndex, tokenize
+from analysis.dedup import Deduplicator, DedupDecision, LshIndex, MinHasher
+from analysis.similarity import TfidfIndex, RelatedPapers
+
+__all__ = [
+    "CitationGraph",
+    "SearchIndex",
+    "tokenize",
+    "Deduplicator",
+    "DedupDecision",
+    "LshIndex",
+    "MinHasher",
+    "TfidfIndex",
+    "RelatedPapers"
+]
@@ -0,0 +1,381 @@
+"""
+引用图
+
+根据PaperContent中的结构化参考文献构建论文引用图，提供PageRank、
+被引次数和共被引查询。
+"""
+
+import json
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config.settings import Config
+from models.paper import PaperContent, Reference
+from utils.text_utils import strip_arxiv_version
+
+
+def _reference_ids(content: Union[PaperContent, Dict[str, Any], Iterable]) -> List[str]:
+    """从PaperContent、其字典形式或引用列表中取出被引论文的ArXiv ID"""
+    if isinstance(content, PaperContent):
+        references = content.references
+    elif isinstance(content, dict):
+        references = content.get("references") or []
+    else:
+        references = content
+    
+    ids = []
+    for reference in references:
+        if isinstance(reference, Reference):
+            arxiv_id = reference.arxiv_id
+        elif isinstance(reference, dict):
+            arxiv_id = reference.get("arxiv_id")
+        else:
+            arxiv_id = reference
+        if arxiv_id:
+            ids.append(arxiv_id)
+    return ids
+
+
+class CitationGraph:
+    """
+    基于CSR邻接数组的引用图
+    
+    行为施引论文，列为被引论文。邻接关系只保存为两个numpy数组
+    （indptr: int64, indices: int32），每条边约4字节，百万级节点也能放入内存。
+    新增的论文先写入紧凑的边缓冲区，查询前统一合并进CSR，因此可以增量添加。
+    被引用但尚未抓取的论文同样是节点，harvested标记区分两者。
+    """
+    
+    def __init__(self):
+        """创建空引用图"""
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._harvested = bytearray()
+        
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        
+        # 尚未合并的边和需要替换出边的节点
+        self._pending_src = array("i")
+        self._pending_dst = array("i")
+        # 节点 -> 替换发生时缓冲区的长度，之前的边（包括CSR中的）都作废
+        self._replaced: Dict[int, int] = {}
+        
+        # 合并后按需计算的缓存
+        self._sources = None
+        self._transpose = None
+    
+    @staticmethod
+    def normalize_id(arxiv_id: str) -> str:
+        """去掉版本号，使同一论文的不同版本对应同一节点"""
+        return strip_arxiv_version(arxiv_id.strip())
+    
+    def node(self, arxiv_id: str) -> int:
+        """获取ArXiv ID对应的节点编号，不存在时创建"""
+        arxiv_id = self.normalize_id(arxiv_id)
+        index = self._index.get(arxiv_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[arxiv_id] = index
+            self._ids.append(arxiv_id)
+            self._harvested.append(0)
+        return index
+    
+    def add_paper(self, arxiv_id: str, content: Union[PaperContent, Dict[str, Any], Iterable]):
+        """
+        添加或更新一篇论文的引用
+        
+        同一论文再次添加（如新版本）时替换其原有的出边。
+        
+        Args:
+            arxiv_id: 施引论文的ArXiv ID
+            content: PaperContent、PaperContent.to_dict() 的结果，或被引ID/Reference列表
+        """
+        source = self.node(arxiv_id)
+        if self._harvested[source]:
+            self._replaced[source] = len(self._pending_src)
+        self._harvested[source] = 1
+        
+        for cited_id in _reference_ids(content):
+            target = self.node(cited_id)
+            if target != source:
+                self._pending_src.append(source)
+                self._pending_dst.append(target)
+    
+    def add_many(self, papers: Iterable[Tuple[str, Union[PaperContent, Dict[str, Any], Iterable]]]) -> int:
+        """
+        批量添加论文
+        
+        Args:
+            papers: (ArXiv ID, 内容) 的可迭代对象
+            
+        Returns:
+            添加的论文数
+        """
+        count = 0
+        for arxiv_id, content in papers:
+            self.add_paper(arxiv_id, content)
+            count += 1
+        return count
+    
+    @property
+    def num_nodes(self) -> int:
+        """节点数"""
+        return len(self._ids)
+    
+    @property
+    def num_edges(self) -> int:
+        """去重后的边数"""
+        self._compact()
+        return len(self._indices)
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return self.normalize_id(arxiv_id) in self._index
+    
+    def arxiv_id(self, node: int) -> str:
+        """节点编号对应的ArXiv ID"""
+        return self._ids[node]
+    
+    def is_harvested(self, arxiv_id: str) -> bool:
+        """论文本身是否已被抓取（而不只是被引用）"""
+        index = self._index.get(self.normalize_id(arxiv_id))
+        return index is not None and bool(self._harvested[index])
+    
+    def references(self, arxiv_id: str) -> List[str]:
+        """论文引用的ArXiv ID列表"""
+        index = self._lookup(arxiv_id)
+        if index is None:
+            return []
+        self._compact()
+        return [self._ids[i] for i in self._indices[self._indptr[index]:self._indptr[index + 1]]]
+    
+    def cited_by(self, arxiv_id: str) -> List[str]:
+        """引用该论文的ArXiv ID列表"""
+        index = self._lookup(arxiv_id)
+        if index is None:
+            return []
+        t_indptr, t_indices = self._get_transpose()
+        return [self._ids[i] for i in t_indices[t_indptr[index]:t_indptr[index + 1]]]
+    
+    def in_degree(self) -> np.ndarray:
+        """所有节点的被引次数"""
+        self._compact()
+        return np.bincount(self._indices, minlength=self.num_nodes)
+    
+    def out_degree(self) -> np.ndarray:
+        """所有节点的引用数"""
+        self._compact()
+        return np.diff(self._indptr)
+    
+    def pagerank(self,
+                 damping: float = Config.PAGERANK_DAMPING,
+                 tol: float = Config.PAGERANK_TOLERANCE,
+                 max_iter: int = Config.PAGERANK_MAX_ITER) -> np.ndarray:
+        """
+        幂迭代计算PageRank
+        
+        每轮迭代只有一次按边的gather和一次bincount scatter，全部向量化。
+        没有出边的节点把分值均匀分给所有节点。
+        
+        Args:
+            damping: 阻尼系数
+            tol: 收敛阈值（L1范数）
+            max_iter: 最大迭代次数
+            
+        Returns:
+            按节点编号排列的PageRank数组，总和为1
+        """
+        self._compact()
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0)
+        
+        sources = self._get_sources()
+        out_degree = np.diff(self._indptr).astype(np.float64)
+        dangling = out_degree == 0
+        inv_out_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = rank * inv_out_degree
+            new_rank = np.bincount(self._indices, weights=share[sources], minlength=n)
+            new_rank *= damping
+            new_rank += (1.0 - damping + damping * rank[dangling].sum()) / n
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if delta < tol:
+                break
+        return rank
+    
+    def top(self, scores: np.ndarray, k: int = 10, harvested_only: bool = False) -> List[Tuple[str, float]]:
+        """
+        取分值最高的k个节点
+        
+        Args:
+            scores: 按节点编号排列的分值，如 pagerank() 或 in_degree() 的结果
+            k: 返回数量
+            harvested_only: 是否只返回已抓取的论文
+            
+        Returns:
+            (ArXiv ID, 分值) 列表，按分值降序
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        if harvested_only:
+            mask = np.frombuffer(bytes(self._harvested), dtype=np.uint8).astype(bool)
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in ordered if np.isfinite(scores[i])]
+    
+    def co_cited(self, arxiv_id: str, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        与该论文共被引次数最多的论文
+        
+        共被引次数为同时引用两篇论文的论文数。
+        
+        Args:
+            arxiv_id: ArXiv ID
+            k: 返回数量
+            
+        Returns:
+            (ArXiv ID, 共被引次数) 列表，按次数降序
+        """
+        index = self._lookup(arxiv_id)
+        if index is None:
+            return []
+        t_indptr, t_indices = self._get_transpose()
+        citers = t_indices[t_indptr[index]:t_indptr[index + 1]]
+        if len(citers) == 0:
+            return []
+        
+        counts = np.bincount(self._gather_rows(citers), minlength=self.num_nodes)
+        counts[index] = 0
+        k = min(k, int(np.count_nonzero(counts)))
+        if k == 0:
+            return []
+        candidates = np.argpartition(-counts, k - 1)[:k]
+        ordered = candidates[np.argsort(-counts[candidates], kind="stable")]
+        return [(self._ids[i], int(counts[i])) for i in ordered]
+    
+    def co_citation_count(self, first_id: str, second_id: str) -> int:
+        """两篇论文的共被引次数"""
+        first = self._lookup(first_id)
+        second = self._lookup(second_id)
+        if first is None or second is None:
+            return 0
+        t_indptr, t_indices = self._get_transpose()
+        return len(np.intersect1d(t_indices[t_indptr[first]:t_indptr[first + 1]],
+                                  t_indices[t_indptr[second]:t_indptr[second + 1]],
+                                  assume_unique=True))
+    
+    def save(self, directory: str):
+        """
+        把引用图保存到目录，数组以 .npy 格式保存，可用mmap加载
+        
+        Args:
+            directory: 输出目录
+        """
+        self._compact()
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "indptr.npy"), self._indptr)
+        np.save(os.path.join(directory, "indices.npy"), self._indices)
+        np.save(os.path.join(directory, "harvested.npy"), np.frombuffer(bytes(self._harvested), dtype=np.uint8))
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self._ids, f)
+    
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CitationGraph":
+        """
+        从目录加载引用图
+        
+        Args:
+            directory: save() 写出的目录
+            mmap: 是否以只读mmap方式加载边数组，之后新增论文时会在内存中生成新数组
+        """
+        graph = cls()
+        mmap_mode = "r" if mmap else None
+        graph._indptr = np.load(os.path.join(directory, "indptr.npy"), mmap_mode=mmap_mode)
+        graph._indices = np.load(os.path.join(directory, "indices.npy"), mmap_mode=mmap_mode)
+        graph._harvested = bytearray(np.load(os.path.join(directory, "harvested.npy")).tobytes())
+        with open(os.path.join(directory, "ids.json"), "r", encoding="utf-8") as f:
+            graph._ids = json.load(f)
+        graph._index = {arxiv_id: i for i, arxiv_id in enumerate(graph._ids)}
+        return graph
+    
+    def _lookup(self, arxiv_id: str) -> Optional[int]:
+        """查找节点编号，不存在时返回None"""
+        return self._index.get(self.normalize_id(arxiv_id))
+    
+    def _compact(self):
+        """把缓冲区中的边合并进CSR数组，同时去重并去掉被替换节点的旧出边"""
+        n = self.num_nodes
+        base_rows = len(self._indptr) - 1
+        if not self._pending_src and not self._replaced and base_rows == n:
+            return
+        
+        sources = np.repeat(np.arange(base_rows, dtype=np.int64), np.diff(self._indptr))
+        targets = np.asarray(self._indices, dtype=np.int64)
+        pending_sources = np.frombuffer(self._pending_src, dtype=np.int32).astype(np.int64)
+        pending_targets = np.frombuffer(self._pending_dst, dtype=np.int32).astype(np.int64)
+        
+        if self._replaced:
+            replaced = np.fromiter(self._replaced.keys(), dtype=np.int64, count=len(self._replaced))
+            keep = ~np.isin(sources, replaced)
+            sources, targets = sources[keep], targets[keep]
+            
+            # 缓冲区中替换点之前的边同样作废
+            cut = np.zeros(n, dtype=np.int64)
+            cut[replaced] = np.fromiter(self._replaced.values(), dtype=np.int64, count=len(self._replaced))
+            keep = np.arange(len(pending_sources)) >= cut[pending_sources]
+            pending_sources, pending_targets = pending_sources[keep], pending_targets[keep]
+        
+        sources = np.concatenate([sources, pending_sources])
+        targets = np.concatenate([targets, pending_targets])
+        
+        # 按 (行, 列) 排序去重
+        edges = np.unique((sources << 32) | targets)
+        sources = edges >> 32
+        self._indices = (edges & 0xFFFFFFFF).astype(np.int32)
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=self._indptr[1:])
+        
+        self._pending_src = array("i")
+        self._pending_dst = array("i")
+        self._replaced = {}
+        self._sources = None
+        self._transpose = None
+    
+    def _get_sources(self) -> np.ndarray:
+        """每条边的行号，PageRank迭代时复用"""
+        self._compact()
+        if self._sources is None:
+            self._sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self._indptr))
+        return self._sources
+    
+    def _get_transpose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """转置的CSR（按被引论文分组的施引论文）"""
+        self._compact()
+        if self._transpose is None:
+            order = np.argsort(self._indices, kind="stable")
+            t_indices = self._get_sources()[order]
+            t_indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self._indices, minlength=self.num_nodes), out=t_indptr[1:])
+            self._transpose = (t_indptr, t_indices)
+        return self._transpose
+    
+    def _gather_rows(self, rows: np.ndarray) -> np.ndarray:
+        """向量化地拼接多行的列索引"""
+        starts = self._indptr[rows]
+        lengths = self._indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int32)
+        # 每个元素的位置 = 所在行的起点 + 行内偏移
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self._indices[offsets + np.arange(total)]
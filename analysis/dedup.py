@@ -0,0 +1,318 @@
+"""
+去重
+
+识别同一论文的多个版本和内容几乎相同的论文，使富化和存储只处理一次。
+近似重复检测使用MinHash签名和LSH分桶，查询耗时与已见论文数量基本无关。
+"""
+
+import logging
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import Config
+from models.paper import Paper
+from utils.text_utils import split_arxiv_version
+
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# 梅森素数 2^31-1，保证 a*x+b 在uint64范围内不溢出
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def dedup_text(paper: Paper) -> str:
+    """
+    用于相似度比较的文本：标题、摘要和作者
+    
+    列表页没有摘要，此时标题和作者共同决定签名。
+    """
+    return " ".join([paper.title or "", paper.abstract or "", " ".join(paper.authors or [])])
+
+
+class MinHasher:
+    """
+    MinHash签名生成器
+    
+    文本切分为词级shingle，每个shingle先哈希为整数，再用num_perm个
+    通用哈希函数 (a*x+b) mod p 取最小值。一批文本的全部shingle组成一个矩阵
+    统一计算，再按文档分段取最小值，整个过程向量化。
+    """
+    
+    def __init__(self,
+                 num_perm: int = Config.DEDUP_NUM_PERM,
+                 shingle_size: int = Config.DEDUP_SHINGLE_SIZE,
+                 seed: int = 1):
+        """
+        初始化哈希函数
+        
+        Args:
+            num_perm: 签名长度（哈希函数个数）
+            shingle_size: 每个shingle包含的词数
+            seed: 随机种子，相同种子生成的签名可以互相比较
+        """
+        self.num_perm = num_perm
+        self.shingle_size = max(1, shingle_size)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+    
+    def shingles(self, text: str) -> np.ndarray:
+        """
+        文本的shingle哈希数组
+        
+        词哈希用crc32计算，连续shingle_size个词的哈希再组合为一个值；
+        不足shingle_size个词时整段文本作为一个shingle。
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        
+        hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words),
+                             dtype=np.uint64, count=len(words))
+        size = min(self.shingle_size, len(hashes))
+        combined = hashes[:len(hashes) - size + 1].copy()
+        for offset in range(1, size):
+            # uint64乘法按2^64取模，相当于多项式滚动哈希
+            combined = combined * np.uint64(0x9E3779B1) + hashes[offset:len(hashes) - size + 1 + offset]
+        return np.unique(combined % np.uint64(MERSENNE_PRIME))
+    
+    def signature(self, text: str) -> np.ndarray:
+        """单个文本的MinHash签名"""
+        return self.signatures([text])[0]
+    
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        批量计算MinHash签名
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            形状为 (len(texts), num_perm) 的uint32数组；没有词的文本签名全为最大值
+        """
+        result = np.full((len(texts), self.num_perm), MERSENNE_PRIME, dtype=np.uint32)
+        shingles = [self.shingles(text) for text in texts]
+        lengths = np.array([len(item) for item in shingles], dtype=np.int64)
+        non_empty = np.flatnonzero(lengths)
+        if not len(non_empty):
+            return result
+        
+        values = np.concatenate([shingles[i] for i in non_empty])
+        hashed = (self._a * values[np.newaxis, :] + self._b) % np.uint64(MERSENNE_PRIME)
+        starts = np.cumsum(np.r_[0, lengths[non_empty][:-1]])
+        result[non_empty] = np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+        return result
+    
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """由两个签名估计Jaccard相似度"""
+        return float(np.mean(first == second))
+
+
+class LshIndex:
+    """
+    MinHash签名的LSH分桶索引
+    
+    签名切为bands段，任意一段完全相同即成为候选，再用完整签名核对相似度。
+    签名按行保存在按需扩容的数组中，每篇论文只占 num_perm*4 字节。
+    """
+    
+    def __init__(self,
+                 num_perm: int = Config.DEDUP_NUM_PERM,
+                 bands: int = Config.DEDUP_BANDS,
+                 threshold: float = Config.DEDUP_THRESHOLD):
+        """
+        初始化索引
+        
+        Args:
+            num_perm: 签名长度，必须能被bands整除
+            bands: 分段数，段数越多召回越高、候选越多
+            threshold: 判定为近似重复的相似度阈值
+        """
+        if num_perm % bands:
+            raise ValueError(f"签名长度 {num_perm} 不能被分段数 {bands} 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.keys: List[str] = []
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def add(self, key: str, signature: np.ndarray) -> int:
+        """
+        添加签名
+        
+        Returns:
+            签名在索引中的序号
+        """
+        index = len(self.keys)
+        if index >= len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+        self._signatures[index] = signature
+        self.keys.append(key)
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(bucket_key, []).append(index)
+        return index
+    
+    def query(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        查找最相似的已有签名
+        
+        Returns:
+            (键, 估计相似度)，没有达到阈值的候选时返回None
+        """
+        candidates = set()
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(bucket_key, ()))
+        if not candidates:
+            return None
+        
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = np.mean(self._signatures[candidates] == signature, axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return self.keys[candidates[best]], float(similarities[best])
+    
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        """每个分段的桶键"""
+        bands = np.ascontiguousarray(signature, dtype=np.uint32).reshape(self.bands, self.rows)
+        return [hash(band.tobytes()) for band in bands]
+
+
+@dataclass
+class DedupDecision:
+    """单篇论文的去重结论"""
+    
+    arxiv_id: str
+    status: str  # new / new_version / old_version / near_duplicate
+    duplicate_of: str = ""
+    similarity: float = 0.0
+    
+    @property
+    def should_enrich(self) -> bool:
+        """是否需要富化和存储"""
+        return self.status in ("new", "new_version")
+
+
+class Deduplicator:
+    """
+    论文流去重器
+    
+    同一ArXiv ID只保留最高版本：已见过相同或更高版本时丢弃，出现更高版本时
+    放行以替换旧数据。首次出现的ID再用MinHash/LSH检查是否与已见论文近似重复。
+    """
+    
+    def __init__(self,
+                 num_perm: int = Config.DEDUP_NUM_PERM,
+                 bands: int = Config.DEDUP_BANDS,
+                 threshold: float = Config.DEDUP_THRESHOLD,
+                 shingle_size: int = Config.DEDUP_SHINGLE_SIZE):
+        """
+        初始化去重器
+        
+        Args:
+            num_perm: MinHash签名长度
+            bands: LSH分段数
+            threshold: 近似重复的相似度阈值
+            shingle_size: 每个shingle包含的词数
+        """
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.index = LshIndex(num_perm, bands, threshold)
+        self.logger = logging.getLogger(__name__)
+        self._versions: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {"new": 0, "new_version": 0, "old_version": 0, "near_duplicate": 0}
+    
+    def check(self, paper: Paper) -> DedupDecision:
+        """判断单篇论文，并把它记入已见集合"""
+        return self.check_many([paper])[0]
+    
+    def check_many(self, papers: List[Paper]) -> List[DedupDecision]:
+        """
+        批量判断论文，签名一次性向量化计算
+        
+        Args:
+            papers: 论文列表
+            
+        Returns:
+            与输入一一对应的DedupDecision列表
+        """
+        decisions: List[Optional[DedupDecision]] = [None] * len(papers)
+        unseen = []
+        for position, paper in enumerate(papers):
+            base, version = split_arxiv_version(paper.arxiv_id)
+            version = version or 0
+            known = self._versions.get(base)
+            if known is None:
+                unseen.append(position)
+            elif version > known:
+                self._versions[base] = version
+                decisions[position] = DedupDecision(paper.arxiv_id, "new_version")
+            else:
+                decisions[position] = DedupDecision(paper.arxiv_id, "old_version", base)
+        
+        if unseen:
+            signatures = self.hasher.signatures([dedup_text(papers[position]) for position in unseen])
+            for position, signature in zip(unseen, signatures):
+                paper = papers[position]
+                base, version = split_arxiv_version(paper.arxiv_id)
+                version = version or 0
+                known = self._versions.get(base)
+                if known is not None:
+                    # 同一批次中的重复ID
+                    if version > known:
+                        self._versions[base] = version
+                        decisions[position] = DedupDecision(paper.arxiv_id, "new_version")
+                    else:
+                        decisions[position] = DedupDecision(paper.arxiv_id, "old_version", base)
+                    continue
+                self._versions[base] = version
+                
+                match = self.index.query(signature) if signature[0] != MERSENNE_PRIME else None
+                self.index.add(base, signature)
+                if match is not None:
+                    decisions[position] = DedupDecision(paper.arxiv_id, "near_duplicate", match[0], match[1])
+                else:
+                    decisions[position] = DedupDecision(paper.arxiv_id, "new")
+        
+        for decision in decisions:
+            self.stats[decision.status] += 1
+            if decision.status == "near_duplicate":
+                self.logger.info(f"近似重复: {decision.arxiv_id} ~ {decision.duplicate_of} "
+                                 f"(相似度 {decision.similarity:.2f})")
+        return decisions
+    
+    def filter(self, papers: Iterable[Paper]) -> Generator[Paper, None, None]:
+        """
+        只产出需要富化的论文
+        
+        输入按批处理：同一批中同一论文的多个版本只保留最高版本，
+        因此应按页传入，而不是逐篇传入。
+        
+        Args:
+            papers: 论文可迭代对象，通常为一页列表
+            
+        Yields:
+            需要富化的Paper对象
+        """
+        newest: Dict[str, Paper] = {}
+        for paper in papers:
+            base, version = split_arxiv_version(paper.arxiv_id)
+            current = newest.get(base)
+            if current is not None:
+                self.stats["old_version"] += 1
+            if current is None or (version or 0) > (split_arxiv_version(current.arxiv_id)[1] or 0):
+                newest[base] = paper
+        
+        batch = list(newest.values())
+        for paper, decision in zip(batch, self.check_many(batch)):
+            if decision.should_enrich:
+                yield paper
@@ -0,0 +1,600 @@
+"""
+全文检索索引
+
+对已抓取论文的标题、摘要和正文章节建立倒排索引，使用BM25排序。
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import Config
+from models.paper import Paper
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this
+to was we were which with our these those can not but also than then there such via using
+""".split())
+
+# 词项表的记录格式：词项哈希、文档频率、差值宽度、差值偏移、词频偏移
+TERM_DTYPE = np.dtype([
+    ("hash", "<u8"),
+    ("df", "<u4"),
+    ("width", "u1"),
+    ("delta_offset", "<i8"),
+    ("tf_offset", "<i8"),
+])
+
+DELTA_DTYPES = {1: np.uint8, 2: np.uint16, 4: np.uint32}
+
+SEGMENT_FILES = ("terms", "deltas1", "deltas2", "deltas4", "tfs", "lengths")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    把文本切分为检索词项：小写、按非字母数字字符切分，去掉单字符词和停用词
+    
+    Examples:
+        >>> tokenize("Attention Is All You Need")
+        ['attention', 'all', 'you', 'need']
+    """
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def term_hash(term: str) -> int:
+    """词项的64位稳定哈希，索引中只保存哈希值"""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def paper_text(paper: Paper) -> str:
+    """论文中参与检索的正文：摘要和正文章节"""
+    parts = [paper.abstract or ""]
+    content = paper.full_content or {}
+    for section in content.get("body_sections", []):
+        for title, text in section.items():
+            parts.append(title)
+            parts.append(text)
+    return "\n".join(parts)
+
+
+class _Segment:
+    """
+    不可变的索引段
+    
+    词项表按哈希排序，查询时二分查找。每个词项的文档号按升序做差值编码，
+    并按最大差值选用uint8/uint16/uint32中最窄的类型，不同宽度分别存放在
+    三个数组中；词频截断为uint8。所有数组都可以直接mmap。
+    """
+    
+    def __init__(self, terms, deltas, tfs, lengths, ids: List[str], deleted: np.ndarray, path: Optional[str] = None):
+        self.terms = terms
+        self.deltas = deltas
+        self.tfs = tfs
+        self.lengths = lengths
+        self.ids = ids
+        self.deleted = deleted
+        self.path = path
+        self._norm_cache = None
+    
+    @classmethod
+    def build(cls, hashes: np.ndarray, docs: np.ndarray, tfs: np.ndarray,
+              lengths: np.ndarray, ids: List[str], deleted: Optional[np.ndarray] = None) -> "_Segment":
+        """
+        由扁平的 (词项哈希, 文档号, 词频) 三元组构建索引段，全部向量化
+        
+        Args:
+            hashes: 每个倒排项的词项哈希
+            docs: 每个倒排项的段内文档号
+            tfs: 每个倒排项的词频
+            lengths: 段内每篇文档的长度
+            ids: 段内每篇文档的ArXiv ID
+            deleted: 可选的删除标记
+        """
+        order = np.lexsort((docs, hashes))
+        hashes = hashes[order]
+        docs = docs[order].astype(np.int64)
+        tfs = np.minimum(tfs[order], 255).astype(np.uint8)
+        
+        count = len(hashes)
+        starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]]) if count else np.zeros(0, dtype=np.int64)
+        df = np.diff(np.r_[starts, count])
+        
+        # 差值编码，每个词项的第一项保存绝对文档号
+        deltas = np.diff(docs, prepend=0)
+        deltas[starts] = docs[starts]
+        max_delta = np.maximum.reduceat(deltas, starts) if count else np.zeros(0, dtype=np.int64)
+        widths = np.where(max_delta < 1 << 8, 1, np.where(max_delta < 1 << 16, 2, 4)).astype(np.uint8)
+        
+        terms = np.zeros(len(starts), dtype=TERM_DTYPE)
+        terms["hash"] = hashes[starts]
+        terms["df"] = df
+        terms["width"] = widths
+        terms["tf_offset"] = starts
+        
+        posting_widths = np.repeat(widths, df)
+        delta_blobs = {}
+        for width, dtype in DELTA_DTYPES.items():
+            term_mask = widths == width
+            delta_blobs[width] = deltas[posting_widths == width].astype(dtype)
+            terms["delta_offset"][term_mask] = np.cumsum(np.r_[0, df[term_mask][:-1]])
+        
+        if deleted is None:
+            deleted = np.zeros(len(ids), dtype=bool)
+        return cls(terms, delta_blobs, tfs, np.asarray(lengths, dtype=np.uint32), ids, deleted)
+    
+    @classmethod
+    def load(cls, path: str) -> "_Segment":
+        """以mmap方式加载索引段"""
+        def load_array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        
+        with open(os.path.join(path, "ids.json"), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        deleted = np.load(os.path.join(path, "deleted.npy")).astype(bool)
+        deltas = {width: load_array(f"deltas{width}") for width in DELTA_DTYPES}
+        return cls(load_array("terms"), deltas, load_array("tfs"), load_array("lengths"), ids, deleted, path)
+    
+    def save(self, path: str):
+        """保存索引段"""
+        os.makedirs(path, exist_ok=True)
+        arrays = {"terms": self.terms, "tfs": self.tfs, "lengths": self.lengths}
+        for width in DELTA_DTYPES:
+            arrays[f"deltas{width}"] = self.deltas[width]
+        for name, value in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), value)
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        self.path = path
+        self.save_deleted()
+    
+    def save_deleted(self):
+        """保存删除标记，段的其他部分不变"""
+        if self.path:
+            np.save(os.path.join(self.path, "deleted.npy"), self.deleted)
+    
+    def lookup(self, hash_value: int) -> int:
+        """查找词项在词项表中的位置，不存在时返回-1"""
+        hashes = self.terms["hash"]
+        position = int(np.searchsorted(hashes, np.uint64(hash_value)))
+        if position < len(hashes) and int(hashes[position]) == hash_value:
+            return position
+        return -1
+    
+    def postings(self, position: int) -> Tuple[np.ndarray, np.ndarray]:
+        """解码一个词项的 (文档号数组, 词频数组)"""
+        term = self.terms[position]
+        df = int(term["df"])
+        offset = int(term["delta_offset"])
+        deltas = self.deltas[int(term["width"])][offset:offset + df]
+        tf_offset = int(term["tf_offset"])
+        return np.cumsum(deltas, dtype=np.int64), self.tfs[tf_offset:tf_offset + df]
+    
+    def decode_all(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """解码全部倒排项为扁平的 (词项哈希, 文档号, 词频)，用于合并段"""
+        hashes, docs, tfs = [], [], []
+        for width in DELTA_DTYPES:
+            terms = self.terms[self.terms["width"] == width]
+            if not len(terms):
+                continue
+            df = terms["df"].astype(np.int64)
+            deltas = np.asarray(self.deltas[width], dtype=np.int64)
+            # 分组前缀和：整体累加后减去每组起点之前的累计值
+            totals = np.cumsum(deltas)
+            group_starts = np.cumsum(np.r_[0, df[:-1]])
+            base = np.repeat(totals[group_starts] - deltas[group_starts], df)
+            within = np.arange(len(deltas)) - np.repeat(group_starts, df)
+            hashes.append(np.repeat(terms["hash"], df))
+            docs.append(totals - base)
+            tfs.append(np.asarray(self.tfs)[np.repeat(terms["tf_offset"], df) + within])
+        if not hashes:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+        return np.concatenate(hashes), np.concatenate(docs), np.concatenate(tfs)
+    
+    def length_norm(self, k1: float, b: float, avgdl: float) -> np.ndarray:
+        """BM25的文档长度归一化项 k1*(1-b+b*dl/avgdl)，按参数缓存"""
+        key = (k1, b, avgdl)
+        if self._norm_cache is None or self._norm_cache[0] != key:
+            norm = (k1 * (1.0 - b + b * (np.asarray(self.lengths, dtype=np.float32) / avgdl))).astype(np.float32)
+            self._norm_cache = (key, norm)
+        return self._norm_cache[1]
+    
+    def match(self, hashes: List[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        解码查询词项在本段的倒排列表，去掉已删除的文档
+        
+        Returns:
+            词项哈希 -> (文档号数组, 词频数组)
+        """
+        matches = {}
+        for hash_value in hashes:
+            position = self.lookup(hash_value)
+            if position < 0:
+                continue
+            docs, tfs = self.postings(position)
+            live = ~self.deleted[docs]
+            if not live.all():
+                docs, tfs = docs[live], tfs[live]
+            if len(docs):
+                matches[hash_value] = (docs, tfs)
+        return matches
+    
+    def top_k(self,
+              matches: Dict[int, Tuple[np.ndarray, np.ndarray]],
+              idfs: Dict[int, float],
+              k: int,
+              k1: float,
+              b: float,
+              avgdl: float) -> List[Tuple[float, str]]:
+        """
+        对段内命中的文档按BM25打分并取前k个
+        
+        Args:
+            matches: match() 的结果
+            idfs: 词项哈希 -> idf
+            k: 返回数量
+            k1: BM25参数k1
+            b: BM25参数b
+            avgdl: 平均文档长度
+        """
+        if not matches:
+            return []
+        
+        norm = self.length_norm(k1, b, avgdl)
+        contributions = []
+        for hash_value, (docs, tfs) in matches.items():
+            tfs = tfs.astype(np.float32)
+            contributions.append((docs, idfs[hash_value] * tfs * (k1 + 1.0) / (tfs + norm[docs])))
+        
+        total = sum(len(docs) for docs, _ in contributions)
+        if total * 16 < len(self.ids):
+            # 命中较少时按命中文档稀疏聚合，避免为整段分配分数数组
+            docs = np.concatenate([docs for docs, _ in contributions])
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([values for _, values in contributions]))
+        else:
+            candidates = None
+            scores = np.zeros(len(self.ids), dtype=np.float32)
+            for docs, values in contributions:
+                # 同一词项内文档号唯一，可以直接按索引累加
+                scores[docs] += values
+        
+        order = np.flatnonzero(scores)
+        if len(order) > k:
+            order = order[np.argpartition(-scores[order], k - 1)[:k]]
+        if candidates is None:
+            return [(float(scores[doc]), self.ids[doc]) for doc in order]
+        return [(float(scores[i]), self.ids[candidates[i]]) for i in order]
+
+
+class SearchIndex:
+    """
+    基于BM25的倒排索引
+    
+    新文档先进入内存缓冲区，达到阈值或调用flush()时写成一个不可变的段；
+    查询时合并所有段的前k个结果。指定目录时段以 .npy 文件保存并通过mmap加载，
+    打开百万级索引几乎不需要读入数据。同一ArXiv ID再次添加时旧文档被标记删除。
+    """
+    
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 buffer_docs: int = Config.SEARCH_BUFFER_DOCS,
+                 k1: float = Config.SEARCH_BM25_K1,
+                 b: float = Config.SEARCH_BM25_B,
+                 title_weight: int = Config.SEARCH_TITLE_WEIGHT):
+        """
+        创建或打开索引
+        
+        Args:
+            directory: 索引目录，None表示只在内存中
+            buffer_docs: 缓冲区文档数达到该值时自动生成新段
+            k1: BM25参数k1
+            b: BM25参数b
+            title_weight: 标题词项的词频权重
+        """
+        self.directory = directory
+        self.buffer_docs = max(1, buffer_docs)
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        
+        self._segments: List[_Segment] = []
+        self._next_segment = 0
+        # ArXiv ID -> (段序号, 段内文档号)，段序号为-1表示在缓冲区中
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._live_docs = 0
+        self._live_length = 0
+        self._hash_cache: Dict[str, int] = {}
+        # 删除标记有变化、需要重新保存的段
+        self._dirty = set()
+        self._reset_buffer()
+        
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+    
+    def __len__(self) -> int:
+        return self._live_docs
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return arxiv_id in self._locations
+    
+    @property
+    def num_segments(self) -> int:
+        """已生成的段数"""
+        return len(self._segments)
+    
+    def add(self, paper: Paper):
+        """添加或更新一篇论文"""
+        self.add_document(paper.arxiv_id, paper.title, paper_text(paper))
+    
+    def add_many(self, papers: Iterable[Paper]) -> int:
+        """
+        批量添加论文，可直接接在抓取生成器之后
+        
+        Returns:
+            添加的论文数
+        """
+        count = 0
+        for paper in papers:
+            self.add(paper)
+            count += 1
+        return count
+    
+    def add_document(self, doc_id: str, title: str, text: str):
+        """
+        添加或更新一篇文档
+        
+        Args:
+            doc_id: 文档ID，通常为ArXiv ID
+            title: 标题，词频按title_weight加权
+            text: 正文
+        """
+        self.delete(doc_id)
+        
+        counts = Counter(tokenize(text))
+        for token in tokenize(title):
+            counts[token] += self.title_weight
+        
+        local = len(self._buffer_ids)
+        length = sum(counts.values())
+        for token, count in counts.items():
+            self._buffer_hashes.append(self._hash(token))
+            self._buffer_docs.append(local)
+            self._buffer_tfs.append(min(count, 255))
+        self._buffer_ids.append(doc_id)
+        self._buffer_lengths.append(length)
+        self._buffer_deleted.append(0)
+        
+        self._locations[doc_id] = (-1, local)
+        self._live_docs += 1
+        self._live_length += length
+        self._buffer_segment = None
+        
+        if len(self._buffer_ids) >= self.buffer_docs:
+            self.flush()
+    
+    def delete(self, doc_id: str) -> bool:
+        """
+        删除文档
+        
+        Returns:
+            文档存在时返回True
+        """
+        location = self._locations.pop(doc_id, None)
+        if location is None:
+            return False
+        
+        segment_index, local = location
+        if segment_index < 0:
+            self._buffer_deleted[local] = 1
+            length = self._buffer_lengths[local]
+            self._buffer_segment = None
+        else:
+            segment = self._segments[segment_index]
+            segment.deleted[local] = True
+            length = int(segment.lengths[local])
+            self._dirty.add(segment_index)
+        
+        self._live_docs -= 1
+        self._live_length -= length
+        return True
+    
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25检索
+        
+        Args:
+            query: 查询文本
+            k: 返回数量
+            
+        Returns:
+            (ArXiv ID, 分值) 列表，按分值降序
+        """
+        segments = self._all_segments()
+        if not segments or self._live_docs == 0 or k <= 0:
+            return []
+        
+        hashes = list(dict.fromkeys(self._hash(token) for token in tokenize(query)))
+        matches = [segment.match(hashes) for segment in segments]
+        
+        # 文档频率只统计未删除的文档，更新过的论文不影响idf
+        document_frequency = Counter()
+        for segment_matches in matches:
+            for hash_value, (docs, _) in segment_matches.items():
+                document_frequency[hash_value] += len(docs)
+        if not document_frequency:
+            return []
+        idfs = {hash_value: math.log(1.0 + (self._live_docs - df + 0.5) / (df + 0.5))
+                for hash_value, df in document_frequency.items()}
+        
+        avgdl = max(self._live_length / self._live_docs, 1.0)
+        candidates = []
+        for segment, segment_matches in zip(segments, matches):
+            candidates.extend(segment.top_k(segment_matches, idfs, k, self.k1, self.b, avgdl))
+        return [(doc_id, score) for score, doc_id in heapq.nlargest(k, candidates)]
+    
+    def flush(self):
+        """把缓冲区写成新段，指定了目录时同时保存到磁盘和更新删除标记"""
+        if self._buffer_ids:
+            segment = self._build_buffer_segment()
+            segment_index = len(self._segments)
+            self._segments.append(segment)
+            for local, doc_id in enumerate(segment.ids):
+                if not segment.deleted[local]:
+                    self._locations[doc_id] = (segment_index, local)
+            if self.directory:
+                segment.save(os.path.join(self.directory, f"seg_{self._next_segment:06d}"))
+            self._next_segment += 1
+            self._reset_buffer()
+        
+        if self.directory:
+            for segment_index in self._dirty:
+                self._segments[segment_index].save_deleted()
+            self._dirty.clear()
+            self._save_manifest()
+    
+    def merge_segments(self):
+        """
+        把所有段合并为一个，去掉已删除的文档
+        
+        段数过多会降低查询速度，大批量增量更新后应定期合并。
+        """
+        self.flush()
+        if len(self._segments) <= 1 and not any(segment.deleted.any() for segment in self._segments):
+            return
+        
+        hashes, docs, tfs, lengths, ids = [], [], [], [], []
+        base = 0
+        for segment in self._segments:
+            live = ~segment.deleted
+            remap = np.cumsum(live) - 1 + base
+            segment_hashes, segment_docs, segment_tfs = segment.decode_all()
+            keep = live[segment_docs]
+            hashes.append(segment_hashes[keep])
+            docs.append(remap[segment_docs[keep]])
+            tfs.append(segment_tfs[keep])
+            lengths.append(np.asarray(segment.lengths)[live])
+            ids.extend(doc_id for doc_id, alive in zip(segment.ids, live) if alive)
+            base += int(live.sum())
+        
+        merged = _Segment.build(np.concatenate(hashes), np.concatenate(docs), np.concatenate(tfs),
+                                np.concatenate(lengths), ids)
+        old_paths = [segment.path for segment in self._segments if segment.path]
+        self._segments = [merged]
+        self._locations = {doc_id: (0, local) for local, doc_id in enumerate(ids)}
+        
+        if self.directory:
+            merged.save(os.path.join(self.directory, f"seg_{self._next_segment:06d}"))
+            self._next_segment += 1
+            self._save_manifest()
+            for path in old_paths:
+                self._remove_segment_files(path)
+    
+    def close(self):
+        """刷新缓冲区并保存"""
+        self.flush()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    def _hash(self, token: str) -> int:
+        """带缓存的词项哈希"""
+        value = self._hash_cache.get(token)
+        if value is None:
+            if len(self._hash_cache) >= Config.SEARCH_HASH_CACHE_SIZE:
+                self._hash_cache.clear()
+            value = self._hash_cache[token] = term_hash(token)
+        return value
+    
+    def _reset_buffer(self):
+        """清空缓冲区"""
+        self._buffer_hashes = array("Q")
+        self._buffer_docs = array("I")
+        self._buffer_tfs = array("B")
+        self._buffer_ids: List[str] = []
+        self._buffer_lengths = array("I")
+        self._buffer_deleted = bytearray()
+        self._buffer_segment = None
+    
+    def _build_buffer_segment(self) -> _Segment:
+        """由缓冲区构建段"""
+        return _Segment.build(
+            np.frombuffer(self._buffer_hashes, dtype=np.uint64),
+            np.frombuffer(self._buffer_docs, dtype=np.uint32),
+            np.frombuffer(self._buffer_tfs, dtype=np.uint8),
+            np.frombuffer(self._buffer_lengths, dtype=np.uint32).copy(),
+            list(self._buffer_ids),
+            np.frombuffer(bytes(self._buffer_deleted), dtype=np.uint8).astype(bool),
+        )
+    
+    def _all_segments(self) -> List[_Segment]:
+        """所有段，包括由缓冲区临时构建的段"""
+        if not self._buffer_ids:
+            return self._segments
+        if self._buffer_segment is None:
+            self._buffer_segment = self._build_buffer_segment()
+        return self._segments + [self._buffer_segment]
+    
+    def _save_manifest(self):
+        """原子地写出段列表和统计信息"""
+        manifest = {
+            "segments": [os.path.basename(segment.path) for segment in self._segments],
+            "next_segment": self._next_segment,
+        }
+        path = os.path.join(self.directory, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+    
+    def _load(self):
+        """从目录加载段并重建文档位置和统计信息"""
+        path = os.path.join(self.directory, "manifest.json")
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        
+        self._next_segment = manifest["next_segment"]
+        for name in manifest["segments"]:
+            segment = _Segment.load(os.path.join(self.directory, name))
+            segment_index = len(self._segments)
+            self._segments.append(segment)
+            live = ~segment.deleted
+            for local in np.flatnonzero(live):
+                self._locations[segment.ids[local]] = (segment_index, int(local))
+            self._live_docs += int(live.sum())
+            self._live_length += int(np.asarray(segment.lengths, dtype=np.int64)[live].sum())
+    
+    @staticmethod
+    def _remove_segment_files(path: str):
+        """删除合并后不再使用的段文件"""
+        for name in SEGMENT_FILES + ("deleted",):
+            file_path = os.path.join(path, f"{name}.npy")
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        ids_path = os.path.join(path, "ids.json")
+        if os.path.exists(ids_path):
+            os.remove(ids_path)
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
@@ -0,0 +1,463 @@
+"""
+相关论文推荐
+
+用摘要的TF-IDF向量计算论文间的余弦相似度，并把每篇论文的前k个相关论文
+预先计算并缓存，查询时只需读取一行。
+"""
+
+import json
+import math
+import os
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import Config
+from models.paper import Paper
+from analysis.search_index import tokenize
+
+
+def _gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    向量化地取出CSR中多行的元素位置
+    
+    Returns:
+        (每个元素所属的输入行序号, 元素位置)
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owners = np.repeat(np.arange(len(rows)), lengths)
+    total = int(lengths.sum())
+    if total == 0:
+        return owners, np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return owners, offsets + np.arange(total)
+
+
+class TfidfIndex:
+    """
+    增量TF-IDF索引
+    
+    每篇论文的原始词频以CSR数组追加保存，词表随新论文增长。idf和归一化后的
+    权重矩阵在查询时按需计算并缓存，添加新论文后自动失效。相似度计算按块进行：
+    一批查询行通过倒排列表散射到一个 (块大小 × 论文数) 的稠密分数块中，
+    块大小由内存预算决定。
+    
+    计算量与查询词项的倒排列表总长度成正比，中频词的列表很长而权重很低，
+    因此预计算时每个查询行只保留权重最高的若干词项。被丢弃的词项贡献非负，
+    得到的相似度是精确值的下界；query_terms为None时计算精确值。
+    """
+    
+    def __init__(self,
+                 min_df: int = Config.SIMILARITY_MIN_DF,
+                 max_df: float = Config.SIMILARITY_MAX_DF,
+                 block_bytes: int = Config.SIMILARITY_BLOCK_BYTES,
+                 query_terms: Optional[int] = Config.SIMILARITY_QUERY_TERMS):
+        """
+        初始化索引
+        
+        Args:
+            min_df: 参与计算的词项最少出现的论文数，只出现在一篇论文中的词对相似度没有贡献
+            max_df: 参与计算的词项最多出现的论文比例，过于常见的词被忽略
+            block_bytes: 每个稠密分数块的内存预算（字节）
+            query_terms: 批量查询时每行保留的词项数，None表示全部保留
+        """
+        self.min_df = max(1, min_df)
+        self.max_df = max_df
+        self.block_bytes = block_bytes
+        self.query_terms = query_terms
+        
+        self.terms: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._df = array("I")
+        self._indptr = array("q", [0])
+        self._term_ids = array("i")
+        self._counts = array("H")
+        self._deleted = bytearray()
+        self._matrix = None
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return arxiv_id in self._rows
+    
+    def add(self, paper: Paper):
+        """添加或更新一篇论文，使用标题和摘要"""
+        self.add_document(paper.arxiv_id, f"{paper.title}\n{paper.abstract}")
+    
+    def add_many(self, papers: Iterable[Paper]) -> int:
+        """
+        批量添加论文
+        
+        Returns:
+            添加的论文数
+        """
+        count = 0
+        for paper in papers:
+            self.add(paper)
+            count += 1
+        return count
+    
+    def add_document(self, doc_id: str, text: str):
+        """
+        添加或更新一篇文档，已存在的同ID文档被替换
+        
+        Args:
+            doc_id: 文档ID，通常为ArXiv ID
+            text: 文档文本
+        """
+        self.delete(doc_id)
+        
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+                self._df.append(0)
+            self._df[term_id] += 1
+            self._term_ids.append(term_id)
+            self._counts.append(min(count, 65535))
+        
+        self._rows[doc_id] = len(self.ids)
+        self.ids.append(doc_id)
+        self._indptr.append(len(self._term_ids))
+        self._deleted.append(0)
+        self._matrix = None
+    
+    def delete(self, doc_id: str) -> bool:
+        """
+        删除文档
+        
+        Returns:
+            文档存在时返回True
+        """
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._deleted[row] = 1
+        for position in range(self._indptr[row], self._indptr[row + 1]):
+            self._df[self._term_ids[position]] -= 1
+        self._matrix = None
+        return True
+    
+    def most_similar(self, arxiv_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        与已索引论文最相似的论文
+        
+        Args:
+            arxiv_id: ArXiv ID
+            k: 返回数量
+            
+        Returns:
+            (ArXiv ID, 余弦相似度) 列表，按相似度降序
+        """
+        row = self._rows.get(arxiv_id)
+        if row is None:
+            return []
+        neighbors, scores = self.top_k_rows(np.array([row]), k)
+        return self._pairs(neighbors[0], scores[0])
+    
+    def similar_to_text(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        与任意文本最相似的论文，文本中不在词表里的词被忽略
+        
+        Args:
+            text: 查询文本，如一段摘要
+            k: 返回数量
+        """
+        matrix = self._get_matrix()
+        counts = Counter(term_id for term_id in (self.vocabulary.get(term) for term in tokenize(text))
+                         if term_id is not None and matrix["idf"][term_id] > 0)
+        if not counts:
+            return []
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * matrix["idf"][term_ids]
+        weights /= np.linalg.norm(weights)
+        neighbors, scores = self._top_k(np.zeros(len(term_ids), dtype=np.int64), term_ids, weights, 1, k, None)
+        return self._pairs(neighbors[0], scores[0])
+    
+    def top_k_rows(self, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量计算若干行的前k个相似行（不含自身）
+        
+        Args:
+            rows: 行号数组
+            k: 每行返回的数量
+            
+        Returns:
+            (行号数组, 相似度数组)，形状均为 (len(rows), k)，不足k个时行号为-1
+        """
+        matrix = self._get_matrix()
+        neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+        scores = np.zeros((len(rows), k), dtype=np.float32)
+        for start in range(0, len(rows), self._block_rows()):
+            block = np.asarray(rows[start:start + self._block_rows()], dtype=np.int64)
+            owners, positions = _gather(matrix["indptr"], block)
+            if self.query_terms is not None:
+                owners, positions = self._prune(owners, positions, matrix["data"])
+            block_neighbors, block_scores = self._top_k(owners, matrix["terms"][positions],
+                                                        matrix["data"][positions], len(block), k, block)
+            neighbors[start:start + len(block)] = block_neighbors
+            scores[start:start + len(block)] = block_scores
+        return neighbors, scores
+    
+    def precompute(self, k: int = Config.SIMILARITY_TOP_K, previous: Optional["RelatedPapers"] = None) -> "RelatedPapers":
+        """
+        分块预计算所有论文的相关论文
+        
+        提供上一次的结果时只计算新增的论文，再把新论文合并进旧论文的列表；
+        旧论文之间的相似度不重新计算。
+        
+        Args:
+            k: 每篇论文缓存的相关论文数
+            previous: 可选，上一次预计算的结果
+            
+        Returns:
+            RelatedPapers对象
+        """
+        total = len(self.ids)
+        neighbors = np.full((total, k), -1, dtype=np.int32)
+        scores = np.zeros((total, k), dtype=np.float32)
+        
+        start = 0
+        if previous is not None and previous.k == k and len(previous.ids) <= total:
+            start = len(previous.ids)
+            neighbors[:start] = previous.neighbors
+            scores[:start] = previous.scores
+        
+        live = np.flatnonzero(np.frombuffer(bytes(self._deleted), dtype=np.uint8) == 0)
+        new_rows = live[live >= start]
+        if len(new_rows):
+            new_neighbors, new_scores = self.top_k_rows(new_rows, k)
+            neighbors[new_rows] = new_neighbors
+            scores[new_rows] = new_scores
+            if start:
+                self._merge_reverse(neighbors, scores, new_rows, new_neighbors, new_scores, start)
+        
+        # 已删除的论文既不保留列表，也不出现在别人的列表中
+        deleted = np.flatnonzero(np.frombuffer(bytes(self._deleted), dtype=np.uint8))
+        if len(deleted):
+            neighbors[deleted] = -1
+            scores[deleted] = 0.0
+            stale = np.isin(neighbors, deleted)
+            neighbors[stale] = -1
+            scores[stale] = 0.0
+        return RelatedPapers(list(self.ids), neighbors, scores)
+    
+    def save(self, directory: str):
+        """保存索引"""
+        os.makedirs(directory, exist_ok=True)
+        for name, data, dtype in (("df", self._df, np.uint32),
+                                  ("indptr", self._indptr, np.int64),
+                                  ("term_ids", self._term_ids, np.int32),
+                                  ("counts", self._counts, np.uint16),
+                                  ("deleted", self._deleted, np.uint8)):
+            np.save(os.path.join(directory, f"{name}.npy"), np.frombuffer(bytes(data), dtype=dtype))
+        with open(os.path.join(directory, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump({"terms": self.terms, "ids": self.ids}, f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> "TfidfIndex":
+        """加载索引"""
+        index = cls(**kwargs)
+        for name, typecode in (("df", "I"), ("indptr", "q"), ("term_ids", "i"), ("counts", "H")):
+            setattr(index, f"_{name}", array(typecode, np.load(os.path.join(directory, f"{name}.npy")).tobytes()))
+        index._deleted = bytearray(np.load(os.path.join(directory, "deleted.npy")).tobytes())
+        with open(os.path.join(directory, "vocabulary.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index.terms = data["terms"]
+        index.ids = data["ids"]
+        index.vocabulary = {term: i for i, term in enumerate(index.terms)}
+        index._rows = {doc_id: row for row, doc_id in enumerate(index.ids) if not index._deleted[row]}
+        return index
+    
+    def _get_matrix(self) -> Dict[str, np.ndarray]:
+        """计算并缓存L2归一化的TF-IDF矩阵及其按词项的转置"""
+        if self._matrix is not None:
+            return self._matrix
+        
+        live_docs = max(len(self._rows), 1)
+        df = np.frombuffer(bytes(self._df), dtype=np.uint32).astype(np.float64)
+        idf = np.log((1.0 + live_docs) / (1.0 + df)) + 1.0
+        idf[(df < self.min_df) | (df > self.max_df * live_docs)] = 0.0
+        
+        indptr = np.frombuffer(bytes(self._indptr), dtype=np.int64)
+        terms = np.frombuffer(bytes(self._term_ids), dtype=np.int32).astype(np.int64)
+        counts = np.frombuffer(bytes(self._counts), dtype=np.uint16).astype(np.float64)
+        rows = np.repeat(np.arange(len(self.ids)), np.diff(indptr))
+        deleted = np.frombuffer(bytes(self._deleted), dtype=np.uint8).astype(bool)
+        
+        # 亚线性词频 × idf，再按行L2归一化；被忽略的词项和已删除的行直接去掉
+        data = (1.0 + np.log(counts)) * idf[terms]
+        keep = (data > 0) & ~deleted[rows]
+        rows, terms, data = rows[keep], terms[keep], data[keep]
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(self.ids)))
+        data = (data / norms[rows]).astype(np.float32)
+        indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self.ids)), out=indptr[1:])
+        
+        order = np.argsort(terms, kind="stable")
+        t_indptr = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(self.terms)), out=t_indptr[1:])
+        
+        self._matrix = {
+            "idf": idf,
+            "indptr": indptr,
+            "terms": terms,
+            "data": data,
+            "t_indptr": t_indptr,
+            "t_rows": rows[order],
+            "t_data": data[order],
+        }
+        return self._matrix
+    
+    def _prune(self, owners: np.ndarray, positions: np.ndarray, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """每个查询行只保留权重最高的query_terms个元素"""
+        order = np.lexsort((-data[positions], owners))
+        owners, positions = owners[order], positions[order]
+        starts = np.searchsorted(owners, owners, side="left")
+        keep = np.arange(len(owners)) - starts < self.query_terms
+        return owners[keep], positions[keep]
+    
+    def _block_rows(self) -> int:
+        """按内存预算决定每块的查询行数"""
+        return max(1, self.block_bytes // (max(len(self.ids), 1) * 8))
+    
+    def _top_k(self,
+               owners: np.ndarray,
+               term_ids: np.ndarray,
+               weights: np.ndarray,
+               block_size: int,
+               k: int,
+               self_rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        一块查询向量与全部论文的相似度前k
+        
+        查询向量以 (所属查询, 词项, 权重) 三元组给出，经倒排列表散射到
+        (block_size × 论文数) 的分数块中。
+        """
+        matrix = self._get_matrix()
+        n = len(self.ids)
+        post_owners, positions = _gather(matrix["t_indptr"], term_ids)
+        flat = owners[post_owners] * n + matrix["t_rows"][positions]
+        products = weights[post_owners] * matrix["t_data"][positions]
+        block = np.bincount(flat, weights=products, minlength=block_size * n).reshape(block_size, n)
+        if self_rows is not None:
+            block[np.arange(block_size), self_rows] = 0.0
+        
+        neighbors = np.full((block_size, k), -1, dtype=np.int32)
+        scores = np.zeros((block_size, k), dtype=np.float32)
+        width = min(k, n)
+        if width == 0:
+            return neighbors, scores
+        top = np.argpartition(-block, width - 1, axis=1)[:, :width]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        valid = top_scores > 0
+        neighbors[:, :width] = np.where(valid, top, -1)
+        scores[:, :width] = np.where(valid, top_scores, 0.0)
+        return neighbors, scores
+    
+    @staticmethod
+    def _merge_reverse(neighbors, scores, new_rows, new_neighbors, new_scores, start):
+        """把新论文加入与其相似的旧论文的列表，每行保留相似度最高的k个"""
+        k = neighbors.shape[1]
+        sources = np.repeat(new_rows, k)
+        targets = new_neighbors.ravel().astype(np.int64)
+        values = new_scores.ravel()
+        mask = (targets >= 0) & (targets < start)
+        sources, targets, values = sources[mask], targets[mask], values[mask]
+        if not len(targets):
+            return
+        
+        affected = np.unique(targets)
+        rows = np.concatenate([np.repeat(affected, k), targets])
+        candidates = np.concatenate([neighbors[affected].ravel().astype(np.int64), sources])
+        candidate_scores = np.concatenate([scores[affected].ravel(), values])
+        valid = candidates >= 0
+        rows, candidates, candidate_scores = rows[valid], candidates[valid], candidate_scores[valid]
+        
+        order = np.lexsort((-candidate_scores, rows))
+        rows, candidates, candidate_scores = rows[order], candidates[order], candidate_scores[order]
+        starts = np.searchsorted(rows, affected)
+        rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+        keep = rank < k
+        
+        neighbors[affected] = -1
+        scores[affected] = 0.0
+        neighbors[rows[keep], rank[keep]] = candidates[keep]
+        scores[rows[keep], rank[keep]] = candidate_scores[keep]
+    
+    def _pairs(self, neighbors: np.ndarray, scores: np.ndarray) -> List[Tuple[str, float]]:
+        """把行号转换为 (ArXiv ID, 相似度) 列表"""
+        return [(self.ids[row], float(score)) for row, score in zip(neighbors, scores) if row >= 0]
+
+
+class RelatedPapers:
+    """
+    预计算的相关论文表
+    
+    每篇论文一行，保存前k个相关论文的行号和相似度。保存为 .npy 文件后以mmap
+    方式加载，查询一篇论文只读取对应的一行。
+    """
+    
+    def __init__(self, ids: List[str], neighbors: np.ndarray, scores: np.ndarray):
+        """
+        Args:
+            ids: 行号对应的ArXiv ID
+            neighbors: 形状为 (论文数, k) 的行号数组，-1表示空位
+            scores: 与neighbors对应的相似度
+        """
+        self.ids = ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+    
+    @property
+    def k(self) -> int:
+        """每篇论文缓存的相关论文数"""
+        return self.neighbors.shape[1]
+    
+    def related(self, arxiv_id: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        查询相关论文
+        
+        Args:
+            arxiv_id: ArXiv ID
+            k: 返回数量，默认为缓存的全部
+            
+        Returns:
+            (ArXiv ID, 相似度) 列表，按相似度降序
+        """
+        row = self._rows.get(arxiv_id)
+        if row is None:
+            return []
+        neighbors = self.neighbors[row][:k]
+        scores = self.scores[row][:k]
+        return [(self.ids[neighbor], float(score)) for neighbor, score in zip(neighbors, scores) if neighbor >= 0]
+    
+    def save(self, directory: str):
+        """保存到目录"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "related_ids.npy"), np.asarray(self.neighbors, dtype=np.int32))
+        np.save(os.path.join(directory, "related_scores.npy"), np.asarray(self.scores, dtype=np.float32))
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+    
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "RelatedPapers":
+        """从目录加载，默认以mmap方式只读加载"""
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(directory, "ids.json"), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        return cls(ids,
+                   np.load(os.path.join(directory, "related_ids.npy"), mmap_mode=mmap_mode),
+                   np.load(os.path.join(directory, "related_scores.npy"), mmap_mode=mmap_mode))
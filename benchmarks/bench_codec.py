@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+论文序列化往返基准
+
+比较逐篇 to_dict + json / from_dict 与 utils.codec 各编解码器的批量编码、解码耗时和输出体积。
+
+用法:
+    python benchmarks/bench_codec.py              # 10万篇，每项取3次最好成绩
+    python benchmarks/bench_codec.py -n 20000 -r 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.paper import Paper
+from utils.codec import CODECS, get_codec
+
+
+SUBJECTS = [
+    "Machine Learning (cs.LG)",
+    "Artificial Intelligence (cs.AI)",
+    "Computation and Language (cs.CL)",
+    "Computer Vision and Pattern Recognition (cs.CV)",
+    "Statistics Theory (math.ST)",
+    "High Energy Physics - Theory (hep-th)",
+]
+
+
+def make_papers(count: int, abstract_words: int = 150, seed: int = 0):
+    """生成用于基准的合成论文"""
+    rng = random.Random(seed)
+    words = ["model", "learning", "data", "network", "theory", "results", "method", "analysis"]
+    start = datetime(2023, 1, 1)
+    papers = []
+    for i in range(count):
+        arxiv_id = f"23{i // 100000 % 12 + 1:02d}.{i % 100000:05d}"
+        papers.append(Paper(
+            arxiv_id=arxiv_id,
+            title=" ".join(rng.choice(words) for _ in range(10)),
+            authors=[f"Author {rng.randrange(10000)}" for _ in range(rng.randint(1, 6))],
+            abstract=" ".join(rng.choice(words) for _ in range(abstract_words)),
+            subjects=rng.sample(SUBJECTS, rng.randint(1, 3)),
+            comments="12 pages, 4 figures",
+            abs_link=f"https://arxiv.org/abs/{arxiv_id}",
+            pdf_link=f"https://arxiv.org/pdf/{arxiv_id}",
+            html_link=f"https://arxiv.org/html/{arxiv_id}v1",
+            submission_date=start + timedelta(days=i % 365),
+        ))
+    return papers
+
+
+def best_of(repeat: int, func):
+    """执行repeat次，返回最短耗时和最后一次的结果"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_baseline(papers, repeat: int):
+    """逐篇 to_dict + json.dumps，json.loads + from_dict"""
+    encode_time, data = best_of(repeat, lambda: json.dumps([paper.to_dict() for paper in papers]).encode("utf-8"))
+    decode_time, decoded = best_of(repeat, lambda: [Paper.from_dict(item) for item in json.loads(data)])
+    return encode_time, decode_time, len(data), decoded
+
+
+def bench_codec(name: str, papers, repeat: int):
+    """utils.codec 批量编解码"""
+    codec = get_codec(name)
+    encode_time, data = best_of(repeat, lambda: codec.encode_many(papers))
+    decode_time, decoded = best_of(repeat, lambda: codec.decode_many(data))
+    return encode_time, decode_time, len(data), decoded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="论文序列化往返基准")
+    parser.add_argument("-n", "--papers", type=int, default=100000, help="论文数 (默认: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="每项重复次数，取最好成绩 (默认: %(default)s)")
+    args = parser.parse_args(argv)
+    
+    papers = make_papers(args.papers)
+    print(f"{args.papers} 篇论文，每项取 {args.repeat} 次最好成绩")
+    print(f"{'方式':<40}{'编码':>10}{'解码':>10}{'体积':>12}")
+    
+    rows = [("to_dict + json.dumps / from_dict", lambda: bench_baseline(papers, args.repeat))]
+    for name in CODECS:
+        rows.append((f"codec {name}", lambda name=name: bench_codec(name, papers, args.repeat)))
+    
+    for label, run in rows:
+        try:
+            encode_time, decode_time, size, decoded = run()
+        except RuntimeError as e:
+            print(f"{label:<40}跳过: {e}")
+            continue
+        if decoded != papers:
+            print(f"{label:<40}往返结果不一致")
+            return 1
+        print(f"{label:<40}{encode_time:>9.2f}s{decode_time:>9.2f}s{size / 1e6:>9.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+解析内存回归基准
+
+模拟抓取流水线：逐页解析合成列表页，再为每篇论文解析一个合成的HTML正文页，
+同时保留最近 window 篇论文作为"在途"论文。解析经过 ArxivHtmlParser 的 *_html
+方法，即 parse_and_release 路径。测量期间关闭循环垃圾回收，解析树若没有被及时
+拆除就会一直留在内存中，峰值随处理的页数增长。
+
+以 tracemalloc 峰值除以同时存活的论文数（window + 每页论文数）得到每篇在途论文
+的峰值内存，超过 --max-kb-per-paper 时以退出码1结束，可以直接用于CI。
+
+用法:
+    python benchmarks/bench_memory.py                     # 10页 x 25篇，正文页约65KB
+    python benchmarks/bench_memory.py -p 40 --max-kb-per-paper 128
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.html_parser import ArxivHtmlParser
+
+
+def listing_page(page: int, count: int) -> str:
+    """生成一个包含count篇论文的列表页"""
+    items = []
+    for i in range(page * count, (page + 1) * count):
+        arxiv_id = f"2501.{i:05d}"
+        items.append(
+            f'<dt><a name="item{i}">[{i}]</a> '
+            f'<a href="/abs/{arxiv_id}" title="Abstract" id="{arxiv_id}">arXiv:{arxiv_id}</a> '
+            f'[<a href="/pdf/{arxiv_id}" title="Download PDF" id="pdf-{arxiv_id}">pdf</a>, '
+            f'<a href="https://arxiv.org/html/{arxiv_id}v1" title="View HTML" id="html-{arxiv_id}">html</a>]</dt>'
+            f"<dd><div class='meta'><div class='list-title mathjax'><span class='descriptor'>Title:</span> "
+            f"Paper number {i} about deep learning</div>"
+            f"<div class='list-authors'><a href=\"/a/smith_j_1\">John Smith</a>, <a href=\"/a/doe_j_1\">Jane Doe</a></div>"
+            f"<div class='list-comments mathjax'><span class='descriptor'>Comments:</span> 10 pages</div>"
+            f"<div class='list-subjects'><span class='descriptor'>Subjects:</span> "
+            f"<span class=\"primary-subject\">Machine Learning (cs.LG)</span>; Computation and Language (cs.CL)</div></div></dd>"
+        )
+    return (f'<html><body><div class="paging">Total of {count} entries</div>'
+            f'<dl id="articles">{"".join(items)}</dl></body></html>')
+
+
+def content_page(index: int, sections: int, paragraphs: int, references: int) -> str:
+    """生成一篇论文的HTML正文页，index使每页内容不同"""
+    sentence = f"Paper {index} studies deep networks and reports results on several benchmarks. "
+    parts = [f'<html><body><div class="ltx_abstract"><p>{sentence * 5}</p></div>']
+    for s in range(sections):
+        parts.append(f'<section class="ltx_section"><h2 class="ltx_title_section">{s + 1} Section</h2>')
+        for _ in range(paragraphs):
+            parts.append(f'<p class="ltx_p">{sentence * 6}<span class="ltx_ref">[{s}]</span></p>')
+        parts.append("</section>")
+    parts.append('<section class="ltx_appendix"><h2 class="ltx_title_appendix">A Proof</h2>'
+                 f"<p>{sentence * 10}</p></section>")
+    parts.append('<section class="ltx_bibliography"><ul>')
+    for r in range(references):
+        parts.append(
+            f'<li class="ltx_bibitem" id="bib.bib{r}"><span class="ltx_tag">[{r}]</span>'
+            f'<span class="ltx_bibblock">A. Author and B. Author {r}.</span>'
+            f'<span class="ltx_bibblock">A study of item {r}.</span>'
+            f'<span class="ltx_bibblock">arXiv preprint arXiv:2301.{r:05d}, 2023.</span></li>'
+        )
+    parts.append("</ul></section></body></html>")
+    return "".join(parts)
+
+
+def run(parser: ArxivHtmlParser, pages: int, per_page: int, window: int,
+        sections: int, paragraphs: int, references: int):
+    """
+    执行一次模拟抓取
+    
+    Returns:
+        (tracemalloc峰值字节数, 正文页平均长度, 处理的论文数)
+    """
+    in_flight = deque(maxlen=window)
+    page_bytes = 0
+    processed = 0
+    
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for page in range(pages):
+            papers = parser.parse_paper_list_html(listing_page(page, per_page))
+            for paper in papers:
+                html = content_page(processed, sections, paragraphs, references)
+                page_bytes += len(html)
+                content = parser.parse_paper_content_html(html, paper.title)
+                paper.full_content = content.to_dict() if content else None
+                del html, content
+                in_flight.append(paper)
+                processed += 1
+            del papers
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return peak, page_bytes / max(processed, 1), processed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="解析内存回归基准")
+    parser.add_argument("-p", "--pages", type=int, default=10, help="列表页数 (默认: %(default)s)")
+    parser.add_argument("-n", "--per-page", type=int, default=25, help="每页论文数 (默认: %(default)s)")
+    parser.add_argument("-w", "--window", type=int, default=8, help="同时保留的在途论文数 (默认: %(default)s)")
+    parser.add_argument("--sections", type=int, default=12, help="正文页章节数 (默认: %(default)s)")
+    parser.add_argument("--paragraphs", type=int, default=8, help="每章段落数 (默认: %(default)s)")
+    parser.add_argument("--references", type=int, default=60, help="参考文献条数 (默认: %(default)s)")
+    parser.add_argument("--max-kb-per-paper", type=float, default=256,
+                        help="每篇在途论文允许的峰值内存KB，超过时失败 (默认: %(default)s)")
+    args = parser.parse_args(argv)
+    
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    peak, page_size, processed = run(ArxivHtmlParser(), args.pages, args.per_page, args.window,
+                                     args.sections, args.paragraphs, args.references)
+    
+    alive = args.window + args.per_page
+    per_paper_kb = peak / alive / 1024
+    print(f"{processed} 篇论文，正文页平均 {page_size / 1024:.0f} KB，同时存活最多 {alive} 篇")
+    print(f"tracemalloc峰值: {peak / 1e6:.1f} MB，每篇在途论文 {per_paper_kb:.0f} KB "
+          f"(阈值 {args.max_kb_per_paper:.0f} KB)")
+    if rss_before is not None:
+        # Linux上ru_maxrss单位为KB，只作参考，不参与判定
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"进程峰值RSS: {rss_after / 1024:.0f} MB (增长 {(rss_after - rss_before) / 1024:.0f} MB)")
+    
+    if per_paper_kb > args.max_kb_per_paper:
+        print("超过阈值：解析树可能没有被释放")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+文本工具微基准
+
+用 timeit 比较 utils.text_utils 中解析热路径函数的旧实现（逐个尝试未预编译的正则、
+正则替换空白、惰性正则拆分版本号）与当前实现的单次调用耗时，并检查两者结果一致。
+
+用法:
+    python benchmarks/bench_text_utils.py              # 每项取5轮最好成绩
+    python benchmarks/bench_text_utils.py -r 7 -n 20000
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_utils import (
+    clean_html_content,
+    extract_arxiv_id,
+    extract_total_count,
+    split_arxiv_version,
+    strip_arxiv_version,
+)
+
+
+# ---- 旧实现，与改动前的 utils/text_utils.py 相同 ----
+
+OLD_VERSION_PATTERN = re.compile(r"^(?P<base>.+?)(?:v(?P<version>\d+))?$")
+OLD_SUFFIX_PATTERN = re.compile(r"v\d+$")
+
+
+def old_extract_total_count(text):
+    if not text:
+        return None
+    patterns = [
+        r'Total of (\d+) entries',
+        r'showing first \d+ of (\d+) entries',
+        r'of (\d+) entries',
+        r'(\d+) entries',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def old_split_arxiv_version(arxiv_id):
+    match = OLD_VERSION_PATTERN.match(arxiv_id)
+    version = match.group("version")
+    return match.group("base"), int(version) if version else None
+
+
+def old_extract_arxiv_id(abs_link, strip_version=False):
+    if not abs_link:
+        return ""
+    path = abs_link.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    if "/abs/" in path:
+        arxiv_id = path.split("/abs/", 1)[1]
+    else:
+        arxiv_id = path.split("/")[-1]
+    if strip_version:
+        return old_split_arxiv_version(arxiv_id)[0]
+    return arxiv_id
+
+
+def old_clean_html_content(content):
+    if not content:
+        return ""
+    content = content.replace("Report issue for preceding element", "")
+    content = re.sub(r'\s+', ' ', content)
+    return content.strip()
+
+
+def old_strip_version(arxiv_id):
+    """watcher 和 citation_graph 原先各自的版本后缀去除方式"""
+    return OLD_SUFFIX_PATTERN.sub("", arxiv_id)
+
+
+# ---- 测试用例 ----
+
+PARAGRAPH = ("We propose a  new method\n\tfor learning representations.  "
+             "Report issue for preceding element   Results  improve\n on benchmarks. ")
+
+# 整个列表页HTML，"Total of" 位于约20KB之后
+LISTING_HTML = ("<html><body>" + "<dt><a href=\"/abs/2501.00001\">arXiv:2501.00001</a></dt>" * 400
+                + "<div class=\"paging\">Total of 1234 entries</div></body></html>")
+
+CASES = [
+    ("extract_total_count(Total of)", old_extract_total_count, extract_total_count,
+     ("Showing new listings ... Total of 1234 entries",)),
+    ("extract_total_count(showing first)", old_extract_total_count, extract_total_count,
+     ("Computer Science (showing first 50 of 768 entries)",)),
+    ("extract_total_count(listing page)", old_extract_total_count, extract_total_count,
+     (LISTING_HTML,)),
+    ("clean_html_content (2 KB)", old_clean_html_content, clean_html_content,
+     (PARAGRAPH * 16,)),
+    ("extract_arxiv_id", old_extract_arxiv_id, extract_arxiv_id,
+     ("https://arxiv.org/abs/2301.12345v2",)),
+    ("extract_arxiv_id(strip_version)", lambda link: old_extract_arxiv_id(link, True),
+     lambda link: extract_arxiv_id(link, strip_version=True),
+     ("https://arxiv.org/abs/2301.12345v2",)),
+    ("split_arxiv_version", old_split_arxiv_version, split_arxiv_version,
+     ("2301.12345v2",)),
+    ("strip version (watcher/graph)", old_strip_version, strip_arxiv_version,
+     ("2301.12345v2",)),
+]
+
+
+def per_call_ns(func, args, number: int, repeat: int) -> float:
+    """timeit 取 repeat 轮最好成绩，返回每次调用的纳秒数"""
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="文本工具微基准")
+    parser.add_argument("-n", "--number", type=int, default=10000, help="每轮调用次数 (默认: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="轮数，取最好成绩 (默认: %(default)s)")
+    args = parser.parse_args(argv)
+    
+    print(f"每项 {args.repeat} 轮 x {args.number} 次，取最好成绩 (ns/次)")
+    print(f"{'函数':<38}{'旧':>10}{'新':>10}{'加速':>8}")
+    for label, old, new, call_args in CASES:
+        if old(*call_args) != new(*call_args):
+            print(f"{label:<38}结果不一致: {old(*call_args)!r} != {new(*call_args)!r}")
+            return 1
+        old_ns = per_call_ns(old, call_args, args.number, args.repeat)
+        new_ns = per_call_ns(new, call_args, args.number, args.repeat)
+        print(f"{label:<38}{old_ns:>10.0f}{new_ns:>10.0f}{old_ns / new_ns:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+ArXiv Harvester 命令行入口
+
+按类别或学科分组抓取论文，并在论文到达时立即流式写出到标准输出或文件。
+
+用法示例:
+    python cli.py cs_new -n 100 --abstract -f jsonl
+    python cli.py -s 高能物理 -j 4 --rate 2 -f csv -o "out/{category}.csv"
+    python cli.py cs_recent --profile harvest.prof
+    python cli.py cs_new --abstract --queue jobs.db --enqueue     # 协调者
+    python cli.py --queue jobs.db --worker --rate 2               # 任意多个worker
+    python cli.py --queue jobs.db --collect -o papers.jsonl       # 汇总结果
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 仅导入轻量模块，requests/bs4/rich 在解析完参数后再按需导入以加快启动
+from config.settings import Config, get_env_config
+
+
+OUTPUT_FORMATS = ["jsonl", "json", "csv", "text"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    env_config = get_env_config()
+
+    parser = argparse.ArgumentParser(
+        prog="arxiv-harvester",
+        description="ArXiv论文采集工具：按类别抓取论文并流式输出",
+    )
+
+    # 抓取目标
+    parser.add_argument("categories", nargs="*", metavar="CATEGORY",
+                        help="要抓取的类别，如 cs_new、math_recent")
+    parser.add_argument("-s", "--subject", action="append", default=[],
+                        help="按学科分组抓取，可重复指定，如 -s 数学")
+    parser.add_argument("-n", "--max-papers", type=int, default=None,
+                        help="每个类别最多抓取的论文数")
+    parser.add_argument("--list-categories", action="store_true",
+                        help="列出所有支持的类别和学科分组后退出")
+
+    # 并发与速率
+    parser.add_argument("-j", "--workers", type=int, default=env_config["max_workers"],
+                        help="获取摘要/内容时的并发线程数 (默认: %(default)s)")
+    parser.add_argument("--rate", type=float, default=env_config["rate_limit"],
+                        help="每秒最多请求数，不指定则不限速")
+    parser.add_argument("--timeout", type=int, default=env_config["timeout"],
+                        help="请求超时时间，秒 (默认: %(default)s)")
+    parser.add_argument("--retries", type=int, default=env_config["max_retries"],
+                        help="最大重试次数 (默认: %(default)s)")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="整次抓取的时间预算，到期后停止并保留已输出的论文")
+    parser.add_argument("--resume-file", metavar="FILE",
+                        help="续抓进度文件：中断时写入各类别的续抓令牌，下次运行从中断处继续并追加到输出文件，"
+                             "全部完成后删除该文件")
+
+    # 富化选项
+    parser.add_argument("--abstract", action="store_true", help="获取论文摘要")
+    parser.add_argument("--content", action="store_true", help="获取论文HTML详细内容")
+    parser.add_argument("--prioritize", action="append", default=[], metavar="SUBJECT",
+                        help="优先富化这些学科的论文（如 cs.LG），可重复指定；先获取整个类别的列表再按优先级富化")
+    parser.add_argument("--dedup", action="store_true",
+                        help="跳过同一论文的旧版本和内容近似重复的论文")
+    parser.add_argument("--pdf-dir", metavar="DIR",
+                        help="把论文PDF下载到该目录，支持断点续传，已完成的文件会跳过")
+    parser.add_argument("--pdf-workers", type=int, default=Config.DOWNLOAD_WORKERS,
+                        help="同时进行的最大PDF下载数 (默认: %(default)s)")
+
+    # 输出选项
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="jsonl",
+                        help="输出格式 (默认: %(default)s)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="输出文件，'-'为标准输出；路径中的 {category} 会替换为类别名，"
+                             "实现按类别分文件输出")
+    parser.add_argument("--no-progress", action="store_true", help="不显示进度条")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="静默模式，只输出论文数据")
+    parser.add_argument("--log-level", default=env_config["log_level"],
+                        help="日志级别 (默认: %(default)s)")
+    parser.add_argument("--parse-cache", metavar="FILE",
+                        help="把解析结果按页面内容哈希缓存到该SQLite文件，相同页面不再重复解析")
+    parser.add_argument("--parse-memo", action="store_true",
+                        help=f"在内存中缓存最近 {Config.PARSE_MEMO_SIZE} 个页面的解析结果；"
+                             "与 --parse-cache 同时指定时使用磁盘缓存")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="将本次运行的cProfile数据写入文件")
+
+    # 监听模式
+    parser.add_argument("--watch", type=float, metavar="SECONDS", default=None,
+                        help="监听模式：按给定间隔持续轮询类别，只输出新论文")
+    parser.add_argument("--seen-file", metavar="FILE",
+                        help="监听模式下持久化已见ID的文件，重启后不会重复输出")
+    parser.add_argument("--emit-existing", action="store_true",
+                        help="监听模式首次轮询时也输出已有论文（--seen-file已有记录时首次轮询总是输出未见论文）")
+
+    # 工作队列模式
+    parser.add_argument("--queue", metavar="FILE",
+                        help="工作队列模式：任务和结果保存在该SQLite文件中，同一主机上的多个进程可共享"
+                             "（文件须位于本机文件系统）；--rate 在所有共享该文件的worker之间合计生效")
+    parser.add_argument("--enqueue", action="store_true", help="工作队列模式：入队类别任务")
+    parser.add_argument("--worker", action="store_true", help="工作队列模式：执行任务直到队列耗尽")
+    parser.add_argument("--collect", action="store_true", help="工作队列模式：输出已完成的论文")
+
+    return parser
+
+
+def resolve_categories(args, parser: argparse.ArgumentParser) -> list:
+    """合并类别和学科分组参数，保持顺序并去重"""
+    categories = list(args.categories)
+
+    for subject in args.subject:
+        subject_categories = Config.get_categories_by_subject(subject)
+        if not subject_categories:
+            parser.error(f"未知学科分组: {subject}")
+        categories.extend(subject_categories)
+
+    for category in categories:
+        if not Config.get_arxiv_url(category):
+            parser.error(f"不支持的类别: {category}")
+
+    return list(dict.fromkeys(categories))
+
+
+def list_categories():
+    """打印所有学科分组及其类别"""
+    for subject in Config.get_all_subjects():
+        print(f"{subject}:")
+        for category in Config.get_categories_by_subject(subject):
+            print(f"  {category:<20} {Config.get_category_description(category)}")
+
+
+def load_resume_file(path: str) -> dict:
+    """读取续抓进度文件，不存在时返回空进度"""
+    import json
+
+    if not os.path.exists(path):
+        return {"complete": [], "pending": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_resume_file(path: str, categories: list, previous: dict, states: dict):
+    """
+    写入续抓进度，全部类别完成时删除文件
+
+    本次没有运行到的类别（如中途被打断）保留运行前的续抓位置。
+
+    Args:
+        path: 进度文件路径
+        categories: 本次要抓取的全部类别
+        previous: 运行前的进度
+        states: 本次运行过的类别 -> HarvestState
+    """
+    import json
+
+    complete = [c for c in categories if c in previous["complete"] or (c in states and states[c].complete)]
+    pending = {c: token for c, token in previous["pending"].items() if c not in states and c not in complete}
+    pending.update((c, state.encode()) for c, state in states.items() if not state.complete)
+    if len(complete) == len(categories):
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"complete": complete, "pending": pending}, f, ensure_ascii=False, indent=2)
+
+
+def build_http_client(args, **kwargs):
+    """创建HTTP客户端，每个主机的连接池不小于同时发出请求的线程数"""
+    from utils.http_client import HttpClient
+
+    threads = args.workers + (args.pdf_workers if args.pdf_dir else 0)
+    return HttpClient(timeout=args.timeout, max_retries=args.retries,
+                      pool_maxsize=max(Config.HTTP_POOL_MAXSIZE, threads), **kwargs)
+
+
+def build_html_parser(args):
+    """
+    创建HTML解析器
+
+    解析缓存需要显式开启：--parse-cache 使用磁盘缓存，--parse-memo 使用内存缓存，
+    两者都未指定时不缓存，每个页面都重新解析。
+    """
+    from parsers.html_parser import ArxivHtmlParser
+    from parsers.memo import DiskParseMemo, ParseMemo
+
+    memo = None
+    if args.parse_cache:
+        memo = DiskParseMemo(args.parse_cache)
+    elif args.parse_memo:
+        memo = ParseMemo()
+    return ArxivHtmlParser(memo=memo)
+
+
+def close_html_parser(html_parser):
+    """关闭解析器的缓存，磁盘缓存需要关闭数据库连接"""
+    if hasattr(html_parser.memo, 'close'):
+        html_parser.memo.close()
+
+
+def build_deduplicator(args):
+    """指定 --dedup 时创建去重器"""
+    if not args.dedup:
+        return None
+    from analysis.dedup import Deduplicator
+
+    return Deduplicator()
+
+
+class OutputRouter:
+    """按类别把论文路由到对应的写入器"""
+
+    def __init__(self, output: str, output_format: str, append: bool = False):
+        """
+        初始化输出路由
+
+        Args:
+            output: 输出路径，'-'为标准输出，可包含 {category} 占位符
+            output_format: 输出格式
+            append: 追加到已有文件而不是覆盖，续抓时保留上一次运行输出的论文
+        """
+        self.output = output
+        self.output_format = output_format
+        self.append = append
+        self.split = "{category}" in output
+        self._writers = {}
+        self._files = []
+
+    def writer_for(self, category: str):
+        """获取类别对应的写入器，按需创建"""
+        from utils.stream_writer import get_writer
+
+        key = category if self.split else None
+        writer = self._writers.get(key)
+        if writer is None:
+            if self.output == "-":
+                stream = sys.stdout
+            else:
+                path = self.output.format(category=category) if self.split else self.output
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                stream = open(path, "a" if self.append else "w", encoding="utf-8", newline="")
+                self._files.append(stream)
+            writer = get_writer(self.output_format, stream)
+            self._writers[key] = writer
+        return writer
+
+    def close(self):
+        """关闭所有写入器和文件"""
+        for writer in self._writers.values():
+            writer.close()
+        for stream in self._files:
+            stream.close()
+
+
+def harvest(args, categories: list) -> int:
+    """
+    执行抓取并流式输出
+
+    Returns:
+        写出的论文总数
+    """
+    from core.scheduler import make_priority
+    from core.scraper import ArxivScraper
+    from models.harvest import HarvestState
+    from utils.cancellation import CancellationToken
+    from utils.output_formatter import OutputFormatter
+    from utils.progress import HarvestProgress
+
+    # 输出到标准输出时，进度和统计信息写到标准错误，避免混入数据
+    formatter = OutputFormatter(file=sys.stderr if args.output == "-" else None)
+    if args.quiet:
+        formatter.quiet_mode = True
+    if args.no_progress:
+        formatter.show_progress = False
+
+    http_client = build_http_client(args, rate_limit=args.rate)
+    tracker = HarvestProgress()
+    progress = formatter.create_harvest_progress(tracker)
+    downloader = None
+    if args.pdf_dir:
+        from core.downloader import PdfDownloader
+        downloader = PdfDownloader(args.pdf_dir, http_client, max_workers=args.pdf_workers)
+
+    token = CancellationToken(args.time_budget) if args.time_budget else None
+    resume = load_resume_file(args.resume_file) if args.resume_file else {"complete": [], "pending": {}}
+    # 续抓时追加输出，上一次运行写出的论文不会被覆盖
+    router = OutputRouter(args.output, args.format, append=bool(resume["complete"] or resume["pending"]))
+    html_parser = build_html_parser(args)
+    states = {}
+    total = 0
+    start_time = time.perf_counter()
+
+    try:
+        with ArxivScraper(http_client=http_client,
+                          html_parser=html_parser,
+                          max_workers=args.workers,
+                          deduplicator=build_deduplicator(args),
+                          progress=tracker) as scraper:
+            if progress:
+                progress.start()
+
+            for category in categories:
+                if token is not None and token.cancelled:
+                    break
+                if category in resume["complete"]:
+                    continue
+
+                writer = router.writer_for(category)
+
+                if args.prioritize and (args.abstract or args.content):
+                    papers = scraper.enrich_prioritized(
+                        scraper.get_papers_generator(category, max_papers=args.max_papers, token=token),
+                        include_abstract=args.abstract,
+                        include_content=args.content,
+                        priority=make_priority(key_subjects=args.prioritize),
+                        token=token,
+                    )
+                else:
+                    pending = resume["pending"].get(category)
+                    states[category] = HarvestState.decode(pending) if pending else HarvestState(category)
+                    papers = scraper.get_papers_generator(
+                        category,
+                        include_abstract=args.abstract,
+                        include_content=args.content,
+                        max_papers=args.max_papers,
+                        token=token,
+                        state=states[category],
+                    )
+
+                for paper in papers:
+                    writer.write(paper)
+                    if downloader:
+                        downloader.submit(paper)
+                    total += 1
+    finally:
+        # 出错或中断时也等待已提交的下载结束并关闭线程池
+        if downloader:
+            downloader.close()
+        if progress:
+            progress.stop()
+        router.close()
+        close_html_parser(html_parser)
+        if args.resume_file:
+            save_resume_file(args.resume_file, categories, resume, states)
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        "类别数": len(categories),
+        "论文数": total,
+        "耗时": f"{elapsed:.2f}秒",
+        "吞吐量": f"{total / elapsed:.2f}篇/秒" if elapsed > 0 else "-",
+    }
+    connections = http_client.connection_stats()
+    stats["连接复用"] = f"{connections['reused']}/{connections['requests']} ({connections['reuse_rate']:.0%})"
+    if token is not None and token.cancelled:
+        stats["状态"] = f"已中断: {token.reason}"
+    if downloader:
+        stats.update({
+            "PDF下载/续传": f"{downloader.stats['downloaded']}/{downloader.stats['resumed']}",
+            "PDF跳过/失败": f"{downloader.stats['skipped']}/{downloader.stats['failed']}",
+            "PDF速度": f"{downloader.mb_per_second:.2f} MB/s",
+        })
+    formatter.print_statistics(stats)
+    return total
+
+
+def watch(args, categories: list) -> int:
+    """
+    监听模式：持续轮询并流式输出新论文，直到被中断
+
+    Returns:
+        写出的论文总数
+    """
+    from core.scraper import ArxivScraper
+    from core.watcher import CategoryWatcher
+    from utils.output_formatter import OutputFormatter
+
+    formatter = OutputFormatter(file=sys.stderr if args.output == "-" else None)
+    if args.quiet:
+        formatter.quiet_mode = True
+
+    http_client = build_http_client(args, rate_limit=args.rate)
+    router = OutputRouter(args.output, args.format)
+    html_parser = build_html_parser(args)
+    total = 0
+
+    try:
+        with ArxivScraper(http_client=http_client,
+                          html_parser=html_parser,
+                          max_workers=args.workers,
+                          deduplicator=build_deduplicator(args)) as scraper:
+            watcher = CategoryWatcher(
+                categories,
+                scraper=scraper,
+                interval=args.watch,
+                include_abstract=args.abstract,
+                include_content=args.content,
+                emit_existing=args.emit_existing,
+                seen_path=args.seen_file,
+            )
+            formatter.print_info(f"开始监听 {len(categories)} 个类别，间隔 {args.watch} 秒")
+
+            for category, paper in watcher.watch_by_category():
+                router.writer_for(category).write(paper)
+                total += 1
+    finally:
+        router.close()
+        close_html_parser(html_parser)
+
+    return total
+
+
+def run_queue(args, categories: list) -> int:
+    """
+    工作队列模式，未指定 --enqueue/--worker/--collect 时依次执行全部三步
+
+    Returns:
+        输出的论文总数
+    """
+    from core.scraper import ArxivScraper
+    from core.work_queue import QueueWorker, WorkQueue, enqueue_categories, iter_queued_papers
+    from utils.http_client import SharedRateLimiter
+    from utils.output_formatter import OutputFormatter
+
+    formatter = OutputFormatter(file=sys.stderr if args.output == "-" else None)
+    if args.quiet:
+        formatter.quiet_mode = True
+    run_all = not (args.enqueue or args.worker or args.collect)
+    total = 0
+
+    with WorkQueue(args.queue) as queue:
+        if args.enqueue or run_all:
+            added = enqueue_categories(queue, categories, args.abstract, args.content, args.max_papers)
+            formatter.print_info(f"已入队 {added} 个类别任务")
+
+        if args.worker or run_all:
+            rate_limiter = SharedRateLimiter(args.queue, args.rate)
+            http_client = build_http_client(args, rate_limiter=rate_limiter)
+            html_parser = build_html_parser(args)
+            try:
+                with ArxivScraper(http_client=http_client, html_parser=html_parser) as scraper:
+                    stats = QueueWorker(queue, scraper).run()
+            finally:
+                rate_limiter.close()
+                close_html_parser(html_parser)
+            formatter.print_statistics({"完成": stats["completed"], "重试": stats["retried"],
+                                        "失败": stats["failed"], "租约丢失": stats["lost"]})
+
+        if args.collect or run_all:
+            router = OutputRouter(args.output, args.format)
+            try:
+                for category, paper in iter_queued_papers(queue, categories):
+                    router.writer_for(category).write(paper)
+                    total += 1
+            finally:
+                router.close()
+            for key, error in queue.failures():
+                formatter.print_warning(f"任务失败: {key}: {error}")
+
+    return total
+
+
+def main(argv=None) -> int:
+    """命令行主函数"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_categories:
+        list_categories()
+        return 0
+
+    if args.resume_file and args.prioritize:
+        parser.error("--resume-file 不能与 --prioritize 同时使用")
+    if args.resume_file and args.format == "json":
+        parser.error("--resume-file 不能与 -f json 同时使用：续抓时无法向已结束的JSON数组追加，请使用jsonl")
+    if args.watch and not args.queue:
+        unsupported = [flag for flag, value in (("--time-budget", args.time_budget),
+                                                ("--pdf-dir", args.pdf_dir),
+                                                ("--resume-file", args.resume_file)) if value is not None]
+        if unsupported:
+            parser.error(f"监听模式不支持 {', '.join(unsupported)}")
+
+    categories = resolve_categories(args, parser)
+    # 工作队列的worker和汇总步骤不需要类别
+    if not categories and not (args.queue and (args.worker or args.collect) and not args.enqueue):
+        parser.error("请至少指定一个类别或学科分组")
+
+    import logging
+    logging.basicConfig(level=args.log_level.upper(), format=Config.LOG_FORMAT, stream=sys.stderr)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.queue:
+            run_queue(args, categories)
+        elif args.watch:
+            watch(args, categories)
+        else:
+            harvest(args, categories)
+    except KeyboardInterrupt:
+        print("⚠️ 用户中断了抓取", file=sys.stderr)
+        return 130
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"性能分析数据已写入 {args.profile}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
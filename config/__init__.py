@@ -1,5 +1,9 @@
 """配置模块"""
 
 from config.settings import Config, get_env_config
+from config.taxonomy import TAXONOMY, Taxonomy, PrefixTrie, resolve_subject, subject_code_id, subject_name
 
-__all__ = ["Config", "get_env_config"] 
\ No newline at end of file
+__all__ = [
+    "Config", "get_env_config",
+    "TAXONOMY", "Taxonomy", "PrefixTrie", "resolve_subject", "subject_code_id", "subject_name",
+]
@@ -4,9 +4,11 @@
 包含ArXiv爬虫的所有配置常量和设置。
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import os
 
+from config.taxonomy import TAXONOMY, PrefixTrie
+
 
 class Config:
     """配置类，包含所有的配置常量"""
@@ -197,18 +199,86 @@ class Config:
     # 分页配置
     PAPERS_PER_PAGE = 50
     
+    # PDF下载配置
+    DOWNLOAD_WORKERS = 4  # 同时进行的最大下载数
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 流式写入块大小（字节）
+    
+    # HTML归档配置
+    ARCHIVE_COMPRESSION_LEVEL = 10  # zstd压缩级别
+    ARCHIVE_DICT_SIZE = 112640  # 训练的共享字典大小（字节）
+    REPARSE_CHUNK_SIZE = 32  # 批量重新解析时每个进程任务包含的页面数
+    
+    # 引用图分析配置
+    PAGERANK_DAMPING = 0.85  # PageRank阻尼系数
+    PAGERANK_TOLERANCE = 1e-6  # PageRank收敛阈值（L1范数）
+    PAGERANK_MAX_ITER = 100  # PageRank最大迭代次数
+    
+    # 全文检索配置
+    SEARCH_BM25_K1 = 1.2  # BM25词频饱和参数
+    SEARCH_BM25_B = 0.75  # BM25长度归一化参数
+    SEARCH_TITLE_WEIGHT = 2  # 标题词项的词频权重
+    SEARCH_BUFFER_DOCS = 10000  # 内存缓冲区达到该文档数时生成新段
+    SEARCH_HASH_CACHE_SIZE = 500000  # 词项哈希缓存的条目数上限
+    
+    # 去重配置
+    DEDUP_NUM_PERM = 64  # MinHash签名长度
+    DEDUP_BANDS = 16  # LSH分段数，每段 DEDUP_NUM_PERM/DEDUP_BANDS 行
+    DEDUP_THRESHOLD = 0.8  # 判定为近似重复的相似度阈值
+    DEDUP_SHINGLE_SIZE = 3  # 每个shingle包含的词数
+    
+    # 相关论文推荐配置
+    SIMILARITY_MIN_DF = 2  # 参与相似度计算的词项最少出现的论文数
+    SIMILARITY_MAX_DF = 0.5  # 参与相似度计算的词项最多出现的论文比例
+    SIMILARITY_BLOCK_BYTES = 64 * 1024 * 1024  # 每个稠密分数块的内存预算（字节）
+    SIMILARITY_QUERY_TERMS = 32  # 批量查询时每篇论文保留的最高权重词项数
+    SIMILARITY_TOP_K = 20  # 每篇论文预计算的相关论文数
+    
+    # 富化调度配置
+    SCHEDULER_AGING = 0.1  # 每等待一秒增加的有效优先级，防止低优先级论文饥饿
+    SCHEDULER_DEADLINE_SLACK = 5.0  # 距截止时间少于该秒数时按截止时间优先
+    SCHEDULER_SUBSCRIPTION_WEIGHT = 10.0  # 每个命中订阅增加的优先级
+    SCHEDULER_SUBJECT_WEIGHT = 5.0  # 属于重点学科时增加的优先级
+    
+    # 序列化配置
+    SERIALIZATION_CODEC = "auto"  # 批量导出论文的编码：auto/orjson/json/msgpack
+    
+    # 工作队列配置
+    QUEUE_LEASE_SECONDS = 120  # 任务租约时长（秒），worker每三分之一租约续租一次
+    QUEUE_MAX_ATTEMPTS = 5  # 单个任务的最大尝试次数
+    QUEUE_RETRY_DELAY = 10  # 失败重试的基础退避时间（秒），按尝试次数指数增长
+    QUEUE_BATCH_SIZE = 8  # worker每次认领的任务数
+    QUEUE_POLL_INTERVAL = 2.0  # 没有可认领任务时的轮询间隔（秒）
+    QUEUE_RESULT_PAGE_SIZE = 500  # 遍历结果时每次从数据库读取的行数
+    
+    # 监听模式配置
+    WATCH_INTERVAL = 300  # 每个类别的轮询间隔（秒）
+    WATCH_PAGE_SIZE = 2000  # 每次轮询请求的列表条目数
+    WATCH_SEEN_CAPACITY = 200000  # 已见ID集合的容量上限
+    WATCH_ENRICH_ATTEMPTS = 3  # 新论文富化不完整时最多尝试的轮询次数，之后按现有内容输出
+    
     # 请求配置
     REQUEST_TIMEOUT = 30
     REQUEST_HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
     
+    # 连接池配置
+    HTTP_POOL_CONNECTIONS = 10  # 缓存连接池的主机数
+    HTTP_POOL_MAXSIZE = 32  # 每个主机保留的最大keep-alive连接数，应不小于并发线程数
+    HTTP_POOL_BLOCK = False  # 连接全部占用时等待空闲连接，而不是新建用完即丢弃的连接
+    
     # 重试配置
     MAX_RETRIES = 3
     RETRY_DELAY = 1  # 秒
     
+    # 速率与并发配置
+    RATE_LIMIT = None  # 每秒最多请求数，None表示不限速
+    MAX_WORKERS = 1  # 富化（摘要/内容）并发线程数
+    
     # 解析配置
     HTML_PARSER = "html.parser"
+    PARSE_MEMO_SIZE = 1024  # 内存解析缓存的条目数上限
+    PARSE_MEMO_DISK_SIZE = 100000  # 磁盘解析缓存的条目数上限
     
     # 输出配置
     DEFAULT_OUTPUT_FORMAT = "json"
@@ -227,11 +297,37 @@ class Config:
     TABLE_MAX_WIDTH = 120  # 表格最大宽度
     TRUNCATE_TITLE_LENGTH = 60  # 标题截断长度
     TRUNCATE_ABSTRACT_LENGTH = 200  # 摘要截断长度
+    STREAM_TABLE_MAX_ROWS = 20  # 流式表格在屏幕上保留的最多行数
+    STREAM_TABLE_REFRESH_PER_SECOND = 4  # 流式表格每秒刷新次数
+    PROGRESS_REFRESH_PER_SECOND = 4  # 抓取进度每秒刷新次数
+    PROGRESS_RATE_WINDOW = 5.0  # 进度速率的平滑时间常数（秒）
+    
+    # 类别 -> 学科分组 的反查表和类别搜索前缀树，首次使用时建立
+    _category_subjects: Optional[Dict[str, str]] = None
+    _category_trie: Optional[PrefixTrie] = None
+    
+    @classmethod
+    def _split_subcategory(cls, category: str) -> Optional[Tuple[str, str]]:
+        """
+        解析子类别形式的类别名，如 "cs.LG_new"
+        
+        Returns:
+            (类别代码, "recent"或"new")，不是已知子类别时返回None
+        """
+        code, _, kind = category.rpartition("_")
+        if kind in ("recent", "new") and code in TAXONOMY:
+            return code, kind
+        return None
     
     @classmethod
     def get_arxiv_url(cls, category: str) -> str:
-        """获取指定类别的ArXiv URL"""
-        return cls.ARXIV_URLS.get(category)
+        """获取指定类别的ArXiv URL，除预置类别外也支持 "cs.LG_new" 形式的子类别"""
+        url = cls.ARXIV_URLS.get(category)
+        if url is None:
+            subcategory = cls._split_subcategory(category)
+            if subcategory:
+                url = TAXONOMY.listing_url(*subcategory)
+        return url
     
     @classmethod
     def get_all_categories(cls) -> list:
@@ -241,7 +337,14 @@ class Config:
     @classmethod
     def get_category_description(cls, category: str) -> str:
         """获取类别描述"""
-        return cls.CATEGORY_DESCRIPTIONS.get(category, "未知类别")
+        description = cls.CATEGORY_DESCRIPTIONS.get(category)
+        if description is None:
+            subcategory = cls._split_subcategory(category)
+            if subcategory is None:
+                return "未知类别"
+            code, kind = subcategory
+            description = f"{TAXONOMY.display(code)} {'最新论文' if kind == 'recent' else '新提交论文'}"
+        return description
     
     @classmethod
     def get_categories_by_subject(cls, subject: str) -> list:
@@ -255,33 +358,68 @@ class Config:
     
     @classmethod
     def search_categories(cls, keyword: str) -> list:
-        """根据关键词搜索类别"""
-        keyword = keyword.lower()
-        results = []
-        
-        for category, description in cls.CATEGORY_DESCRIPTIONS.items():
-            if keyword in category.lower() or keyword in description.lower():
-                results.append(category)
-        
-        return results
+        """
+        根据关键词搜索类别
+        
+        类别名或描述包含关键词（不区分大小写）即命中。子串查询走后缀前缀树，
+        耗时与关键词长度和结果数成正比。
+        
+        Args:
+            keyword: 关键词
+            
+        Returns:
+            按预置顺序排列的类别列表
+        """
+        if cls._category_trie is None:
+            trie = PrefixTrie()
+            for index, (category, description) in enumerate(cls.CATEGORY_DESCRIPTIONS.items()):
+                trie.insert(category.lower(), index, suffixes=True)
+                trie.insert(description.lower(), index, suffixes=True)
+            cls._category_trie = trie
+        
+        categories = list(cls.CATEGORY_DESCRIPTIONS)
+        return [categories[index] for index in sorted(cls._category_trie.search(keyword.lower()))]
+    
+    @classmethod
+    def search_subcategories(cls, keyword: str) -> list:
+        """
+        在完整学科分类中搜索代码或英文名称包含关键词的子类别
+        
+        Args:
+            keyword: 关键词，如 "learning" 或 "math.a"
+            
+        Returns:
+            子类别代码列表，加上 "_recent" / "_new" 后缀即可作为类别抓取
+        """
+        return TAXONOMY.search(keyword)
+    
+    @classmethod
+    def get_subject_of(cls, category: str) -> Optional[str]:
+        """获取类别所属的学科分组；子类别归入其所属归档的分组"""
+        if cls._category_subjects is None:
+            cls._category_subjects = {
+                cat: subject for subject, cats in cls.SUBJECT_GROUPS.items() for cat in cats
+            }
+        subject = cls._category_subjects.get(category)
+        if subject is None:
+            subcategory = cls._split_subcategory(category)
+            if subcategory:
+                subject = cls._category_subjects.get(f"{TAXONOMY.archive(subcategory[0])}_{subcategory[1]}")
+        return subject
     
     @classmethod
     def get_category_info(cls, category: str) -> dict:
         """获取类别的完整信息"""
-        if category not in cls.ARXIV_URLS:
+        url = cls.get_arxiv_url(category)
+        if url is None:
             return None
         
-        # 找到所属学科
-        subject = None
-        for subj, cats in cls.SUBJECT_GROUPS.items():
-            if category in cats:
-                subject = subj
-                break
+        subject = cls.get_subject_of(category)
         
         return {
             "category": category,
             "description": cls.get_category_description(category),
-            "url": cls.get_arxiv_url(category),
+            "url": url,
             "subject": subject,
             "type": "recent" if "recent" in category else "new"
         }
@@ -293,6 +431,8 @@ def get_env_config() -> Dict[str, Any]:
     return {
         "timeout": int(os.getenv("ARXIV_TIMEOUT", Config.REQUEST_TIMEOUT)),
         "max_retries": int(os.getenv("ARXIV_MAX_RETRIES", Config.MAX_RETRIES)),
+        "rate_limit": float(os.getenv("ARXIV_RATE_LIMIT")) if os.getenv("ARXIV_RATE_LIMIT") else Config.RATE_LIMIT,
+        "max_workers": int(os.getenv("ARXIV_MAX_WORKERS", Config.MAX_WORKERS)),
         "log_level": os.getenv("ARXIV_LOG_LEVEL", Config.LOG_LEVEL),
         "enable_rich_output": os.getenv("ARXIV_RICH_OUTPUT", str(Config.ENABLE_RICH_OUTPUT)).lower() == "true",
         "show_progress": os.getenv("ARXIV_SHOW_PROGRESS", str(Config.SHOW_PROGRESS)).lower() == "true",
@@ -0,0 +1,552 @@
+"""
+arXiv学科分类体系
+
+收录全部归档(archive)及其子类别代码和英文名称，导入时一次性建立反查表和前缀树：
+代码与紧凑整数编号互查、"Machine Learning (cs.LG)" 这类列表页学科字符串到代码的
+解析都是常数时间，按前缀补全和按关键词搜索的耗时只与输入长度和结果数有关。
+"""
+
+import sys
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# 归档代码 -> 英文名称
+ARCHIVES: Dict[str, str] = {
+    "astro-ph": "Astrophysics",
+    "cond-mat": "Condensed Matter",
+    "cs": "Computer Science",
+    "econ": "Economics",
+    "eess": "Electrical Engineering and Systems Science",
+    "gr-qc": "General Relativity and Quantum Cosmology",
+    "hep-ex": "High Energy Physics - Experiment",
+    "hep-lat": "High Energy Physics - Lattice",
+    "hep-ph": "High Energy Physics - Phenomenology",
+    "hep-th": "High Energy Physics - Theory",
+    "math": "Mathematics",
+    "math-ph": "Mathematical Physics",
+    "nlin": "Nonlinear Sciences",
+    "nucl-ex": "Nuclear Experiment",
+    "nucl-th": "Nuclear Theory",
+    "physics": "Physics",
+    "q-bio": "Quantitative Biology",
+    "q-fin": "Quantitative Finance",
+    "quant-ph": "Quantum Physics",
+    "stat": "Statistics",
+}
+
+# 子类别代码 -> 英文名称；没有子类别的归档以归档代码本身作为类别代码
+CATEGORIES: Dict[str, str] = {
+    # 天体物理
+    "astro-ph.CO": "Cosmology and Nongalactic Astrophysics",
+    "astro-ph.EP": "Earth and Planetary Astrophysics",
+    "astro-ph.GA": "Astrophysics of Galaxies",
+    "astro-ph.HE": "High Energy Astrophysical Phenomena",
+    "astro-ph.IM": "Instrumentation and Methods for Astrophysics",
+    "astro-ph.SR": "Solar and Stellar Astrophysics",
+    
+    # 凝聚态物理
+    "cond-mat.dis-nn": "Disordered Systems and Neural Networks",
+    "cond-mat.mes-hall": "Mesoscale and Nanoscale Physics",
+    "cond-mat.mtrl-sci": "Materials Science",
+    "cond-mat.other": "Other Condensed Matter",
+    "cond-mat.quant-gas": "Quantum Gases",
+    "cond-mat.soft": "Soft Condensed Matter",
+    "cond-mat.stat-mech": "Statistical Mechanics",
+    "cond-mat.str-el": "Strongly Correlated Electrons",
+    "cond-mat.supr-con": "Superconductivity",
+    
+    # 计算机科学
+    "cs.AI": "Artificial Intelligence",
+    "cs.AR": "Hardware Architecture",
+    "cs.CC": "Computational Complexity",
+    "cs.CE": "Computational Engineering, Finance, and Science",
+    "cs.CG": "Computational Geometry",
+    "cs.CL": "Computation and Language",
+    "cs.CR": "Cryptography and Security",
+    "cs.CV": "Computer Vision and Pattern Recognition",
+    "cs.CY": "Computers and Society",
+    "cs.DB": "Databases",
+    "cs.DC": "Distributed, Parallel, and Cluster Computing",
+    "cs.DL": "Digital Libraries",
+    "cs.DM": "Discrete Mathematics",
+    "cs.DS": "Data Structures and Algorithms",
+    "cs.ET": "Emerging Technologies",
+    "cs.FL": "Formal Languages and Automata Theory",
+    "cs.GL": "General Literature",
+    "cs.GR": "Graphics",
+    "cs.GT": "Computer Science and Game Theory",
+    "cs.HC": "Human-Computer Interaction",
+    "cs.IR": "Information Retrieval",
+    "cs.IT": "Information Theory",
+    "cs.LG": "Machine Learning",
+    "cs.LO": "Logic in Computer Science",
+    "cs.MA": "Multiagent Systems",
+    "cs.MM": "Multimedia",
+    "cs.MS": "Mathematical Software",
+    "cs.NA": "Numerical Analysis",
+    "cs.NE": "Neural and Evolutionary Computing",
+    "cs.NI": "Networking and Internet Architecture",
+    "cs.OH": "Other Computer Science",
+    "cs.OS": "Operating Systems",
+    "cs.PF": "Performance",
+    "cs.PL": "Programming Languages",
+    "cs.RO": "Robotics",
+    "cs.SC": "Symbolic Computation",
+    "cs.SD": "Sound",
+    "cs.SE": "Software Engineering",
+    "cs.SI": "Social and Information Networks",
+    "cs.SY": "Systems and Control",
+    
+    # 经济学
+    "econ.EM": "Econometrics",
+    "econ.GN": "General Economics",
+    "econ.TH": "Theoretical Economics",
+    
+    # 电气工程与系统科学
+    "eess.AS": "Audio and Speech Processing",
+    "eess.IV": "Image and Video Processing",
+    "eess.SP": "Signal Processing",
+    "eess.SY": "Systems and Control",
+    
+    # 广义相对论、高能物理、数学物理
+    "gr-qc": "General Relativity and Quantum Cosmology",
+    "hep-ex": "High Energy Physics - Experiment",
+    "hep-lat": "High Energy Physics - Lattice",
+    "hep-ph": "High Energy Physics - Phenomenology",
+    "hep-th": "High Energy Physics - Theory",
+    "math-ph": "Mathematical Physics",
+    
+    # 数学
+    "math.AC": "Commutative Algebra",
+    "math.AG": "Algebraic Geometry",
+    "math.AP": "Analysis of PDEs",
+    "math.AT": "Algebraic Topology",
+    "math.CA": "Classical Analysis and ODEs",
+    "math.CO": "Combinatorics",
+    "math.CT": "Category Theory",
+    "math.CV": "Complex Variables",
+    "math.DG": "Differential Geometry",
+    "math.DS": "Dynamical Systems",
+    "math.FA": "Functional Analysis",
+    "math.GM": "General Mathematics",
+    "math.GN": "General Topology",
+    "math.GR": "Group Theory",
+    "math.GT": "Geometric Topology",
+    "math.HO": "History and Overview",
+    "math.IT": "Information Theory",
+    "math.KT": "K-Theory and Homology",
+    "math.LO": "Logic",
+    "math.MG": "Metric Geometry",
+    "math.MP": "Mathematical Physics",
+    "math.NA": "Numerical Analysis",
+    "math.NT": "Number Theory",
+    "math.OA": "Operator Algebras",
+    "math.OC": "Optimization and Control",
+    "math.PR": "Probability",
+    "math.QA": "Quantum Algebra",
+    "math.RA": "Rings and Algebras",
+    "math.RT": "Representation Theory",
+    "math.SG": "Symplectic Geometry",
+    "math.SP": "Spectral Theory",
+    "math.ST": "Statistics Theory",
+    
+    # 非线性科学
+    "nlin.AO": "Adaptation and Self-Organizing Systems",
+    "nlin.CD": "Chaotic Dynamics",
+    "nlin.CG": "Cellular Automata and Lattice Gases",
+    "nlin.PS": "Pattern Formation and Solitons",
+    "nlin.SI": "Exactly Solvable and Integrable Systems",
+    
+    # 核物理
+    "nucl-ex": "Nuclear Experiment",
+    "nucl-th": "Nuclear Theory",
+    
+    # 物理学
+    "physics.acc-ph": "Accelerator Physics",
+    "physics.ao-ph": "Atmospheric and Oceanic Physics",
+    "physics.app-ph": "Applied Physics",
+    "physics.atm-clus": "Atomic and Molecular Clusters",
+    "physics.atom-ph": "Atomic Physics",
+    "physics.bio-ph": "Biological Physics",
+    "physics.chem-ph": "Chemical Physics",
+    "physics.class-ph": "Classical Physics",
+    "physics.comp-ph": "Computational Physics",
+    "physics.data-an": "Data Analysis, Statistics and Probability",
+    "physics.ed-ph": "Physics Education",
+    "physics.flu-dyn": "Fluid Dynamics",
+    "physics.gen-ph": "General Physics",
+    "physics.geo-ph": "Geophysics",
+    "physics.hist-ph": "History and Philosophy of Physics",
+    "physics.ins-det": "Instrumentation and Detectors",
+    "physics.med-ph": "Medical Physics",
+    "physics.optics": "Optics",
+    "physics.plasm-ph": "Plasma Physics",
+    "physics.pop-ph": "Popular Physics",
+    "physics.soc-ph": "Physics and Society",
+    "physics.space-ph": "Space Physics",
+    
+    # 定量生物学
+    "q-bio.BM": "Biomolecules",
+    "q-bio.CB": "Cell Behavior",
+    "q-bio.GN": "Genomics",
+    "q-bio.MN": "Molecular Networks",
+    "q-bio.NC": "Neurons and Cognition",
+    "q-bio.OT": "Other Quantitative Biology",
+    "q-bio.PE": "Populations and Evolution",
+    "q-bio.QM": "Quantitative Methods",
+    "q-bio.SC": "Subcellular Processes",
+    "q-bio.TO": "Tissues and Organs",
+    
+    # 定量金融
+    "q-fin.CP": "Computational Finance",
+    "q-fin.EC": "Economics",
+    "q-fin.GN": "General Finance",
+    "q-fin.MF": "Mathematical Finance",
+    "q-fin.PM": "Portfolio Management",
+    "q-fin.PR": "Pricing of Securities",
+    "q-fin.RM": "Risk Management",
+    "q-fin.ST": "Statistical Finance",
+    "q-fin.TR": "Trading and Market Microstructure",
+    
+    # 量子物理
+    "quant-ph": "Quantum Physics",
+    
+    # 统计学
+    "stat.AP": "Applications",
+    "stat.CO": "Computation",
+    "stat.ME": "Methodology",
+    "stat.ML": "Machine Learning",
+    "stat.OT": "Other Statistics",
+    "stat.TH": "Statistics Theory",
+}
+
+# 别名代码 -> 规范代码；两者在列表页上都会出现，因此都保留独立编号
+ALIASES: Dict[str, str] = {
+    "cs.NA": "math.NA",
+    "cs.SY": "eess.SY",
+    "math.IT": "cs.IT",
+    "math.MP": "math-ph",
+    "math.ST": "stat.TH",
+    "q-fin.EC": "econ.GN",
+}
+
+
+class PrefixTrie:
+    """
+    字符前缀树
+    
+    每个节点保存经过它的所有值，查询只需沿前缀走到对应节点，耗时与前缀长度成正比，
+    不必遍历子树。插入字符串的全部后缀即可支持子串查询。
+    """
+    
+    __slots__ = ("_root",)
+    
+    def __init__(self):
+        """创建空前缀树"""
+        self._root: Dict = {"": set()}
+    
+    def insert(self, key: str, value, suffixes: bool = False):
+        """
+        插入键
+        
+        Args:
+            key: 键字符串
+            value: 与键关联的值
+            suffixes: 是否同时插入键的全部后缀，用于子串查询
+        """
+        starts = range(len(key)) if suffixes else (0,)
+        self._root[""].add(value)
+        for start in starts:
+            node = self._root
+            for char in key[start:]:
+                node = node.setdefault(char, {"": set()})
+                node[""].add(value)
+    
+    def search(self, prefix: str) -> Set:
+        """
+        查找以prefix开头的键（插入后缀时为包含prefix的键）关联的值
+        
+        Returns:
+            值的集合，调用方不应修改
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node[""]
+
+
+class Taxonomy:
+    """
+    学科分类反查表和共享的学科驻留表
+    
+    类别按代码排序编号，编号从0开始且在同一份分类表下固定，可作为紧凑整数代码存储。
+    解析时遇到分类表之外的代码会追加登记，编号在进程内保持不变。
+    关键词搜索用的后缀前缀树占用十几MB内存，首次调用search()时才建立。
+    """
+    
+    # 学科行文本 -> 代码元组 缓存的条目数上限
+    SUBJECTS_CACHE_SIZE = 65536
+    
+    def __init__(self,
+                 categories: Dict[str, str] = CATEGORIES,
+                 archives: Dict[str, str] = ARCHIVES,
+                 aliases: Dict[str, str] = ALIASES):
+        """
+        建立反查表
+        
+        Args:
+            categories: 类别代码 -> 英文名称
+            archives: 归档代码 -> 英文名称
+            aliases: 别名代码 -> 规范代码
+        """
+        self.archives = dict(archives)
+        self.aliases = dict(aliases)
+        self.codes: List[str] = sorted(categories)
+        self.names: List[str] = [categories[code] for code in self.codes]
+        self._ids: Dict[str, int] = {code: index for index, code in enumerate(self.codes)}
+        self._archive_codes: Dict[str, List[str]] = {}
+        
+        # 代码、列表页显示字符串和唯一的英文名称都可直接查到代码
+        self._lookup: Dict[str, str] = {}
+        name_counts: Dict[str, int] = {}
+        for name in self.names:
+            name_counts[name.lower()] = name_counts.get(name.lower(), 0) + 1
+        
+        self._code_trie = PrefixTrie()
+        self._text_trie: Optional[PrefixTrie] = None
+        for index, (code, name) in enumerate(zip(self.codes, self.names)):
+            self._index(index, code, name, unique_name=name_counts[name.lower()] == 1)
+        
+        self._subjects_cache: Dict[str, Tuple[str, ...]] = {}
+        self._register_lock = threading.Lock()
+    
+    def _index(self, index: int, code: str, name: str, unique_name: bool = False):
+        """把一个类别加入反查表和前缀树"""
+        self._archive_codes.setdefault(self.archive(code), []).append(code)
+        display = f"{name} ({code})"
+        self._lookup[code] = code
+        self._lookup[code.lower()] = code
+        self._lookup[display] = code
+        self._lookup[display.lower()] = code
+        if unique_name:
+            self._lookup[name.lower()] = code
+        self._code_trie.insert(code.lower(), index)
+        if self._text_trie is not None:
+            self._insert_text(self._text_trie, index, code, name)
+    
+    @staticmethod
+    def _insert_text(trie: PrefixTrie, index: int, code: str, name: str):
+        """把代码和名称的全部后缀加入搜索树"""
+        trie.insert(code.lower(), index, suffixes=True)
+        trie.insert(name.lower(), index, suffixes=True)
+    
+    def __len__(self) -> int:
+        """类别数"""
+        return len(self.codes)
+    
+    def __contains__(self, code: str) -> bool:
+        """是否为已知类别代码"""
+        return code in self._ids
+    
+    def code_id(self, code: str) -> Optional[int]:
+        """类别代码对应的整数编号，未知代码返回None"""
+        return self._ids.get(code)
+    
+    def code_for(self, code_id: int) -> str:
+        """整数编号对应的类别代码"""
+        return self.codes[code_id]
+    
+    def name(self, code: str) -> Optional[str]:
+        """类别的英文名称，未知代码返回None"""
+        index = self._ids.get(code)
+        return self.names[index] if index is not None else None
+    
+    def display(self, code: str) -> str:
+        """列表页格式的学科字符串，如 "Machine Learning (cs.LG)"；未知代码原样返回"""
+        name = self.name(code)
+        return f"{name} ({code})" if name else code
+    
+    @staticmethod
+    def archive(code: str) -> str:
+        """类别所属的归档代码，如 cs.LG -> cs，hep-th -> hep-th"""
+        return code.split(".", 1)[0]
+    
+    def archive_codes(self, archive: str) -> List[str]:
+        """归档下的全部类别代码"""
+        return list(self._archive_codes.get(archive, []))
+    
+    def canonical(self, code: str) -> str:
+        """别名代码对应的规范代码，如 cs.NA -> math.NA"""
+        return self.aliases.get(code, code)
+    
+    def resolve(self, text: str) -> Optional[str]:
+        """
+        把学科字符串解析为类别代码
+        
+        依次尝试原样、小写和括号内代码三种查找，均为字典查找。
+        
+        Args:
+            text: 类别代码、"Machine Learning (cs.LG)" 形式的显示字符串，或唯一的英文名称
+            
+        Returns:
+            类别代码；无法识别时，若字符串以括号代码结尾则返回该代码，否则返回None
+        """
+        code = self._lookup.get(text)
+        if code is not None:
+            return code
+        
+        text = " ".join(text.split())
+        code = self._lookup.get(text.lower())
+        if code is not None:
+            return code
+        
+        if text.endswith(")"):
+            start = text.rfind("(")
+            if start >= 0:
+                inner = text[start + 1:-1].strip()
+                if inner:
+                    return self._lookup.get(inner, inner)
+        return None
+    
+    def intern(self, subject: str) -> str:
+        """
+        把学科字符串驻留为类别代码
+        
+        返回的代码字符串与分类表中的是同一个对象，大量论文共享同一份内存。
+        分类表之外但带括号代码的学科（如新设立的类别）会连同名称登记进表中。
+        
+        Args:
+            subject: 类别代码或 "Machine Learning (cs.LG)" 形式的显示字符串
+            
+        Returns:
+            类别代码；无法识别出代码时返回去除多余空白后的原字符串
+        """
+        code = self._lookup.get(subject)
+        if code is not None:
+            return code
+        
+        code = self.resolve(subject)
+        if code is None:
+            return sys.intern(" ".join(subject.split()))
+        if code not in self._ids:
+            text = " ".join(subject.split())
+            name = text[:text.rfind("(")].strip() if text.endswith(")") else ""
+            code = self.register(code, name or code)
+        else:
+            code = self.codes[self._ids[code]]
+        self._lookup[subject] = code
+        return code
+    
+    def intern_subjects(self, subjects_text: str, delimiter: str = ";") -> Tuple[str, ...]:
+        """
+        把列表页的整行学科文本驻留为代码元组
+        
+        同一组学科在一次抓取中反复出现，整行文本作为缓存键，命中时只需一次字典查找。
+        
+        Args:
+            subjects_text: 如 "Computation and Language (cs.CL); Machine Learning (cs.LG)"
+            delimiter: 分隔符
+            
+        Returns:
+            去重后的类别代码元组，保持原顺序
+        """
+        codes = self._subjects_cache.get(subjects_text)
+        if codes is None:
+            codes = tuple(dict.fromkeys(
+                self.intern(subject) for subject in subjects_text.split(delimiter) if subject.strip()
+            ))
+            if len(self._subjects_cache) >= self.SUBJECTS_CACHE_SIZE:
+                self._subjects_cache.clear()
+            self._subjects_cache[subjects_text] = codes
+        return codes
+    
+    def register(self, code: str, name: str) -> str:
+        """
+        登记分类表之外的类别
+        
+        Args:
+            code: 类别代码
+            name: 英文名称
+            
+        Returns:
+            表中的代码字符串（已存在时返回原有的）
+        """
+        with self._register_lock:
+            index = self._ids.get(code)
+            if index is None:
+                code = sys.intern(code)
+                index = len(self.codes)
+                self.codes.append(code)
+                self.names.append(name)
+                self._index(index, code, name)
+                self._ids[code] = index
+            return self.codes[index]
+    
+    def complete(self, prefix: str) -> List[str]:
+        """
+        按代码前缀补全，不区分大小写
+        
+        Args:
+            prefix: 代码前缀，如 "math.a"
+            
+        Returns:
+            按代码排序的类别代码列表
+        """
+        return [self.codes[index] for index in sorted(self._code_trie.search(prefix.lower()))]
+    
+    def search(self, keyword: str) -> List[str]:
+        """
+        搜索代码或英文名称包含关键词的类别，不区分大小写
+        
+        Returns:
+            按代码排序的类别代码列表
+        """
+        trie = self._text_trie
+        if trie is None:
+            # 与register共用锁，建树期间登记的类别不会遗漏
+            with self._register_lock:
+                if self._text_trie is None:
+                    trie = PrefixTrie()
+                    for index, (code, name) in enumerate(zip(self.codes, self.names)):
+                        self._insert_text(trie, index, code, name)
+                    self._text_trie = trie
+                trie = self._text_trie
+        return [self.codes[index] for index in sorted(trie.search(keyword.lower()))]
+    
+    def listing_url(self, code: str, kind: str = "new") -> str:
+        """
+        类别列表页URL
+        
+        Args:
+            code: 类别或归档代码
+            kind: "new" 或 "recent"
+        """
+        return f"https://arxiv.org/list/{code}/{kind}"
+
+
+# 默认分类表，导入时建立一次
+TAXONOMY = Taxonomy()
+
+
+def resolve_subject(text: str) -> Optional[str]:
+    """用默认分类表把学科字符串解析为类别代码，见 Taxonomy.resolve"""
+    return TAXONOMY.resolve(text)
+
+
+def subject_code_id(code: str) -> Optional[int]:
+    """类别代码在默认分类表中的整数编号"""
+    return TAXONOMY.code_id(code)
+
+
+def subject_name(code: str) -> Optional[str]:
+    """类别代码在默认分类表中的英文名称"""
+    return TAXONOMY.name(code)
+
+
+def intern_subject(subject: str) -> str:
+    """用默认分类表驻留学科字符串，见 Taxonomy.intern"""
+    return TAXONOMY.intern(subject)
+
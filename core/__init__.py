@@ -1,5 +1,29 @@
 """核心模块"""
 
 from core.scraper import ArxivScraper
+from core.watcher import CategoryWatcher, SeenIdSet
+from core.filters import Subscription, SubscriptionFilter, compile_subscriptions
+from core.downloader import PdfDownloader, DownloadResult
+from core.reparse import BulkReparser, JsonLinesSink
+from core.scheduler import EnrichmentScheduler, make_priority
+from core.work_queue import WorkQueue, QueueWorker, Task, enqueue_categories, iter_queued_papers
 
-__all__ = ["ArxivScraper"]
\ No newline at end of file
+__all__ = [
+    "ArxivScraper",
+    "CategoryWatcher",
+    "SeenIdSet",
+    "Subscription",
+    "SubscriptionFilter",
+    "compile_subscriptions",
+    "PdfDownloader",
+    "DownloadResult",
+    "BulkReparser",
+    "JsonLinesSink",
+    "EnrichmentScheduler",
+    "make_priority",
+    "WorkQueue",
+    "QueueWorker",
+    "Task",
+    "enqueue_categories",
+    "iter_queued_papers"
+]
@@ -0,0 +1,345 @@
+"""
+PDF下载器
+
+并发下载论文PDF，分块流式写入磁盘，支持断点续传和完整性校验。
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Generator, Iterable, Optional
+
+import requests
+
+from config.settings import Config
+from models.paper import Paper
+from utils.http_client import HttpClient
+
+
+@dataclass
+class DownloadResult:
+    """单个文件的下载结果"""
+    
+    arxiv_id: str
+    path: str
+    status: str  # downloaded / resumed / skipped / failed
+    size: int = 0
+    bytes_downloaded: int = 0
+    sha256: str = ""
+    elapsed: float = 0.0
+    error: str = ""
+    
+    @property
+    def ok(self) -> bool:
+        """是否成功（包括已存在而跳过）"""
+        return self.status != "failed"
+    
+    @property
+    def mb_per_second(self) -> float:
+        """本次传输速度 (MB/s)"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.bytes_downloaded / self.elapsed / (1024 * 1024)
+
+
+class PdfDownloader:
+    """
+    PDF下载器
+    
+    与HttpClient共用session和速率限制器。下载先写入 .part 文件，完成并校验后
+    原子重命名为最终文件，同时写出记录大小和SHA-256的 .sha256 旁路文件；
+    已有旁路文件的论文直接跳过。
+    """
+    
+    def __init__(self,
+                 output_dir: str,
+                 http_client: Optional[HttpClient] = None,
+                 max_workers: int = Config.DOWNLOAD_WORKERS,
+                 chunk_size: int = Config.DOWNLOAD_CHUNK_SIZE):
+        """
+        初始化下载器
+        
+        Args:
+            output_dir: PDF保存目录
+            http_client: HTTP客户端实例，通常与ArxivScraper共用
+            max_workers: 同时进行的最大下载数
+            chunk_size: 每次写入磁盘的块大小（字节）
+        """
+        self.output_dir = output_dir
+        self.http_client = http_client or HttpClient()
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # 限制排队中的任务数，避免上游生成器被一次性耗尽
+        self._slots = threading.BoundedSemaphore(self.max_workers * 2)
+        self._lock = threading.Lock()
+        self._pending = set()
+        # 保存路径 -> 进行中的Future，同一路径同时只下载一次
+        self._in_flight: Dict[str, Future] = {}
+        self._started_at = None
+        self.stats: Dict[str, float] = {
+            "downloaded": 0,
+            "resumed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "bytes": 0,
+        }
+    
+    def path_for(self, paper: Paper) -> str:
+        """论文PDF的保存路径，旧式ID中的 / 替换为 _"""
+        return os.path.join(self.output_dir, paper.arxiv_id.replace("/", "_") + ".pdf")
+    
+    def download(self, paper: Paper, expected_sha256: Optional[str] = None) -> DownloadResult:
+        """
+        下载单篇论文的PDF
+        
+        Args:
+            paper: Paper对象
+            expected_sha256: 可选，期望的SHA-256校验值
+            
+        Returns:
+            DownloadResult对象
+        """
+        path = self.path_for(paper)
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        
+        if not paper.pdf_link:
+            return self._record(DownloadResult(paper.arxiv_id, path, "failed", error="没有PDF链接"))
+        
+        completed = self._read_checksum_file(path)
+        if completed is not None:
+            size, sha256 = completed
+            if expected_sha256 is None or expected_sha256 == sha256:
+                return self._record(DownloadResult(paper.arxiv_id, path, "skipped", size=size, sha256=sha256))
+        
+        try:
+            result = self._fetch(paper, path, expected_sha256)
+        except Exception as e:
+            self.logger.error(f"下载PDF失败: {paper.pdf_link}, 错误: {e}")
+            result = DownloadResult(paper.arxiv_id, path, "failed", error=str(e))
+        return self._record(result)
+    
+    def submit(self, paper: Paper, expected_sha256: Optional[str] = None) -> Future:
+        """
+        提交后台下载任务，排队任务过多时阻塞
+        
+        同一保存路径已有未完成的下载时直接返回该任务的Future，避免两个线程
+        同时写同一个 .part 文件。
+        
+        Args:
+            paper: Paper对象
+            expected_sha256: 可选，期望的SHA-256校验值
+            
+        Returns:
+            结果为DownloadResult的Future
+        """
+        path = self.path_for(paper)
+        with self._lock:
+            existing = self._in_flight.get(path)
+        if existing is not None:
+            return existing
+        
+        self._slots.acquire()
+        with self._lock:
+            # 等待名额期间其他线程可能已提交了同一路径
+            existing = self._in_flight.get(path)
+            if existing is None:
+                try:
+                    future = self._executor.submit(self.download, paper, expected_sha256)
+                except BaseException:
+                    # 线程池已关闭等情况下任务没有提交，完成回调不会执行，需要在这里归还名额
+                    self._slots.release()
+                    raise
+                self._pending.add(future)
+                self._in_flight[path] = future
+        if existing is not None:
+            self._slots.release()
+            return existing
+        future.add_done_callback(partial(self._release, path))
+        return future
+    
+    def download_many(self, papers: Iterable[Paper]) -> Generator[DownloadResult, None, None]:
+        """
+        并发下载一批论文，按完成顺序产出结果
+        
+        输入可以是生成器，排队任务数受限，内存占用与输入规模无关。
+        
+        Args:
+            papers: 论文可迭代对象
+            
+        Yields:
+            DownloadResult对象
+        """
+        results = queue.Queue()
+        submitted = 0
+        received = 0
+        
+        for paper in papers:
+            self.submit(paper).add_done_callback(lambda future: results.put(future.result()))
+            submitted += 1
+            while not results.empty():
+                received += 1
+                yield results.get()
+        
+        while received < submitted:
+            received += 1
+            yield results.get()
+    
+    def wait(self):
+        """等待所有已提交的下载完成"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result()
+    
+    @property
+    def mb_per_second(self) -> float:
+        """自第一次下载以来的整体传输速度 (MB/s)"""
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.stats["bytes"] / elapsed / (1024 * 1024)
+    
+    def close(self):
+        """等待剩余下载并关闭线程池"""
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    def _fetch(self, paper: Paper, path: str, expected_sha256: Optional[str]) -> DownloadResult:
+        """执行下载，必要时从 .part 文件断点续传"""
+        part_path = path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        digest = hashlib.sha256()
+        if offset:
+            self._hash_file(part_path, digest)
+        
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        start_time = time.perf_counter()
+        
+        try:
+            response = self.http_client.get(paper.pdf_link, stream=True, headers=headers)
+        except requests.HTTPError as e:
+            # 416表示 .part 文件已经完整
+            if offset and e.response is not None and e.response.status_code == 416:
+                return self._finish(paper, path, part_path, offset, None, digest, expected_sha256, "resumed", 0, start_time)
+            raise
+        
+        with response:
+            resumed = offset > 0 and response.status_code == 206
+            if offset and not resumed:
+                # 服务器不支持Range，从头下载
+                offset = 0
+                digest = hashlib.sha256()
+            
+            expected_size = self._expected_size(response, offset)
+            bytes_downloaded = 0
+            
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    digest.update(chunk)
+                    bytes_downloaded += len(chunk)
+        
+        status = "resumed" if resumed else "downloaded"
+        return self._finish(paper, path, part_path, offset + bytes_downloaded, expected_size,
+                            digest, expected_sha256, status, bytes_downloaded, start_time)
+    
+    def _finish(self, paper, path, part_path, size, expected_size, digest,
+                expected_sha256, status, bytes_downloaded, start_time) -> DownloadResult:
+        """校验大小和校验值，通过后重命名为最终文件"""
+        elapsed = time.perf_counter() - start_time
+        sha256 = digest.hexdigest()
+        
+        if expected_size is not None and size != expected_size:
+            if size > expected_size:
+                os.remove(part_path)
+            return DownloadResult(paper.arxiv_id, path, "failed", size, bytes_downloaded, sha256, elapsed,
+                                  f"大小不符: 期望 {expected_size}, 实际 {size}")
+        
+        if expected_sha256 and sha256 != expected_sha256:
+            os.remove(part_path)
+            return DownloadResult(paper.arxiv_id, path, "failed", size, bytes_downloaded, sha256, elapsed,
+                                  "SHA-256校验失败")
+        
+        os.replace(part_path, path)
+        with open(path + ".sha256", "w", encoding="utf-8") as f:
+            f.write(f"{sha256} {size}\n")
+        
+        return DownloadResult(paper.arxiv_id, path, status, size, bytes_downloaded, sha256, elapsed)
+    
+    @staticmethod
+    def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+        """从Content-Range或Content-Length推断文件总大小"""
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            if total.isdigit():
+                return int(total)
+        
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit():
+            return int(content_length) + offset
+        return None
+    
+    def _hash_file(self, path: str, digest):
+        """分块计算已有文件的摘要"""
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+    
+    @staticmethod
+    def _read_checksum_file(path: str) -> Optional[tuple]:
+        """读取已完成下载的旁路校验文件，返回 (大小, SHA-256)"""
+        checksum_path = path + ".sha256"
+        if not (os.path.exists(path) and os.path.exists(checksum_path)):
+            return None
+        
+        try:
+            with open(checksum_path, "r", encoding="utf-8") as f:
+                sha256, size = f.read().split()
+            size = int(size)
+        except (OSError, ValueError):
+            return None
+        
+        if os.path.getsize(path) != size:
+            return None
+        return size, sha256
+    
+    def _record(self, result: DownloadResult) -> DownloadResult:
+        """累计统计信息"""
+        with self._lock:
+            self.stats[result.status] += 1
+            self.stats["bytes"] += result.bytes_downloaded
+        if result.status in ("downloaded", "resumed"):
+            self.logger.debug(f"下载完成: {result.arxiv_id}, {result.mb_per_second:.2f} MB/s")
+        return result
+    
+    def _release(self, path: str, future: Future):
+        """任务完成后释放排队名额"""
+        with self._lock:
+            self._pending.discard(future)
+            if self._in_flight.get(path) is future:
+                del self._in_flight[path]
+        self._slots.release()
@@ -0,0 +1,270 @@
+"""
+订阅过滤器
+
+把大量关键词/作者/学科订阅规则编译为一个匹配器，在论文流上逐篇报告命中的订阅。
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Dict, Generator, Iterable, List, Optional, Set, Tuple
+
+from config.taxonomy import TAXONOMY
+from models.paper import Paper
+
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """小写并合并空白字符"""
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+@lru_cache(maxsize=4096)
+def subject_keys(subject: str) -> Tuple[str, ...]:
+    """
+    学科的匹配键：英文名称和类别代码，最后一个为最具体的键
+    
+    论文的学科已驻留为代码，订阅中可以写代码(cs.LG)、完整显示字符串或英文名称，
+    三者都经分类表解析到同一组键上。
+    """
+    code = TAXONOMY.intern(subject)
+    name = TAXONOMY.name(code)
+    if name is None:
+        return (normalize_text(code),)
+    return normalize_text(name), code.lower()
+
+
+@dataclass
+class Subscription:
+    """订阅规则，任意一条关键词、作者或学科命中即视为匹配"""
+    
+    subscription_id: str
+    keywords: List[str] = field(default_factory=list)
+    authors: List[str] = field(default_factory=list)
+    subjects: List[str] = field(default_factory=list)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick多模式匹配自动机
+    
+    一次扫描文本即可找出所有模式的出现位置，耗时与文本长度和命中数相关，
+    与模式数量无关。匹配按整词进行，模式前后必须是非字母数字字符或文本边界。
+    """
+    
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+        self._built = False
+    
+    def add(self, pattern: str) -> int:
+        """
+        添加模式
+        
+        Args:
+            pattern: 已规范化的模式字符串
+            
+        Returns:
+            模式编号
+        """
+        if self._built:
+            raise RuntimeError("自动机已构建，不能再添加模式")
+        
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        
+        pattern_id = len(self._lengths)
+        self._lengths.append(len(pattern))
+        self._output[node].append(pattern_id)
+        return pattern_id
+    
+    def build(self):
+        """按广度优先计算失败链接"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+    
+    def search(self, text: str) -> Set[int]:
+        """
+        查找文本中整词出现的所有模式
+        
+        Args:
+            text: 已规范化的文本
+            
+        Returns:
+            命中的模式编号集合
+        """
+        if not self._built:
+            self.build()
+        
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        found = set()
+        node = 0
+        text_length = len(text)
+        
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            if output[node]:
+                # 模式结束后一个字符必须是词边界
+                if index + 1 < text_length and text[index + 1].isalnum():
+                    continue
+                for pattern_id in output[node]:
+                    start = index + 1 - lengths[pattern_id]
+                    if start == 0 or not text[start - 1].isalnum():
+                        found.add(pattern_id)
+        
+        return found
+
+
+class SubscriptionFilter:
+    """
+    编译后的订阅过滤器
+    
+    关键词编译为一个Aho-Corasick自动机，作者和学科使用哈希表查找，
+    单篇论文的匹配开销不随规则数增长。
+    """
+    
+    TEXT_FIELDS = ("title", "abstract")
+    
+    def __init__(self,
+                 subscriptions: Iterable[Subscription],
+                 text_fields: Tuple[str, ...] = TEXT_FIELDS):
+        """
+        初始化并编译订阅规则
+        
+        Args:
+            subscriptions: 订阅规则列表
+            text_fields: 关键词匹配的Paper文本字段
+        """
+        self.text_fields = text_fields
+        self._automaton = KeywordAutomaton()
+        self._keyword_owners: List[Set[str]] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._author_index: Dict[str, Set[str]] = {}
+        self._subject_index: Dict[str, Set[str]] = {}
+        self.subscription_count = 0
+        
+        for subscription in subscriptions:
+            self._add(subscription)
+        self._automaton.build()
+    
+    def _add(self, subscription: Subscription):
+        """把一条订阅加入各索引"""
+        owner = subscription.subscription_id
+        self.subscription_count += 1
+        
+        for keyword in subscription.keywords:
+            keyword = normalize_text(keyword)
+            if not keyword:
+                continue
+            pattern_id = self._keyword_ids.get(keyword)
+            if pattern_id is None:
+                pattern_id = self._automaton.add(keyword)
+                self._keyword_ids[keyword] = pattern_id
+                self._keyword_owners.append(set())
+            self._keyword_owners[pattern_id].add(owner)
+        
+        for author in subscription.authors:
+            self._author_index.setdefault(normalize_text(author), set()).add(owner)
+        
+        for subject in subscription.subjects:
+            # 订阅可以写代码(cs.LG)或完整名称，统一按最具体的键索引
+            self._subject_index.setdefault(subject_keys(subject)[-1], set()).add(owner)
+    
+    def match(self, paper: Paper) -> Set[str]:
+        """
+        计算论文命中的订阅
+        
+        Args:
+            paper: Paper对象
+            
+        Returns:
+            命中的订阅ID集合
+        """
+        matched = set()
+        
+        if self._keyword_owners:
+            text = " \n ".join(getattr(paper, name, "") or "" for name in self.text_fields)
+            for pattern_id in self._automaton.search(normalize_text(text)):
+                matched |= self._keyword_owners[pattern_id]
+        
+        if self._author_index:
+            for author in paper.authors:
+                owners = self._author_index.get(normalize_text(author))
+                if owners:
+                    matched |= owners
+        
+        if self._subject_index:
+            for subject in paper.subjects:
+                for key in subject_keys(subject):
+                    owners = self._subject_index.get(key)
+                    if owners:
+                        matched |= owners
+        
+        return matched
+    
+    def filter(self,
+               papers: Iterable[Paper],
+               only_matched: bool = True) -> Generator[Tuple[Paper, List[str]], None, None]:
+        """
+        在论文流上内联匹配
+        
+        Args:
+            papers: 论文可迭代对象，如 ArxivScraper.get_papers_generator 的输出
+            only_matched: 是否只产出至少命中一个订阅的论文
+            
+        Yields:
+            (Paper对象, 排序后的命中订阅ID列表)
+        """
+        for paper in papers:
+            matched = self.match(paper)
+            if matched or not only_matched:
+                yield paper, sorted(matched)
+
+
+def compile_subscriptions(rules: Iterable[Dict], text_fields: Optional[Tuple[str, ...]] = None) -> SubscriptionFilter:
+    """
+    从字典形式的规则编译过滤器
+    
+    Args:
+        rules: 形如 {"id": "ml", "keywords": [...], "authors": [...], "subjects": [...]} 的规则
+        text_fields: 关键词匹配的Paper文本字段
+        
+    Returns:
+        SubscriptionFilter实例
+    """
+    subscriptions = (
+        Subscription(
+            subscription_id=str(rule["id"]),
+            keywords=list(rule.get("keywords", [])),
+            authors=list(rule.get("authors", [])),
+            subjects=list(rule.get("subjects", [])),
+        )
+        for rule in rules
+    )
+    return SubscriptionFilter(subscriptions, text_fields or SubscriptionFilter.TEXT_FIELDS)
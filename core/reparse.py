@@ -0,0 +1,220 @@
+"""
+批量重新解析
+
+解析器更新后，用进程池把归档中的HTML页面重新解析为PaperContent。
+BeautifulSoup解析是CPU密集型的，多进程可以绕开GIL利用所有核心。
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import Config
+
+
+# 子进程内的全局状态，由 _init_worker 初始化
+_worker_archive = None
+_worker_parser = None
+
+
+def _init_worker(archive_path: str, parser_name: str):
+    """子进程初始化：只读打开归档并创建解析器"""
+    global _worker_archive, _worker_parser
+    from parsers.html_parser import ArxivHtmlParser
+    from storage.archive import HtmlArchive
+    
+    _worker_archive = HtmlArchive(archive_path, readonly=True)
+    _worker_parser = ArxivHtmlParser(parser_name)
+
+
+def _parse_chunk(chunk: List[Tuple[str, str]]) -> List[Tuple[str, Optional[bytes]]]:
+    """
+    在子进程中解析一批页面
+    
+    返回序列化后的JSON字节而不是Python对象，避免跨进程传输时的大量pickle开销。
+    """
+    results = []
+    for key, title in chunk:
+        try:
+            html = _worker_archive.get(key)
+            if html is None:
+                results.append((key, None))
+                continue
+            content = _worker_parser.parse_paper_content_html(html, title)
+            if content is None:
+                results.append((key, None))
+                continue
+            payload = json.dumps(content.to_dict(), ensure_ascii=False, separators=(",", ":"))
+            results.append((key, payload.encode("utf-8")))
+        except Exception as e:
+            logging.getLogger(__name__).error(f"重新解析失败: {key}, 错误: {e}")
+            results.append((key, None))
+    return results
+
+
+class JsonLinesSink:
+    """把重新解析的结果逐行写入JSON Lines文件"""
+    
+    def __init__(self, path: str):
+        """
+        初始化输出文件
+        
+        Args:
+            path: 输出文件路径
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "wb")
+    
+    def __call__(self, key: str, payload: bytes):
+        self.file.write(b'{"key":' + json.dumps(key).encode("utf-8") + b',"content":' + payload + b"}\n")
+    
+    def close(self):
+        """关闭输出文件"""
+        self.file.close()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+
+class BulkReparser:
+    """
+    基于进程池的批量重新解析器
+    
+    页面按块分发给子进程，子进程直接从归档读取HTML并返回序列化结果，
+    主进程只负责调度和把结果写入sink。同时在途的块数受限，内存占用与页面总数无关。
+    """
+    
+    def __init__(self,
+                 archive_path: str,
+                 workers: Optional[int] = None,
+                 chunk_size: int = Config.REPARSE_CHUNK_SIZE,
+                 parser: str = Config.HTML_PARSER):
+        """
+        初始化重新解析器
+        
+        Args:
+            archive_path: HtmlArchive路径前缀
+            workers: 进程数，默认为CPU核心数
+            chunk_size: 每个任务包含的页面数
+            parser: BeautifulSoup解析器类型
+        """
+        self.archive_path = archive_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.parser = parser
+        self.logger = logging.getLogger(__name__)
+        self.stats: Dict[str, float] = {"parsed": 0, "failed": 0, "elapsed": 0.0}
+    
+    def archived_keys(self) -> Iterator[str]:
+        """
+        遍历归档中每个版本的键
+        
+        无版本键通常只是指向最新版本的别名；没有任何带版本记录的论文只以无版本键保存，
+        这些键在扫描结束后补充产出。
+        """
+        from storage.archive import HtmlArchive, split_version
+        
+        with HtmlArchive(self.archive_path, readonly=True) as archive:
+            seen = set()
+            versioned_bases = set()
+            unversioned = []
+            for key in archive.store.keys():
+                if key in seen:
+                    continue
+                seen.add(key)
+                base, version = split_version(key)
+                if version is None:
+                    unversioned.append(key)
+                else:
+                    versioned_bases.add(base)
+                    yield key
+            for key in unversioned:
+                if key not in versioned_bases:
+                    yield key
+    
+    def iter_results(self,
+                     keys: Optional[Iterable[str]] = None,
+                     titles: Optional[Dict[str, str]] = None) -> Generator[Tuple[str, Optional[bytes]], None, None]:
+        """
+        并行重新解析，按完成顺序产出结果
+        
+        Args:
+            keys: 要解析的归档键，默认为归档中的全部版本
+            titles: 可选的 键 -> 标题 映射
+            
+        Yields:
+            (归档键, PaperContent的JSON字节)，解析失败时为 (归档键, None)
+        """
+        keys = self.archived_keys() if keys is None else keys
+        titles = titles or {}
+        self.stats = {"parsed": 0, "failed": 0, "elapsed": 0.0}
+        start_time = time.perf_counter()
+        max_in_flight = self.workers * 2
+        
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.archive_path, self.parser)) as executor:
+            in_flight = set()
+            for chunk in self._chunks(keys, titles):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done)
+                in_flight.add(executor.submit(_parse_chunk, chunk))
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+        
+        self.stats["elapsed"] = time.perf_counter() - start_time
+    
+    def run(self,
+            sink: Callable[[str, bytes], None],
+            keys: Optional[Iterable[str]] = None,
+            titles: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """
+        重新解析并把结果流式写入sink
+        
+        Args:
+            sink: 接收 (归档键, JSON字节) 的可调用对象，如 JsonLinesSink
+            keys: 要解析的归档键，默认为归档中的全部版本
+            titles: 可选的 键 -> 标题 映射
+            
+        Returns:
+            统计信息
+        """
+        for key, payload in self.iter_results(keys, titles):
+            if payload is not None:
+                sink(key, payload)
+        
+        elapsed = self.stats["elapsed"]
+        rate = self.stats["parsed"] / elapsed if elapsed > 0 else 0.0
+        self.logger.info(f"重新解析完成: {self.stats['parsed']} 成功, {self.stats['failed']} 失败, {rate:.1f} 页/秒")
+        return dict(self.stats)
+    
+    def _chunks(self, keys: Iterable[str], titles: Dict[str, str]) -> Iterator[List[Tuple[str, str]]]:
+        """把键分块"""
+        chunk = []
+        for key in keys:
+            chunk.append((key, titles.get(key, "")))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def _collect(self, futures) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """取出已完成块的结果并累计统计"""
+        for future in futures:
+            for key, payload in future.result():
+                self.stats["parsed" if payload is not None else "failed"] += 1
+                yield key, payload
@@ -0,0 +1,271 @@
+"""
+富化任务调度
+
+在获取摘要和详细内容之前按优先级和截止时间排序，使命中订阅或来自重点学科的
+论文最先完成。线程数固定，调度只决定下一个空闲线程执行哪篇论文。
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generator, Iterable, List, Optional
+
+from config.settings import Config
+from core.filters import SubscriptionFilter, subject_keys
+from models.paper import Paper
+from utils.cancellation import CancellationToken, HarvestCancelled
+
+
+PriorityFunction = Callable[[Paper], float]
+
+
+def make_priority(subscription_filter: Optional[SubscriptionFilter] = None,
+                  key_subjects: Iterable[str] = (),
+                  subscription_weight: float = Config.SCHEDULER_SUBSCRIPTION_WEIGHT,
+                  subject_weight: float = Config.SCHEDULER_SUBJECT_WEIGHT) -> PriorityFunction:
+    """
+    构造常用的优先级函数
+    
+    Args:
+        subscription_filter: 订阅过滤器，每命中一个订阅加 subscription_weight
+        key_subjects: 重点学科，代码(cs.LG)或完整名称均可，命中任一加 subject_weight
+        subscription_weight: 每个命中订阅的权重
+        subject_weight: 重点学科的权重
+        
+    Returns:
+        Paper -> 优先级 的函数，值越大越先执行
+    """
+    keys = {subject_keys(subject)[-1] for subject in key_subjects}
+    
+    def priority(paper: Paper) -> float:
+        score = 0.0
+        if subscription_filter is not None:
+            score += subscription_weight * len(subscription_filter.match(paper))
+        if keys and any(key in keys for subject in paper.subjects for key in subject_keys(subject)):
+            score += subject_weight
+        return score
+    
+    return priority
+
+
+@dataclass
+class _Job:
+    """调度中的单篇论文"""
+    
+    paper: Paper
+    include_abstract: bool
+    include_content: bool
+    priority: float
+    deadline: Optional[float]
+    enqueued: float
+    token: Optional[CancellationToken] = None
+    future: Future = field(default_factory=Future)
+    taken: bool = False
+
+
+class EnrichmentScheduler:
+    """
+    带优先级、截止时间和防饥饿的富化调度器
+    
+    每个任务同时进入两个堆：
+    - 优先级堆的键为 aging*入队时间 - 优先级，等待越久的任务有效优先级越高，
+      低优先级任务不会被无限推迟；
+    - 设置了截止时间的任务另入最早截止时间(EDF)堆，截止时间临近时优先执行。
+    任务被任一堆取出后标记为已取走，另一个堆中的副本惰性丢弃。
+    """
+    
+    def __init__(self,
+                 scraper,
+                 max_workers: int = Config.MAX_WORKERS,
+                 priority: Optional[PriorityFunction] = None,
+                 aging: float = Config.SCHEDULER_AGING,
+                 deadline_slack: float = Config.SCHEDULER_DEADLINE_SLACK):
+        """
+        初始化调度器
+        
+        Args:
+            scraper: ArxivScraper实例，使用其 get_paper_abstract / get_paper_content
+            max_workers: 并发线程数上限
+            priority: Paper -> 优先级 的函数，默认所有论文优先级相同（按到达顺序）
+            aging: 每等待一秒增加的有效优先级
+            deadline_slack: 距截止时间少于该秒数（再加上平均执行时间）时按截止时间优先
+        """
+        self.scraper = scraper
+        self.max_workers = max(1, max_workers)
+        self.priority = priority
+        self.aging = aging
+        self.deadline_slack = deadline_slack
+        self.logger = logging.getLogger(__name__)
+        self.stats: Dict[str, int] = {"completed": 0, "by_priority": 0, "by_deadline": 0, "missed_deadline": 0}
+        
+        self._priority_heap: List = []
+        self._deadline_heap: List = []
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._mean_service = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+    
+    def submit(self,
+               paper: Paper,
+               include_abstract: bool = True,
+               include_content: bool = False,
+               priority: Optional[float] = None,
+               deadline: Optional[float] = None,
+               token: Optional[CancellationToken] = None) -> Future:
+        """
+        提交一篇论文
+        
+        Args:
+            paper: Paper对象
+            include_abstract: 是否获取摘要
+            include_content: 是否获取详细内容
+            priority: 优先级，默认由优先级函数计算
+            deadline: 截止时间，距现在的秒数
+            token: 可选的取消令牌，取消后Future以HarvestCancelled结束
+            
+        Returns:
+            完成时结果为富化后Paper的Future
+        """
+        if priority is None:
+            priority = self.priority(paper) if self.priority else 0.0
+        now = time.monotonic()
+        job = _Job(paper, include_abstract, include_content, priority,
+                   now + deadline if deadline is not None else None, now, token)
+        
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("调度器已关闭")
+            sequence = next(self._sequence)
+            heapq.heappush(self._priority_heap, (self.aging * now - priority, sequence, job))
+            if job.deadline is not None:
+                heapq.heappush(self._deadline_heap, (job.deadline, sequence, job))
+            self._pending += 1
+            self._start_threads()
+            self._condition.notify()
+        return job.future
+    
+    def enrich(self,
+               papers: Iterable[Paper],
+               include_abstract: bool = True,
+               include_content: bool = False,
+               deadline: Optional[float] = None,
+               token: Optional[CancellationToken] = None) -> Generator[Paper, None, None]:
+        """
+        富化一批论文，按完成顺序产出
+        
+        先提交全部论文再开始产出，因此整批论文参与排序；高优先级的论文最先产出。
+        单篇论文富化失败时记录日志并产出未富化的论文，不影响同批其他论文。
+        
+        Args:
+            papers: 论文可迭代对象
+            include_abstract: 是否获取摘要
+            include_content: 是否获取详细内容
+            deadline: 整批的截止时间，距现在的秒数
+            token: 可选的取消令牌
+            
+        Yields:
+            富化后的Paper对象
+            
+        Raises:
+            HarvestCancelled: 被取消或超时，尚未开始的论文不再请求
+        """
+        futures = {self.submit(paper, include_abstract, include_content, deadline=deadline, token=token): paper
+                   for paper in papers}
+        try:
+            for future in as_completed(futures):
+                try:
+                    paper = future.result()
+                except HarvestCancelled:
+                    raise
+                except Exception:
+                    # 工作线程已记录错误，原样产出论文
+                    paper = futures[future]
+                yield paper
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的任务
+            for future in futures:
+                future.cancel()
+    
+    def close(self, wait: bool = True):
+        """停止接受新任务；wait为True时等待已提交的任务完成"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    def _start_threads(self):
+        """按需启动工作线程，数量不超过max_workers和待执行任务数"""
+        if len(self._threads) < min(self.max_workers, self._pending):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+    
+    def _next_job(self) -> Optional[_Job]:
+        """选出下一个任务，调用方须持有锁"""
+        while self._deadline_heap and self._deadline_heap[0][2].taken:
+            heapq.heappop(self._deadline_heap)
+        if self._deadline_heap:
+            deadline = self._deadline_heap[0][0]
+            if deadline - time.monotonic() <= self.deadline_slack + self._mean_service:
+                job = heapq.heappop(self._deadline_heap)[2]
+                job.taken = True
+                self.stats["by_deadline"] += 1
+                return job
+        
+        while self._priority_heap:
+            job = heapq.heappop(self._priority_heap)[2]
+            if not job.taken:
+                job.taken = True
+                self.stats["by_priority"] += 1
+                return job
+        return None
+    
+    def _worker(self):
+        """工作线程：循环取出任务并执行"""
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+                self._pending -= 1
+            
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            
+            start = time.monotonic()
+            try:
+                job.future.set_result(
+                    self.scraper._enrich_paper(job.paper, job.include_abstract, job.include_content, job.token)
+                )
+            except HarvestCancelled as e:
+                job.future.set_exception(e)
+            except Exception as e:
+                self.logger.error(f"富化失败: {job.paper.arxiv_id}, 错误: {e}")
+                job.future.set_exception(e)
+            finished = time.monotonic()
+            
+            with self._condition:
+                # 平均执行时间的指数滑动平均，用于判断截止时间是否临近
+                self._mean_service = 0.8 * self._mean_service + 0.2 * (finished - start)
+                self.stats["completed"] += 1
+                if job.deadline is not None and finished > job.deadline:
+                    self.stats["missed_deadline"] += 1
@@ -5,12 +5,22 @@ ArXiv爬虫核心类
 """
 
 import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from typing import List, Optional, Generator, Dict, Any
 
 from models.paper import Paper, PaperContent
+from models.harvest import HarvestResult, HarvestState
 from parsers.html_parser import ArxivHtmlParser
+from utils.cancellation import CancellationToken, HarvestCancelled
 from utils.http_client import HttpClient, get_html
+from utils.progress import HarvestProgress
 from utils.text_utils import generate_page_params
+from storage.archive import HtmlArchive, archive_key_from_url
+from storage.content_store import ContentStore
+from core.scheduler import EnrichmentScheduler, PriorityFunction
 from config.settings import Config
 
 
@@ -19,23 +29,43 @@ class ArxivScraper:
     
     def __init__(self, 
                  http_client: Optional[HttpClient] = None,
-                 html_parser: Optional[ArxivHtmlParser] = None):
+                 html_parser: Optional[ArxivHtmlParser] = None,
+                 max_workers: int = Config.MAX_WORKERS,
+                 archive: Optional[HtmlArchive] = None,
+                 deduplicator=None,
+                 content_store: Optional[ContentStore] = None,
+                 progress: Optional[HarvestProgress] = None):
         """
         初始化爬虫
         
         Args:
             http_client: HTTP客户端实例
             html_parser: HTML解析器实例
+            max_workers: 获取摘要/详细内容时的并发线程数
+            archive: 可选的HTML归档，获取详细内容时优先读取并保存原始页面
+            deduplicator: 可选的去重器（如 analysis.dedup.Deduplicator），
+                          旧版本和近似重复的论文不再富化和输出
+            content_store: 可选的详细内容存储，获取的详细内容写入其中，
+                           论文只保留延迟加载句柄
+            progress: 可选的进度记录，抓取过程中记录页数、论文数、富化队列深度和数据量，
+                      由 OutputFormatter.create_harvest_progress 显示
         """
         self.http_client = http_client or HttpClient()
         self.html_parser = html_parser or ArxivHtmlParser()
+        self.max_workers = max(1, max_workers)
+        self.archive = archive
+        self.deduplicator = deduplicator
+        self.content_store = content_store
+        self.progress = progress
         self.logger = logging.getLogger(__name__)
+        self._executor = None
     
     def get_papers_from_category(self, 
                                 category: str, 
                                 include_abstract: bool = False,
                                 include_content: bool = False,
-                                max_papers: Optional[int] = None) -> List[Paper]:
+                                max_papers: Optional[int] = None,
+                                token: Optional[CancellationToken] = None) -> List[Paper]:
         """
         从指定类别获取论文列表
         
@@ -44,76 +74,62 @@ class ArxivScraper:
             include_abstract: 是否包含摘要
             include_content: 是否包含详细内容
             max_papers: 最大论文数量限制
+            token: 可选的取消令牌，取消或超时后返回已抓取的论文
             
         Returns:
             论文列表
         """
-        url = Config.get_arxiv_url(category)
-        if not url:
-            raise ValueError(f"不支持的类别: {category}")
-        
-        self.logger.info(f"开始抓取类别 {category} 的论文")
-        
-        # 获取第一页以确定总数
-        html = self.http_client.get_text(url)
-        soup = self.html_parser.parse_html(html)
-        total_count = self.html_parser.extract_total_count(soup)
-        
-        if total_count is None:
-            self.logger.warning("无法获取论文总数")
-            total_count = Config.PAPERS_PER_PAGE
-        
-        self.logger.info(f"发现 {total_count} 篇论文")
-        
-        # 如果设置了最大数量限制
-        if max_papers and max_papers < total_count:
-            total_count = max_papers
-        
-        papers = []
-        collected_count = 0
+        return self.harvest(category, include_abstract, include_content, max_papers, token=token).papers
+    
+    def harvest(self,
+                category: str,
+                include_abstract: bool = False,
+                include_content: bool = False,
+                max_papers: Optional[int] = None,
+                time_budget: Optional[float] = None,
+                token: Optional[CancellationToken] = None,
+                resume: Optional[str] = None) -> HarvestResult:
+        """
+        在时间预算内抓取类别，超时或取消时返回已抓取的论文和续抓令牌
         
-        # 分页获取论文
-        for page_param in generate_page_params(total_count, Config.PAPERS_PER_PAGE):
-            if max_papers and collected_count >= max_papers:
-                break
-            
-            page_url = url + page_param
-            self.logger.debug(f"抓取页面: {page_url}")
+        Args:
+            category: 论文类别
+            include_abstract: 是否包含摘要
+            include_content: 是否包含详细内容
+            max_papers: 最大论文数量限制，续抓时按累计数量计算
+            time_budget: 时间预算（秒）
+            token: 可选的取消令牌，可从其他线程取消
+            resume: 上一次未完成抓取返回的续抓令牌
             
-            try:
-                page_html = self.http_client.get_text(page_url)
-                page_soup = self.html_parser.parse_html(page_html)
-                page_papers = self.html_parser.parse_paper_list(page_soup)
-                
-                for paper in page_papers:
-                    if max_papers and collected_count >= max_papers:
-                        break
-                    
-                    # 获取摘要
-                    if include_abstract and paper.abs_link:
-                        paper.abstract = self.get_paper_abstract(paper.abs_link)
-                    
-                    # 获取详细内容
-                    if include_content and paper.html_link:
-                        content = self.get_paper_content(paper.html_link, paper.title)
-                        if content:
-                            paper.full_content = content.to_dict()
-                    
-                    papers.append(paper)
-                    collected_count += 1
-                
-            except Exception as e:
-                self.logger.error(f"抓取页面失败: {page_url}, 错误: {e}")
-                continue
+        Returns:
+            HarvestResult对象，未完成时resume_token可传给下一次调用
+        """
+        if time_budget is not None:
+            token = token.child(time_budget) if token is not None else CancellationToken(time_budget)
+        state = HarvestState.decode(resume) if resume else HarvestState(category)
+        start_time = time.perf_counter()
+        
+        papers = list(self.get_papers_generator(category, include_abstract, include_content, max_papers,
+                                                token=token, state=state))
         
-        self.logger.info(f"成功抓取 {len(papers)} 篇论文")
-        return papers
+        result = HarvestResult(
+            category=category,
+            papers=papers,
+            complete=state.complete,
+            resume_token=None if state.complete else state.encode(),
+            reason=state.reason,
+            elapsed=time.perf_counter() - start_time,
+        )
+        self.logger.info(f"成功抓取 {len(papers)} 篇论文" + ("" if result.complete else f"（未完成: {result.reason}）"))
+        return result
     
     def get_papers_generator(self, 
                            category: str,
                            include_abstract: bool = False,
                            include_content: bool = False,
-                           max_papers: Optional[int] = None) -> Generator[Paper, None, None]:
+                           max_papers: Optional[int] = None,
+                           token: Optional[CancellationToken] = None,
+                           state: Optional[HarvestState] = None) -> Generator[Paper, None, None]:
         """
         生成器方式获取论文
         
@@ -122,98 +138,312 @@ class ArxivScraper:
             include_abstract: 是否包含摘要
             include_content: 是否包含详细内容
             max_papers: 最大论文数量限制
-            
+            token: 可选的取消令牌，取消或超时后在当前论文处停止，不抛出异常
+            state: 可选的抓取进度，从其记录的位置继续并随产出更新；
+                   生成器结束后 state.complete 表示是否抓取完毕
+                   
         Yields:
             Paper对象
         """
         url = Config.get_arxiv_url(category)
         if not url:
             raise ValueError(f"不支持的类别: {category}")
+        if state is None:
+            state = HarvestState(category)
+        elif state.category != category:
+            raise ValueError(f"续抓令牌属于类别 {state.category}，而不是 {category}")
         
-        self.logger.info(f"开始生成器方式抓取类别 {category} 的论文")
+        self.logger.info(f"开始抓取类别 {category} 的论文")
         
-        # 获取第一页以确定总数
-        html = self.http_client.get_text(url)
-        soup = self.html_parser.parse_html(html)
-        total_count = self.html_parser.extract_total_count(soup)
+        try:
+            if state.total_count is None:
+                # 获取第一页以确定总数，解析树用完即销毁
+                total_count = self.html_parser.extract_total_count_html(self._get_text(url, token))
+                if total_count is None:
+                    self.logger.warning("无法获取论文总数")
+                    total_count = Config.PAPERS_PER_PAGE
+                self.logger.info(f"发现 {total_count} 篇论文")
+                state.total_count = total_count
+            
+            total_count = state.total_count
+            if max_papers and max_papers < total_count:
+                total_count = max_papers
+            
+            # 分页获取论文，续抓时跳过已完成的页
+            first_page = state.skip // Config.PAPERS_PER_PAGE
+            if self.progress is not None:
+                self.progress.start_category(category, total_count, -(-total_count // Config.PAPERS_PER_PAGE),
+                                             papers_done=state.collected, pages_done=first_page)
+            for page_param in islice(generate_page_params(total_count, Config.PAPERS_PER_PAGE), first_page, None):
+                if max_papers and state.collected >= max_papers:
+                    break
+                
+                page_url = url + page_param
+                self.logger.debug(f"抓取页面: {page_url}")
+                
+                try:
+                    # 只保留解析出的Paper对象，页面文本和解析树不跨越yield存活
+                    page_papers = self.html_parser.parse_paper_list_html(self._get_text(page_url, token))
+                    if self.progress is not None:
+                        self.progress.page_done(len(page_papers))
+                    page_papers = self.deduplicate(page_papers)
+                    if state.done_ids:
+                        done = set(state.done_ids)
+                        page_papers = [paper for paper in page_papers if paper.arxiv_id not in done]
+                    if max_papers:
+                        page_papers = islice(page_papers, max_papers - state.collected)
+                    
+                    for paper in self.enrich_papers(page_papers, include_abstract, include_content, token):
+                        state.done_ids.append(paper.arxiv_id)
+                        state.collected += 1
+                        if self.progress is not None:
+                            self.progress.paper_done()
+                        yield paper
+                
+                except HarvestCancelled:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"抓取页面失败: {page_url}, 错误: {e}")
+                    if self.progress is not None:
+                        self.progress.page_done()
+                
+                state.skip += Config.PAPERS_PER_PAGE
+                state.done_ids = []
+            
+            state.complete = True
         
-        if total_count is None:
-            total_count = Config.PAPERS_PER_PAGE
+        except HarvestCancelled as e:
+            state.reason = str(e)
+            self.logger.warning(f"类别 {category} 的抓取已中断: {state.reason}，已产出 {state.collected} 篇论文")
+    
+    def deduplicate(self, papers: List[Paper]) -> List[Paper]:
+        """
+        配置了去重器时去掉旧版本和近似重复的论文，保持原顺序
         
-        if max_papers and max_papers < total_count:
-            total_count = max_papers
+        Args:
+            papers: 论文列表
+            
+        Returns:
+            去重后的论文列表；未配置去重器时原样返回
+        """
+        if self.deduplicator is None:
+            return papers
+        return list(self.deduplicator.filter(papers))
+    
+    def _enrich_paper(self, 
+                      paper: Paper,
+                      include_abstract: bool,
+                      include_content: bool,
+                      token: Optional[CancellationToken] = None) -> Paper:
+        """为单篇论文补充摘要和详细内容"""
+        if token is not None:
+            token.raise_if_cancelled()
         
-        collected_count = 0
+        # 获取摘要
+        if include_abstract and paper.abs_link:
+            paper.abstract = self.get_paper_abstract(paper.abs_link, token)
         
-        # 分页获取论文
-        for page_param in generate_page_params(total_count, Config.PAPERS_PER_PAGE):
-            if max_papers and collected_count >= max_papers:
-                break
+        # 获取详细内容
+        if include_content and paper.html_link:
+            content = self.get_paper_content(paper.html_link, paper.title, token)
+            if content:
+                if self.content_store is not None:
+                    self.content_store.put(paper.arxiv_id, content)
+                    paper.full_content = self.content_store.handle(paper.arxiv_id)
+                else:
+                    paper.full_content = content.to_dict()
+        
+        return paper
+    
+    def enrich_papers(self, 
+                      papers,
+                      include_abstract: bool = True,
+                      include_content: bool = False,
+                      token: Optional[CancellationToken] = None) -> Generator[Paper, None, None]:
+        """
+        按原顺序富化一批论文
+        
+        max_workers大于1时使用线程池并发请求，否则逐篇处理。适用于已从其他来源
+        （如监听器、语料文件）得到列表条目、只需补充摘要或详细内容的论文。
+        
+        Args:
+            papers: 论文列表或可迭代对象
+            include_abstract: 是否包含摘要
+            include_content: 是否包含详细内容
+            token: 可选的取消令牌
             
-            page_url = url + page_param
+        Yields:
+            富化后的Paper对象
             
+        Raises:
+            HarvestCancelled: 被取消或超时；尚未开始的论文不再请求
+        """
+        if not (include_abstract or include_content):
+            yield from papers
+            return
+        
+        yield from self._track_enrichment(
+            papers, lambda batch: self._enrich_batch(batch, include_abstract, include_content, token)
+        )
+    
+    def _enrich_batch(self, papers, include_abstract: bool, include_content: bool,
+                      token: Optional[CancellationToken] = None):
+        """
+        按原顺序富化，max_workers大于1时使用线程池
+        
+        与 PdfDownloader 相同，最多保留 2×max_workers 个未取走的任务：executor.map
+        会一次提交全部输入，生成器输入会被整个读完，取消时也要撤销大量排队任务。
+        """
+        if self.max_workers <= 1:
+            for paper in papers:
+                yield self._enrich_paper(paper, include_abstract, include_content, token)
+            return
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        
+        window = deque()
+        try:
+            for paper in papers:
+                window.append(self._executor.submit(
+                    self._enrich_paper, paper, include_abstract, include_content, token
+                ))
+                if len(window) >= self.max_workers * 2:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+        finally:
+            # 某篇论文抛出HarvestCancelled或调用方停止迭代时，撤销尚未开始的任务
+            for future in window:
+                future.cancel()
+    
+    def enrich_prioritized(self,
+                           papers,
+                           include_abstract: bool = True,
+                           include_content: bool = False,
+                           priority: Optional[PriorityFunction] = None,
+                           deadline: Optional[float] = None,
+                           token: Optional[CancellationToken] = None) -> Generator[Paper, None, None]:
+        """
+        按优先级富化一批论文，按完成顺序产出
+        
+        与按页富化不同，整批论文一起排序，命中订阅或重点学科的论文最先完成。
+        
+        Args:
+            papers: 论文可迭代对象，通常为不含摘要的列表结果
+            include_abstract: 是否包含摘要
+            include_content: 是否包含详细内容
+            priority: Paper -> 优先级 的函数，见 core.scheduler.make_priority
+            deadline: 截止时间，距现在的秒数，临近截止的论文优先执行
+            token: 可选的取消令牌，取消或超时后停止产出，不抛出异常
+            
+        Yields:
+            富化后的Paper对象
+        """
+        with EnrichmentScheduler(self, self.max_workers, priority) as scheduler:
             try:
-                page_html = self.http_client.get_text(page_url)
-                page_soup = self.html_parser.parse_html(page_html)
-                
-                for paper in self.html_parser.parse_papers_generator(page_soup):
-                    if max_papers and collected_count >= max_papers:
-                        break
-                    
-                    # 获取摘要
-                    if include_abstract and paper.abs_link:
-                        paper.abstract = self.get_paper_abstract(paper.abs_link)
-                    
-                    # 获取详细内容
-                    if include_content and paper.html_link:
-                        content = self.get_paper_content(paper.html_link, paper.title)
-                        if content:
-                            paper.full_content = content.to_dict()
-                    
-                    yield paper
-                    collected_count += 1
-                
-            except Exception as e:
-                self.logger.error(f"抓取页面失败: {page_url}, 错误: {e}")
-                continue
+                yield from self._track_enrichment(
+                    papers, lambda batch: scheduler.enrich(batch, include_abstract, include_content, deadline, token)
+                )
+            except HarvestCancelled as e:
+                self.logger.warning(f"按优先级富化已中断: {e}")
+    
+    def _track_enrichment(self, papers, enrich):
+        """
+        调用 enrich(papers) 富化论文，并记录富化队列深度
+        
+        论文被取出提交时计入队列，富化结果产出时移出；提前结束（取消或调用方停止迭代）时
+        尚未产出的论文一并移出，被取消的任务不会残留在队列深度中。
+        
+        Args:
+            papers: 待富化的论文可迭代对象
+            enrich: 论文可迭代对象 -> 富化结果可迭代对象
+        """
+        if self.progress is None:
+            yield from enrich(papers)
+            return
+        
+        pending = 0
+        
+        def submitted():
+            nonlocal pending
+            for paper in papers:
+                pending += 1
+                self.progress.enrich_queued()
+                yield paper
+        
+        try:
+            for paper in enrich(submitted()):
+                pending -= 1
+                self.progress.enrich_finished()
+                yield paper
+        finally:
+            if pending:
+                self.progress.enrich_finished(pending)
+    
+    def _get_text(self, url: str, token: Optional[CancellationToken] = None) -> str:
+        """获取页面文本，记录接收的数据量"""
+        text = self.http_client.get_text(url, token=token)
+        if self.progress is not None:
+            self.progress.received(len(text))
+        return text
     
-    def get_paper_abstract(self, abs_url: str) -> str:
+    def get_paper_abstract(self, abs_url: str, token: Optional[CancellationToken] = None) -> str:
         """
         获取论文摘要
         
         Args:
             abs_url: 摘要页面URL
+            token: 可选的取消令牌
             
         Returns:
             论文摘要
         """
         try:
-            html = self.http_client.get_text(abs_url)
-            soup = self.html_parser.parse_html(html)
-            return self.html_parser.parse_paper_abstract(soup)
+            html = self._get_text(abs_url, token)
+            return self.html_parser.parse_paper_abstract_html(html)
+        except HarvestCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"获取论文摘要失败: {abs_url}, 错误: {e}")
             return ""
     
-    def get_paper_content(self, html_url: str, title: str = "") -> Optional[PaperContent]:
+    def get_paper_content(self,
+                          html_url: str,
+                          title: str = "",
+                          token: Optional[CancellationToken] = None) -> Optional[PaperContent]:
         """
         获取论文详细内容
         
         Args:
             html_url: 论文HTML页面URL
             title: 论文标题
+            token: 可选的取消令牌
             
         Returns:
             PaperContent对象
         """
         try:
-            html = self.http_client.get_text(html_url)
-            soup = self.html_parser.parse_html(html)
-            return self.html_parser.parse_paper_content(soup, title)
+            html = self._get_content_html(html_url, token)
+            return self.html_parser.parse_paper_content_html(html, title)
+        except HarvestCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"获取论文详细内容失败: {html_url}, 错误: {e}")
             return None
     
+    def _get_content_html(self, html_url: str, token: Optional[CancellationToken] = None) -> str:
+        """获取HTML渲染页，配置了归档时先查归档，下载后写入归档"""
+        if self.archive is None:
+            return self._get_text(html_url, token)
+        
+        key = archive_key_from_url(html_url)
+        html = self.archive.get(key)
+        if html is None:
+            html = self._get_text(html_url, token)
+            self.archive.put(key, html)
+        return html
+    
     def get_supported_categories(self) -> List[str]:
         """
         获取支持的论文类别
@@ -225,6 +455,9 @@ class ArxivScraper:
     
     def close(self):
         """关闭爬虫，释放资源"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         if hasattr(self.http_client, 'close'):
             self.http_client.close()
     
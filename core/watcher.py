@@ -0,0 +1,342 @@
+"""
+类别监听器
+
+定时轮询类别列表页，只输出新出现的论文。
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+from config.settings import Config
+from core.scraper import ArxivScraper
+from models.paper import Paper
+from utils.text_utils import strip_arxiv_version
+
+
+class SeenIdSet:
+    """
+    紧凑的已见ArXiv ID集合
+    
+    新式ID (如 2301.12345) 直接编码为整数，旧式ID (如 hep-th/9901001) 使用
+    8字节哈希，集合中只保存整数。超过容量时按插入顺序淘汰最早的ID。
+    """
+    
+    def __init__(self, capacity: int = Config.WATCH_SEEN_CAPACITY):
+        """
+        初始化集合
+        
+        Args:
+            capacity: 最多保留的ID数量
+        """
+        self.capacity = capacity
+        self._ids = set()
+        self._order = deque()
+    
+    @staticmethod
+    def encode(arxiv_id: str) -> int:
+        """把ArXiv ID编码为整数，版本号不参与编码"""
+        base = strip_arxiv_version(arxiv_id)
+        prefix, _, number = base.partition(".")
+        if prefix.isdigit() and number.isdigit():
+            return int(prefix) * 100000 + int(number)
+        digest = hashlib.blake2b(base.encode("utf-8"), digest_size=8).digest()
+        # 最高位置1，避免与新式ID编码冲突
+        return int.from_bytes(digest, "big") | (1 << 63)
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return self.encode(arxiv_id) in self._ids
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, arxiv_id: str) -> bool:
+        """
+        添加ID
+        
+        Returns:
+            ID此前未见过时返回True
+        """
+        key = self.encode(arxiv_id)
+        if key in self._ids:
+            return False
+        
+        self._ids.add(key)
+        self._order.append(key)
+        while len(self._order) > self.capacity:
+            self._ids.discard(self._order.popleft())
+        return True
+    
+    def save(self, path: str):
+        """把集合保存为紧凑的二进制文件"""
+        data = array("Q", self._order)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            data.tofile(f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str, capacity: int = Config.WATCH_SEEN_CAPACITY) -> "SeenIdSet":
+        """从文件加载集合，文件不存在时返回空集合"""
+        seen = cls(capacity)
+        if not os.path.exists(path):
+            return seen
+        
+        data = array("Q")
+        with open(path, "rb") as f:
+            data.frombytes(f.read())
+        for key in data[-capacity:]:
+            if key not in seen._ids:
+                seen._ids.add(key)
+                seen._order.append(key)
+        return seen
+
+
+class CategoryWatcher:
+    """
+    类别监听器
+    
+    按固定间隔轮询每个类别的列表页。请求携带ETag/Last-Modified，页面未变化时
+    不解析；页面变化时先用正则提取全部ID，只从原始文本中切出新ID的条目片段并解析，
+    因此解析开销与新论文数量成正比。
+    
+    新论文处理完成后才记为已见并保存页面的ETag/Last-Modified。解析或富化抛出异常时
+    两者都不更新，下次轮询重新获取整页并再次发现这些论文；请求的摘要或详细内容为空
+    （获取失败）的论文暂不输出，下次轮询重试，最多 Config.WATCH_ENRICH_ATTEMPTS 次后
+    按现有内容输出。重试期间论文若滚出 page_size 窗口则不会再被发现。
+    """
+    
+    def __init__(self,
+                 categories: Iterable[str],
+                 scraper: Optional[ArxivScraper] = None,
+                 interval: float = Config.WATCH_INTERVAL,
+                 seen: Optional[SeenIdSet] = None,
+                 include_abstract: bool = False,
+                 include_content: bool = False,
+                 emit_existing: bool = False,
+                 page_size: int = Config.WATCH_PAGE_SIZE,
+                 seen_path: Optional[str] = None):
+        """
+        初始化监听器
+        
+        Args:
+            categories: 要监听的类别列表
+            scraper: 爬虫实例，用于请求、解析和富化
+            interval: 每个类别的轮询间隔（秒）
+            seen: 已见ID集合，可从文件加载以便重启后继续
+            include_abstract: 是否为新论文获取摘要
+            include_content: 是否为新论文获取详细内容
+            emit_existing: 首次轮询时是否输出已存在的论文，False时只记录为已见；
+                           只对空的已见集合生效，提供了seen或从seen_path加载到已见ID时，
+                           首次轮询发现的未见ID是停止期间提交的新论文，照常输出
+            page_size: 每次轮询请求的列表条目数
+            seen_path: 已见ID的持久化文件，提供时启动时加载并在每次发现新ID后保存
+        """
+        self.categories = list(categories)
+        for category in self.categories:
+            if not Config.get_arxiv_url(category):
+                raise ValueError(f"不支持的类别: {category}")
+        
+        self.scraper = scraper or ArxivScraper()
+        self.interval = interval
+        self.seen_path = seen_path
+        resumed = seen is not None
+        if seen is None:
+            seen = SeenIdSet.load(seen_path) if seen_path else SeenIdSet()
+            resumed = len(seen) > 0
+        self.seen = seen
+        self.include_abstract = include_abstract
+        self.include_content = include_content
+        self.emit_existing = emit_existing
+        self.page_size = page_size
+        self.logger = logging.getLogger(__name__)
+        
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        # 继续已有的已见集合时不需要初始化，首次轮询的未见ID都是新论文
+        self._primed = set(self.categories) if resumed else set()
+        self._enrich_attempts: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+    
+    def poll_category(self, category: str) -> List[Paper]:
+        """
+        轮询单个类别
+        
+        Args:
+            category: 论文类别
+            
+        Returns:
+            新论文列表，按页面顺序排列
+        """
+        url = f"{Config.get_arxiv_url(category)}?skip=0&show={self.page_size}"
+        validators = self._validators.get(category, {})
+        
+        response = self.scraper.http_client.get_conditional(
+            url,
+            etag=validators.get("etag"),
+            last_modified=validators.get("last_modified"),
+        )
+        if response is None:
+            return []
+        
+        # 处理成功后才保存，出错时下次轮询不会因304而跳过这些新论文
+        new_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        
+        html = response.text
+        parser = self.scraper.html_parser
+        new_ids = [arxiv_id for arxiv_id in parser.extract_listing_ids(html) if arxiv_id not in self.seen]
+        
+        if category not in self._primed:
+            self._primed.add(category)
+            if not self.emit_existing:
+                for arxiv_id in new_ids:
+                    self.seen.add(arxiv_id)
+                self._save_seen()
+                self._validators[category] = new_validators
+                self.logger.info(f"类别 {category} 初始化完成，记录 {len(new_ids)} 个已有ID")
+                return []
+        
+        if not new_ids:
+            self._validators[category] = new_validators
+            return []
+        
+        parsed = parser.parse_new_papers_html(html, self.seen.__contains__)
+        del html
+        papers = []
+        found = set()
+        for paper in parsed:
+            # 跨列表(交叉提交)可能在同一页重复出现
+            if paper.arxiv_id not in found:
+                found.add(paper.arxiv_id)
+                papers.append(paper)
+        
+        self.logger.info(f"类别 {category} 发现 {len(papers)} 篇新论文")
+        enriched = list(self.scraper.enrich_papers(
+            self.scraper.deduplicate(papers), self.include_abstract, self.include_content
+        ))
+        
+        # 富化不完整的论文不输出也不记为已见，保留旧的验证器使下次轮询重新获取整页
+        retry = {paper.arxiv_id for paper in enriched if self._needs_retry(paper)}
+        for paper in papers:
+            if paper.arxiv_id not in retry:
+                self.seen.add(paper.arxiv_id)
+        self._save_seen()
+        if retry:
+            self.logger.warning(f"类别 {category} 有 {len(retry)} 篇论文富化不完整，下次轮询重试")
+        else:
+            self._validators[category] = new_validators
+        return [paper for paper in enriched if paper.arxiv_id not in retry]
+    
+    def _needs_retry(self, paper: Paper) -> bool:
+        """
+        请求的摘要或详细内容为空且未用完尝试次数时返回True
+        
+        get_paper_abstract/get_paper_content 出错时只记录日志并返回空值，
+        因此以结果是否为空判断富化是否失败。
+        """
+        missing = ((self.include_abstract and paper.abs_link and not paper.abstract)
+                   or (self.include_content and paper.html_link and paper.full_content is None))
+        if not missing:
+            self._enrich_attempts.pop(paper.arxiv_id, None)
+            return False
+        
+        attempts = self._enrich_attempts.pop(paper.arxiv_id, 0) + 1
+        if attempts >= Config.WATCH_ENRICH_ATTEMPTS:
+            self.logger.warning(f"论文 {paper.arxiv_id} 富化 {attempts} 次仍不完整，按现有内容输出")
+            return False
+        self._enrich_attempts[paper.arxiv_id] = attempts
+        return True
+    
+    def poll_once(self) -> List[Paper]:
+        """依次轮询所有类别一次"""
+        papers = []
+        for category in self.categories:
+            papers.extend(self._safe_poll(category))
+        return papers
+    
+    def watch(self, max_polls: Optional[int] = None) -> Generator[Paper, None, None]:
+        """
+        持续监听，逐篇产出新论文
+        
+        Args:
+            max_polls: 每个类别最多轮询次数，None表示直到调用stop()
+            
+        Yields:
+            新论文的Paper对象
+        """
+        for _, paper in self.watch_by_category(max_polls):
+            yield paper
+    
+    def watch_by_category(self, max_polls: Optional[int] = None) -> Generator[Tuple[str, Paper], None, None]:
+        """
+        持续监听，逐篇产出 (类别, 新论文)
+        
+        Args:
+            max_polls: 每个类别最多轮询次数，None表示直到调用stop()
+            
+        Yields:
+            (类别, Paper对象) 元组
+        """
+        self._stop_event.clear()
+        next_poll = {category: 0.0 for category in self.categories}
+        poll_counts = {category: 0 for category in self.categories}
+        
+        while not self._stop_event.is_set():
+            pending = [c for c in self.categories if max_polls is None or poll_counts[c] < max_polls]
+            if not pending:
+                return
+            
+            category = min(pending, key=next_poll.get)
+            wait = next_poll[category] - time.monotonic()
+            if wait > 0 and self._stop_event.wait(wait):
+                return
+            
+            next_poll[category] = time.monotonic() + self.interval
+            poll_counts[category] += 1
+            for paper in self._safe_poll(category):
+                yield category, paper
+    
+    def run(self,
+            callback: Optional[Callable[[Paper], None]] = None,
+            queue=None,
+            max_polls: Optional[int] = None):
+        """
+        持续监听，把新论文交给回调函数或队列
+        
+        Args:
+            callback: 每篇新论文调用一次的函数
+            queue: 具有put方法的队列，如 queue.Queue
+            max_polls: 每个类别最多轮询次数
+        """
+        if callback is None and queue is None:
+            raise ValueError("callback和queue至少需要提供一个")
+        
+        for paper in self.watch(max_polls):
+            if callback is not None:
+                callback(paper)
+            if queue is not None:
+                queue.put(paper)
+    
+    def stop(self):
+        """停止监听，可从其他线程调用"""
+        self._stop_event.set()
+    
+    def _save_seen(self):
+        """持久化已见ID集合"""
+        if self.seen_path:
+            self.seen.save(self.seen_path)
+    
+    def _safe_poll(self, category: str) -> List[Paper]:
+        """轮询类别，出错时记录日志并返回空列表"""
+        try:
+            return self.poll_category(category)
+        except Exception as e:
+            self.logger.error(f"轮询类别失败: {category}, 错误: {e}")
+            return []
@@ -0,0 +1,586 @@
+"""
+工作队列
+
+基于SQLite的持久化租约队列，用于单台主机上的多进程分布式抓取。协调者只负责
+入队类别任务，任意数量的worker认领任务、定期续租并把结果写回同一个数据库。
+任务和结果都以确定的键去重，重复执行同一任务只会覆盖出相同的结果。
+
+数据库使用WAL日志模式，WAL依赖各进程共享的内存映射索引文件（-shm），
+在NFS、SMB等网络文件系统上无法保证锁和可见性，可能损坏数据库。因此队列文件
+必须位于本机文件系统，所有worker运行在同一台主机上。
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import Config
+from models.paper import Paper
+from utils.text_utils import generate_page_params
+
+
+# 任务状态
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# 后续任务：(类型, 键, 载荷)
+TaskSpec = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+@dataclass
+class Task:
+    """被认领的任务"""
+    
+    id: int
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+    lease_owner: str
+    lease_expires: float
+
+
+class WorkQueue:
+    """
+    SQLite租约队列
+    
+    认领任务时在写事务中把任务标记为leased并设置租约到期时间；worker崩溃或
+    失联时租约过期，任务自动回到可认领状态。完成任务时只有仍持有租约的worker
+    能提交结果，结果、后续任务和完成标记在同一事务中写入。
+    """
+    
+    def __init__(self,
+                 path: str,
+                 lease_seconds: float = Config.QUEUE_LEASE_SECONDS,
+                 max_attempts: int = Config.QUEUE_MAX_ATTEMPTS,
+                 retry_delay: float = Config.QUEUE_RETRY_DELAY):
+        """
+        打开或创建队列数据库
+        
+        Args:
+            path: SQLite数据库文件路径，所有worker必须访问同一文件；
+                  文件须位于本机文件系统，不支持网络文件系统上的多主机共享
+            lease_seconds: 租约时长（秒），worker需在到期前续租
+            max_attempts: 单个任务的最大尝试次数，超过后标记为失败
+            retry_delay: 失败重试的基础退避时间（秒），按尝试次数指数增长
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        # WAL只在单台主机上可靠，见模块说明
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL UNIQUE,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " not_before REAL NOT NULL DEFAULT 0,"
+            " last_error TEXT);"
+            "CREATE INDEX IF NOT EXISTS tasks_ready ON tasks(status, not_before);"
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " subject TEXT NOT NULL,"
+            " value TEXT);"
+            "CREATE INDEX IF NOT EXISTS results_subject ON results(kind, subject);"
+        )
+    
+    @contextmanager
+    def _transaction(self):
+        """写事务，BEGIN IMMEDIATE 保证同一时刻只有一个进程在修改"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+    
+    def enqueue(self, kind: str, key: str, payload: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        入队单个任务，相同键的任务已存在时忽略
+        
+        Returns:
+            是否新入队
+        """
+        return self.enqueue_many([(kind, key, payload)]) == 1
+    
+    def enqueue_many(self, tasks: Iterable[TaskSpec]) -> int:
+        """
+        批量入队
+        
+        Args:
+            tasks: (类型, 键, 载荷) 可迭代对象
+            
+        Returns:
+            新入队的任务数
+        """
+        with self._transaction() as connection:
+            return self._insert_tasks(connection, tasks)
+    
+    def claim(self, worker_id: str, limit: int = 1, kinds: Optional[Sequence[str]] = None) -> List[Task]:
+        """
+        认领可执行的任务：待执行且已过退避时间，或租约已过期
+        
+        Args:
+            worker_id: worker标识
+            limit: 最多认领的任务数
+            kinds: 只认领这些类型的任务，None表示全部
+            
+        Returns:
+            认领到的任务列表，可能为空
+        """
+        now = time.time()
+        query = ("SELECT id, kind, key, payload, attempts FROM tasks "
+                 "WHERE ((status = ? AND not_before <= ?) OR (status = ? AND lease_expires < ?))")
+        params: List[Any] = [PENDING, now, LEASED, now]
+        if kinds:
+            query += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        
+        with self._transaction() as connection:
+            rows = connection.execute(query, params).fetchall()
+            expires = now + self.lease_seconds
+            connection.executemany(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                "WHERE id = ?",
+                [(LEASED, worker_id, expires, row[0]) for row in rows]
+            )
+        return [Task(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1, worker_id, expires) for row in rows]
+    
+    def heartbeat(self, tasks: Sequence[Task]) -> List[Task]:
+        """
+        为仍持有租约的任务续租
+        
+        Returns:
+            已丢失租约的任务（已过期并被其他worker认领或已被完成）
+        """
+        if not tasks:
+            return []
+        expires = time.time() + self.lease_seconds
+        lost = []
+        with self._transaction() as connection:
+            for task in tasks:
+                cursor = connection.execute(
+                    "UPDATE tasks SET lease_expires = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                    (expires, task.id, LEASED, task.lease_owner)
+                )
+                if cursor.rowcount:
+                    task.lease_expires = expires
+                else:
+                    lost.append(task)
+        return lost
+    
+    def complete(self,
+                 task: Task,
+                 results: Optional[Iterable[Tuple[str, str, str, Any]]] = None,
+                 follow_up: Optional[Iterable[TaskSpec]] = None) -> bool:
+        """
+        完成任务，在同一事务中写入结果和后续任务
+        
+        Args:
+            task: 认领到的任务
+            results: (结果键, 结果类型, 论文ID, JSON可序列化的值) 可迭代对象，相同键覆盖
+            follow_up: 后续任务
+            
+        Returns:
+            是否提交成功；租约已丢失时不写入任何内容并返回False
+        """
+        with self._transaction() as connection:
+            if not self._owns(connection, task):
+                return False
+            if results:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO results (key, kind, subject, value) VALUES (?, ?, ?, ?)",
+                    [(key, kind, subject, json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+                     for key, kind, subject, value in results]
+                )
+            if follow_up:
+                self._insert_tasks(connection, follow_up)
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, last_error = NULL "
+                "WHERE id = ?",
+                (DONE, task.id)
+            )
+        return True
+    
+    def fail(self, task: Task, error: str) -> str:
+        """
+        记录任务失败，未超过最大尝试次数时按指数退避重新排队
+        
+        Returns:
+            任务的新状态，租约已丢失时返回空字符串
+        """
+        with self._transaction() as connection:
+            if not self._owns(connection, task):
+                return ""
+            if task.attempts >= self.max_attempts:
+                status, not_before = FAILED, 0.0
+            else:
+                status, not_before = PENDING, time.time() + self.retry_delay * 2 ** (task.attempts - 1)
+            connection.execute(
+                "UPDATE tasks SET status = ?, not_before = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = ? WHERE id = ?",
+                (status, not_before, error, task.id)
+            )
+        return status
+    
+    def release(self, task: Task) -> bool:
+        """放弃租约且不计入尝试次数，用于worker正常退出时交还未开始的任务"""
+        with self._transaction() as connection:
+            if not self._owns(connection, task):
+                return False
+            connection.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ?",
+                (PENDING, task.id)
+            )
+        return True
+    
+    def retry_failed(self, kind: Optional[str] = None) -> int:
+        """
+        把失败的任务重新排队并清零尝试次数
+        
+        Returns:
+            重新排队的任务数
+        """
+        query = "UPDATE tasks SET status = ?, attempts = 0, not_before = 0 WHERE status = ?"
+        params: List[Any] = [PENDING, FAILED]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        with self._transaction() as connection:
+            return connection.execute(query, params).rowcount
+    
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+    
+    def unfinished(self) -> int:
+        """待执行和执行中的任务数"""
+        counts = self.counts()
+        return counts[PENDING] + counts[LEASED]
+    
+    def failures(self) -> List[Tuple[str, str]]:
+        """失败任务的 (键, 最后一次错误)"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT key, last_error FROM tasks WHERE status = ? ORDER BY id", (FAILED,)
+            ).fetchall()
+    
+    def iter_results(self, kind: str) -> Generator[Tuple[str, Any], None, None]:
+        """
+        按写入顺序遍历某类结果
+        
+        按rowid分页读取，每次只持有 Config.QUEUE_RESULT_PAGE_SIZE 行，读取之间释放锁。
+        
+        Yields:
+            (论文ID, 值)
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT rowid, subject, value FROM results WHERE kind = ? AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?", (kind, last_rowid, Config.QUEUE_RESULT_PAGE_SIZE)
+                ).fetchall()
+            for last_rowid, subject, value in rows:
+                yield subject, json.loads(value)
+            if len(rows) < Config.QUEUE_RESULT_PAGE_SIZE:
+                return
+    
+    def get_result(self, key: str) -> Any:
+        """按键读取结果，不存在时返回None"""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._connection.close()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    @staticmethod
+    def _owns(connection: sqlite3.Connection, task: Task) -> bool:
+        """任务是否仍由该租约持有"""
+        row = connection.execute("SELECT status, lease_owner FROM tasks WHERE id = ?", (task.id,)).fetchone()
+        return row is not None and row[0] == LEASED and row[1] == task.lease_owner
+    
+    @staticmethod
+    def _insert_tasks(connection: sqlite3.Connection, tasks: Iterable[TaskSpec]) -> int:
+        """插入任务，相同键忽略"""
+        before = connection.total_changes
+        connection.executemany(
+            "INSERT OR IGNORE INTO tasks (kind, key, payload, status) VALUES (?, ?, ?, ?)",
+            [(kind, key, json.dumps(payload or {}, ensure_ascii=False), PENDING) for kind, key, payload in tasks]
+        )
+        return connection.total_changes - before
+
+
+def enqueue_categories(queue: WorkQueue,
+                       categories: Iterable[str],
+                       include_abstract: bool = False,
+                       include_content: bool = False,
+                       max_papers: Optional[int] = None) -> int:
+    """
+    协调者入口：为每个类别入队一个类别任务
+    
+    类别任务由worker展开为列表页任务，协调者本身不发出任何请求。
+    
+    Returns:
+        新入队的任务数
+    """
+    tasks = []
+    for category in categories:
+        if not Config.get_arxiv_url(category):
+            raise ValueError(f"不支持的类别: {category}")
+        tasks.append(("category", f"category:{category}", {
+            "category": category,
+            "include_abstract": include_abstract,
+            "include_content": include_content,
+            "max_papers": max_papers,
+        }))
+    return queue.enqueue_many(tasks)
+
+
+def iter_queued_papers(queue: WorkQueue,
+                       categories: Optional[Iterable[str]] = None) -> Generator[Tuple[str, Paper], None, None]:
+    """
+    从队列结果组装论文，摘要和详细内容按论文ID合并
+    
+    交叉列出的论文在它出现的每个类别中各产出一次。摘要和详细内容在遍历时逐篇按键
+    查询，内存中只保留当前一页论文结果。
+    
+    Args:
+        queue: 工作队列
+        categories: 只产出这些类别的论文，None表示全部
+        
+    Yields:
+        (类别, Paper对象)
+    """
+    selected = set(categories) if categories else None
+    for arxiv_id, data in queue.iter_results("paper"):
+        if selected is not None and data["category"] not in selected:
+            continue
+        paper = Paper.from_dict(data["paper"])
+        abstract = queue.get_result(f"abstract:{arxiv_id}")
+        if abstract is not None:
+            paper.abstract = abstract
+        content = queue.get_result(f"content:{arxiv_id}")
+        if content is not None:
+            paper.full_content = content
+        yield data["category"], paper
+
+
+class QueueWorker:
+    """
+    队列worker
+    
+    循环认领任务并执行，后台线程定期为执行中的任务续租。请求和解析复用
+    ArxivScraper的HTTP客户端、解析器和归档；多个进程共享速率限制时应为
+    HTTP客户端配置 SharedRateLimiter。
+    """
+    
+    def __init__(self,
+                 queue: WorkQueue,
+                 scraper,
+                 worker_id: Optional[str] = None,
+                 batch_size: int = Config.QUEUE_BATCH_SIZE,
+                 poll_interval: float = Config.QUEUE_POLL_INTERVAL):
+        """
+        初始化worker
+        
+        Args:
+            queue: 工作队列
+            scraper: ArxivScraper实例
+            worker_id: worker标识，默认为 主机名:进程号:随机后缀
+            batch_size: 每次认领的任务数
+            poll_interval: 没有可认领任务时的轮询间隔（秒）
+        """
+        self.queue = queue
+        self.scraper = scraper
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self.stats: Dict[str, int] = {"completed": 0, "retried": 0, "failed": 0, "lost": 0}
+        self._held: List[Task] = []
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._handlers = {
+            "category": self._run_category,
+            "list": self._run_list,
+            "abstract": self._run_abstract,
+            "content": self._run_content,
+        }
+    
+    def run(self, max_tasks: Optional[int] = None, exit_when_idle: bool = True) -> Dict[str, int]:
+        """
+        执行任务直到队列耗尽、达到任务数上限或调用stop()
+        
+        Args:
+            max_tasks: 最多执行的任务数，None表示不限
+            exit_when_idle: 队列中没有待执行和执行中的任务时退出；为False时持续等待新任务
+            
+        Returns:
+            统计信息
+        """
+        self._stop.clear()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        executed = 0
+        try:
+            while not self._stop.is_set():
+                limit = self.batch_size if max_tasks is None else min(self.batch_size, max_tasks - executed)
+                if limit <= 0:
+                    break
+                tasks = self.queue.claim(self.worker_id, limit)
+                if not tasks:
+                    # 其他worker执行中的任务可能产生后续任务，因此只有全部完成才退出
+                    if exit_when_idle and not self.queue.unfinished():
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+                
+                with self._held_lock:
+                    self._held = list(tasks)
+                for position, task in enumerate(tasks):
+                    if self._stop.is_set():
+                        for remaining in tasks[position:]:
+                            self.queue.release(remaining)
+                        break
+                    self._execute(task)
+                    executed += 1
+                    with self._held_lock:
+                        self._held.remove(task)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+        
+        self.logger.info(f"worker {self.worker_id} 退出: {self.stats}")
+        return dict(self.stats)
+    
+    def stop(self):
+        """请求worker在当前任务完成后退出"""
+        self._stop.set()
+    
+    def _heartbeat_loop(self):
+        """每三分之一租约时长为持有的任务续租"""
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            with self._held_lock:
+                held = list(self._held)
+            for task in self.queue.heartbeat(held):
+                self.logger.warning(f"任务租约已丢失: {task.key}")
+    
+    def _execute(self, task: Task):
+        """执行单个任务并提交结果或记录失败"""
+        handler = self._handlers.get(task.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"未知任务类型: {task.kind}")
+            results, follow_up = handler(task.payload)
+        except Exception as e:
+            status = self.queue.fail(task, f"{type(e).__name__}: {e}")
+            self.logger.error(f"任务失败: {task.key} (第 {task.attempts} 次), 错误: {e}")
+            if status == FAILED:
+                self.stats["failed"] += 1
+            elif status == PENDING:
+                self.stats["retried"] += 1
+            else:
+                self.stats["lost"] += 1
+            return
+        
+        if self.queue.complete(task, results, follow_up):
+            self.stats["completed"] += 1
+        else:
+            self.stats["lost"] += 1
+            self.logger.warning(f"任务租约已丢失，结果未提交: {task.key}")
+    
+    def _run_category(self, payload: Dict[str, Any]):
+        """类别任务：获取论文总数并展开为列表页任务"""
+        category = payload["category"]
+        url = Config.get_arxiv_url(category)
+        total_count = self.scraper.html_parser.extract_total_count_html(self.scraper.http_client.get_text(url))
+        total_count = total_count or Config.PAPERS_PER_PAGE
+        max_papers = payload.get("max_papers")
+        if max_papers and max_papers < total_count:
+            total_count = max_papers
+        
+        follow_up = []
+        for skip, page_param in enumerate(generate_page_params(total_count, Config.PAPERS_PER_PAGE)):
+            skip *= Config.PAPERS_PER_PAGE
+            follow_up.append(("list", f"list:{category}:{skip}", dict(
+                payload,
+                url=url + page_param,
+                limit=min(Config.PAPERS_PER_PAGE, total_count - skip),
+            )))
+        return [], follow_up
+    
+    def _run_list(self, payload: Dict[str, Any]):
+        """列表页任务：保存论文条目并为每篇论文入队富化任务"""
+        html = self.scraper.http_client.get_text(payload["url"])
+        papers = self.scraper.html_parser.parse_paper_list_html(html)[:payload["limit"]]
+        
+        results, follow_up = [], []
+        category = payload["category"]
+        for paper in papers:
+            arxiv_id = paper.arxiv_id
+            # 交叉列出的论文出现在多个类别中，条目按类别分别保存；摘要和详细内容按论文ID共享
+            results.append((f"paper:{category}:{arxiv_id}", "paper", arxiv_id,
+                            {"category": category, "paper": paper.to_dict()}))
+            if payload.get("include_abstract") and paper.abs_link:
+                follow_up.append(("abstract", f"abstract:{arxiv_id}",
+                                  {"arxiv_id": arxiv_id, "url": paper.abs_link}))
+            if payload.get("include_content") and paper.html_link:
+                follow_up.append(("content", f"content:{arxiv_id}",
+                                  {"arxiv_id": arxiv_id, "url": paper.html_link, "title": paper.title}))
+        return results, follow_up
+    
+    def _run_abstract(self, payload: Dict[str, Any]):
+        """摘要任务"""
+        arxiv_id = payload["arxiv_id"]
+        abstract = self.scraper.html_parser.parse_paper_abstract_html(self.scraper.http_client.get_text(payload["url"]))
+        return [(f"abstract:{arxiv_id}", "abstract", arxiv_id, abstract)], []
+    
+    def _run_content(self, payload: Dict[str, Any]):
+        """详细内容任务，配置了归档时先查归档"""
+        arxiv_id = payload["arxiv_id"]
+        content = self.scraper.html_parser.parse_paper_content_html(
+            self.scraper._get_content_html(payload["url"]), payload.get("title", "")
+        )
+        value = content.to_dict() if content else None
+        return [(f"content:{arxiv_id}", "content", arxiv_id, value)], []
@@ -1,5 +1,6 @@
 """数据模型模块"""
 
-from models.paper import Paper, PaperContent
+from models.paper import Paper, PaperContent, Reference, LazyContent
+from models.harvest import HarvestResult, HarvestState
 
-__all__ = ["Paper", "PaperContent"] 
\ No newline at end of file
+__all__ = ["Paper", "PaperContent", "Reference", "LazyContent", "HarvestResult", "HarvestState"] 
\ No newline at end of file
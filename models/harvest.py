@@ -0,0 +1,76 @@
+"""
+抓取进度数据模型
+
+记录单个类别抓取到了哪一页、当前页已完成哪些论文，中断后可据此续抓。
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from models.paper import Paper
+
+
+@dataclass
+class HarvestState:
+    """单个类别的抓取进度"""
+    
+    category: str
+    skip: int = 0  # 下一个要抓取的列表页偏移
+    done_ids: List[str] = field(default_factory=list)  # 偏移为skip的页中已产出的论文
+    total_count: Optional[int] = None
+    collected: int = 0
+    complete: bool = False
+    reason: str = ""  # 未完成时的中断原因
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "category": self.category,
+            "skip": self.skip,
+            "done_ids": self.done_ids,
+            "total_count": self.total_count,
+            "collected": self.collected,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HarvestState":
+        """从字典创建HarvestState实例"""
+        return cls(
+            category=data["category"],
+            skip=data.get("skip", 0),
+            done_ids=list(data.get("done_ids", [])),
+            total_count=data.get("total_count"),
+            collected=data.get("collected", 0),
+        )
+    
+    def encode(self) -> str:
+        """编码为不透明的续抓令牌"""
+        payload = json.dumps(self.to_dict(), separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+    
+    @classmethod
+    def decode(cls, token: str) -> "HarvestState":
+        """
+        从续抓令牌恢复
+        
+        Raises:
+            ValueError: 令牌格式无效
+        """
+        try:
+            return cls.from_dict(json.loads(base64.urlsafe_b64decode(token.encode("ascii"))))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"无效的续抓令牌: {e}") from e
+
+
+@dataclass
+class HarvestResult:
+    """一次有时间预算的抓取的结果"""
+    
+    category: str
+    papers: List[Paper]
+    complete: bool
+    resume_token: Optional[str] = None  # 未完成时用于续抓
+    reason: str = ""
+    elapsed: float = 0.0
@@ -5,9 +5,40 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 from datetime import datetime
 
+from config.taxonomy import TAXONOMY
+
+
+class LazyContent:
+    """
+    详细内容的延迟加载句柄
+    
+    句柄只记录键和加载函数，由内容存储或HTML归档创建。赋给 Paper.full_content 后，
+    第一次访问该属性时才读取内容。
+    """
+    
+    __slots__ = ("key", "_loader")
+    
+    def __init__(self, key: str, loader: Callable[[str], Optional[Dict[str, Any]]]):
+        """
+        创建句柄
+        
+        Args:
+            key: 内容在存储中的键
+            loader: 键 -> 内容字典 的加载函数，不存在时返回None
+        """
+        self.key = key
+        self._loader = loader
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取内容，每次调用都重新读取"""
+        return self._loader(self.key)
+    
+    def __repr__(self) -> str:
+        return f"LazyContent({self.key!r})"
+
 
 @dataclass
 class Paper:
@@ -17,15 +48,19 @@ class Paper:
     title: str
     authors: List[str]
     abstract: str = ""
-    subjects: List[str] = field(default_factory=list)
+    subjects: List[str] = field(default_factory=list)  # 类别代码，如 cs.LG
     comments: str = ""
     abs_link: str = ""
     pdf_link: Optional[str] = None
     html_link: Optional[str] = None
     submission_date: Optional[datetime] = None
     
-    # 详细内容（可选）
-    full_content: Optional[Dict[str, Any]] = None
+    # 详细内容（可选），可以是字典或 LazyContent 句柄，读取时总是得到字典
+    full_content: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    
+    # full_content 的实际存储：已加载的内容和延迟加载句柄
+    _loaded_content = None
+    _content_handle = None
     
     def __post_init__(self):
         """初始化后处理"""
@@ -36,8 +71,32 @@ class Paper:
         # 清理作者列表
         self.authors = [author.strip() for author in self.authors if author.strip()]
         
-        # 清理学科列表
-        self.subjects = [subject.strip() for subject in self.subjects if subject.strip()]
+        # 学科统一驻留为类别代码，兼容旧数据中的 "Machine Learning (cs.LG)" 形式
+        self.subjects = list(dict.fromkeys(
+            TAXONOMY.intern(subject) for subject in self.subjects if subject.strip()
+        ))
+    
+    @property
+    def has_content(self) -> bool:
+        """是否有详细内容，不触发加载"""
+        return self._loaded_content is not None or self._content_handle is not None
+    
+    @property
+    def content_loaded(self) -> bool:
+        """详细内容是否已在内存中"""
+        return self._loaded_content is not None
+    
+    def drop_content(self) -> bool:
+        """
+        释放已加载的详细内容，下次访问 full_content 时从存储重新读取
+        
+        Returns:
+            是否释放了内容；没有延迟加载句柄的内容无法重新读取，不会释放
+        """
+        if self._content_handle is None or self._loaded_content is None:
+            return False
+        self._loaded_content = None
+        return True
     
     @property
     def has_pdf(self) -> bool:
@@ -51,9 +110,14 @@ class Paper:
     
     @property
     def primary_subject(self) -> str:
-        """主要学科"""
+        """主要学科的类别代码"""
         return self.subjects[0] if self.subjects else ""
     
+    @property
+    def subject_names(self) -> List[str]:
+        """学科的显示名称，如 "Machine Learning (cs.LG)"，按需生成"""
+        return [TAXONOMY.display(code) for code in self.subjects]
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
@@ -62,6 +126,7 @@ class Paper:
             "authors": self.authors,
             "abstract": self.abstract,
             "subjects": self.subjects,
+            "subject_names": self.subject_names,
             "comments": self.comments,
             "abs_link": self.abs_link,
             "pdf_link": self.pdf_link,
@@ -95,6 +160,62 @@ class Paper:
         )
 
 
+
+def _get_full_content(paper: Paper) -> Optional[Dict[str, Any]]:
+    """读取详细内容，有句柄且尚未加载时先加载"""
+    content = paper._loaded_content
+    if content is None and paper._content_handle is not None:
+        content = paper._loaded_content = paper._content_handle.load()
+    return content
+
+
+def _set_full_content(paper: Paper, value):
+    """设置详细内容，接受字典、None或 LazyContent 句柄"""
+    if isinstance(value, LazyContent):
+        paper._content_handle, paper._loaded_content = value, None
+    else:
+        paper._content_handle, paper._loaded_content = None, value
+
+
+# dataclass生成 __init__ 后再把字段换成属性，构造函数和赋值都经过 _set_full_content
+Paper.full_content = property(_get_full_content, _set_full_content, doc="详细内容，按需加载")
+
+
+@dataclass
+class Reference:
+    """参考文献条目模型"""
+    
+    key: str = ""  # 页面中的条目ID，如 bib.bib12
+    authors: List[str] = field(default_factory=list)
+    title: str = ""
+    year: Optional[int] = None
+    arxiv_id: Optional[str] = None
+    doi: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "key": self.key,
+            "authors": self.authors,
+            "title": self.title,
+            "year": self.year,
+            "arxiv_id": self.arxiv_id,
+            "doi": self.doi
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Reference":
+        """从字典创建Reference实例"""
+        return cls(
+            key=data.get("key", ""),
+            authors=data.get("authors", []),
+            title=data.get("title", ""),
+            year=data.get("year"),
+            arxiv_id=data.get("arxiv_id"),
+            doi=data.get("doi")
+        )
+
+
 @dataclass
 class PaperContent:
     """论文详细内容模型"""
@@ -104,6 +225,7 @@ class PaperContent:
     body_sections: List[Dict[str, str]] = field(default_factory=list)
     bibliography: List[str] = field(default_factory=list)
     appendix_sections: List[Dict[str, str]] = field(default_factory=list)
+    references: List[Reference] = field(default_factory=list)  # 与bibliography一一对应的结构化条目
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -112,5 +234,18 @@ class PaperContent:
             "abstract": self.abstract,
             "body_sections": self.body_sections,
             "bibliography": self.bibliography,
-            "appendix_sections": self.appendix_sections
-        } 
\ No newline at end of file
+            "appendix_sections": self.appendix_sections,
+            "references": [reference.to_dict() for reference in self.references]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PaperContent":
+        """从字典创建PaperContent实例"""
+        return cls(
+            title=data.get("title", ""),
+            abstract=data.get("abstract", ""),
+            body_sections=data.get("body_sections", []),
+            bibliography=data.get("bibliography", []),
+            appendix_sections=data.get("appendix_sections", []),
+            references=[Reference.from_dict(item) for item in data.get("references", [])]
+        )
@@ -1,5 +1,6 @@
 """解析器模块"""
 
 from parsers.html_parser import ArxivHtmlParser
+from parsers.memo import DiskParseMemo, ParseMemo, memo_key
 
-__all__ = ["ArxivHtmlParser"] 
\ No newline at end of file
+__all__ = ["ArxivHtmlParser", "ParseMemo", "DiskParseMemo", "memo_key"] 
\ No newline at end of file
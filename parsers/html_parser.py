@@ -5,33 +5,55 @@ HTML解析器
 """
 
 from bs4 import BeautifulSoup
-from typing import List, Optional, Dict, Any, Generator
+from typing import List, Optional, Dict, Any, Generator, Callable
+import json
 import logging
+import re
+from urllib.parse import unquote
 
-from models.paper import Paper, PaperContent
+from models.paper import Paper, PaperContent, Reference
 from utils.text_utils import (
     clean_text, 
-    split_subjects, 
     extract_arxiv_id, 
     normalize_url,
     clean_html_content,
-    extract_total_count as extract_count_from_text
+    extract_total_count as extract_count_from_text,
+    find_arxiv_id,
+    find_doi,
+    find_year,
+    split_authors
 )
+from parsers.memo import memo_key
 from config.settings import Config
+from config.taxonomy import TAXONOMY
+
+
+# 列表页中摘要链接的模式，用于不构建解析树快速提取ID
+LISTING_ABS_LINK_PATTERN = re.compile(r'<a\s+href\s*=\s*["\']([^"\']*/abs/[^"\']+)["\'][^>]*title\s*=\s*["\']Abstract["\']')
+
+# 详细内容页中需要提取的章节类型
+SECTION_CLASSES = ["ltx_section", "ltx_bibliography", "ltx_appendix"]
 
 
 class ArxivHtmlParser:
     """ArXiv HTML解析器"""
     
-    def __init__(self, parser: str = Config.HTML_PARSER):
+    # 解析结果格式版本，提取逻辑变化时递增，使旧的缓存结果失效
+    PARSER_VERSION = "3"
+    
+    def __init__(self, parser: str = Config.HTML_PARSER, memo=None):
         """
         初始化解析器
         
         Args:
             parser: BeautifulSoup解析器类型
+            memo: 可选的解析结果缓存（ParseMemo或DiskParseMemo），
+                  只作用于 *_html 系列方法
         """
         self.parser = parser
+        self.memo = memo
         self.logger = logging.getLogger(__name__)
+        self._memo_version = f"{self.PARSER_VERSION}-{parser}"
     
     def parse_html(self, html: str) -> BeautifulSoup:
         """
@@ -45,6 +67,43 @@ class ArxivHtmlParser:
         """
         return BeautifulSoup(html, self.parser)
     
+    def parse_and_release(self, html: str, extract: Callable[[BeautifulSoup], Any]) -> Any:
+        """
+        解析HTML并用extract提取结果，随后立即销毁解析树
+        
+        BeautifulSoup树内部存在大量父子循环引用，仅丢弃引用要等到垃圾回收才会释放；
+        decompose() 主动拆除树，使大页面的内存在返回前就被回收。extract应返回
+        普通字符串/对象，不能持有树中的节点。
+        
+        Args:
+            html: HTML文本
+            extract: 接收BeautifulSoup对象并返回结果的函数
+            
+        Returns:
+            extract的返回值
+        """
+        soup = self.parse_html(html)
+        try:
+            return extract(soup)
+        finally:
+            # BeautifulSoup根对象的next_element为None，对它调用decompose()只会清空根对象，
+            # 需要逐个拆除顶层子节点
+            for child in list(soup.contents):
+                child.decompose()
+            soup.decompose()
+    
+    def extract_total_count_html(self, html: str) -> Optional[int]:
+        """
+        从HTML文本提取论文总数，解析树用完即销毁
+        
+        Args:
+            html: 列表页HTML文本
+            
+        Returns:
+            论文总数，如果未找到则返回None
+        """
+        return self.parse_and_release(html, self.extract_total_count)
+    
     def extract_total_count(self, soup: BeautifulSoup) -> Optional[int]:
         """
         提取论文总数
@@ -74,7 +133,7 @@ class ArxivHtmlParser:
                 self.logger.warning("未找到paging元素")
             
             return None
-            
+        
         except Exception as e:
             self.logger.error(f"提取论文总数失败: {e}")
             return None
@@ -99,6 +158,23 @@ class ArxivHtmlParser:
         
         return papers
     
+    def parse_paper_list_html(self, html: str) -> List[Paper]:
+        """
+        从HTML文本解析论文列表，配置了缓存时相同页面不再重复解析
+        
+        Args:
+            html: 列表页HTML文本
+            
+        Returns:
+            论文列表
+        """
+        return self._memoized(
+            "list", html,
+            lambda: self.parse_and_release(html, self.parse_paper_list),
+            lambda papers: [paper.to_dict() for paper in papers],
+            lambda data: [Paper.from_dict(item) for item in data]
+        )
+    
     def parse_papers_generator(self, soup: BeautifulSoup) -> Generator[Paper, None, None]:
         """
         生成器方式解析论文列表
@@ -111,12 +187,75 @@ class ArxivHtmlParser:
         """
         yield from self._parse_papers_generator(soup)
     
-    def _parse_papers_generator(self, soup: BeautifulSoup) -> Generator[Paper, None, None]:
+    def parse_new_papers(self, 
+                         soup: BeautifulSoup,
+                         is_seen: Callable[[str], bool]) -> Generator[Paper, None, None]:
+        """
+        只解析未见过的论文
+        
+        先从dt元素取出ArXiv ID，已见过的论文直接跳过，不解析其详情。
+        
+        Args:
+            soup: BeautifulSoup对象
+            is_seen: 判断ArXiv ID是否已见过的函数
+            
+        Yields:
+            新论文的Paper对象
+        """
+        yield from self._parse_papers_generator(soup, is_seen)
+    
+    def extract_listing_ids(self, html: str) -> List[str]:
+        """
+        直接从列表页HTML文本中提取ArXiv ID，不构建BeautifulSoup树
+        
+        Args:
+            html: 列表页HTML文本
+            
+        Returns:
+            按页面顺序排列的ArXiv ID列表
+        """
+        return [extract_arxiv_id(href) for href in LISTING_ABS_LINK_PATTERN.findall(html)]
+    
+    def parse_new_papers_html(self, html: str, is_seen: Callable[[str], bool]) -> List[Paper]:
+        """
+        从列表页HTML文本中只解析未见过的论文
+        
+        用摘要链接的正则匹配位置定位每个条目，从原始文本中切出未见论文的 dt/dd 片段，
+        只为这些片段构建解析树，开销与新论文数量成正比，而不是与整页大小成正比。
+        
+        Args:
+            html: 列表页HTML文本
+            is_seen: 判断ArXiv ID是否已见过的函数
+            
+        Returns:
+            新论文列表，按页面顺序排列
+        """
+        fragments = []
+        for match in LISTING_ABS_LINK_PATTERN.finditer(html):
+            if is_seen(extract_arxiv_id(match.group(1))):
+                continue
+            start = html.rfind("<dt", 0, match.start())
+            end = html.find("</dd>", match.end())
+            if start < 0 or end < 0:
+                self.logger.warning(f"无法定位列表条目: {match.group(1)}")
+                continue
+            fragments.append(html[start:end + len("</dd>")])
+        
+        if not fragments:
+            return []
+        
+        fragment_html = f'<dl id="articles">{"".join(fragments)}</dl>'
+        return self.parse_and_release(fragment_html, lambda soup: list(self._parse_papers_generator(soup)))
+    
+    def _parse_papers_generator(self, 
+                                soup: BeautifulSoup,
+                                is_seen: Optional[Callable[[str], bool]] = None) -> Generator[Paper, None, None]:
         """
         内部生成器方法
         
         Args:
             soup: BeautifulSoup对象
+            is_seen: 可选，判断ArXiv ID是否已见过的函数，命中的论文会被跳过
             
         Yields:
             Paper对象
@@ -134,6 +273,8 @@ class ArxivHtmlParser:
         
         for dt, dd in zip(papers_link, papers_detail):
             try:
+                if is_seen is not None and is_seen(self._extract_dt_arxiv_id(dt)):
+                    continue
                 paper = self._parse_single_paper(dt, dd)
                 if paper:
                     yield paper
@@ -141,6 +282,13 @@ class ArxivHtmlParser:
                 self.logger.error(f"解析单个论文失败: {e}")
                 continue
     
+    def _extract_dt_arxiv_id(self, dt_element) -> str:
+        """从dt元素中提取ArXiv ID"""
+        abs_link_element = dt_element.find("a", {"title": "Abstract"})
+        if not abs_link_element:
+            return ""
+        return extract_arxiv_id(abs_link_element["href"])
+    
     def _parse_single_paper(self, dt_element, dd_element) -> Optional[Paper]:
         """
         解析单个论文
@@ -214,11 +362,11 @@ class ArxivHtmlParser:
         return ""
     
     def _extract_subjects(self, dd_element) -> List[str]:
-        """提取学科列表"""
+        """提取学科列表，驻留为类别代码"""
         subjects_element = dd_element.find("div", {"class": "list-subjects"})
         if subjects_element:
             subjects_text = clean_text(subjects_element.get_text(strip=True), "Subjects:")
-            return split_subjects(subjects_text)
+            return list(TAXONOMY.intern_subjects(subjects_text))
         return []
     
     def parse_paper_abstract(self, soup: BeautifulSoup) -> str:
@@ -240,6 +388,23 @@ class ArxivHtmlParser:
             self.logger.error(f"解析论文摘要失败: {e}")
             return ""
     
+    def parse_paper_abstract_html(self, html: str) -> str:
+        """
+        从HTML文本解析论文摘要，配置了缓存时相同页面不再重复解析
+        
+        Args:
+            html: 摘要页面HTML文本
+            
+        Returns:
+            论文摘要
+        """
+        return self._memoized(
+            "abstract", html,
+            lambda: self.parse_and_release(html, self.parse_paper_abstract),
+            lambda abstract: abstract,
+            lambda data: data
+        )
+    
     def parse_paper_content(self, soup: BeautifulSoup, title: str = "") -> Optional[PaperContent]:
         """
         解析论文详细内容
@@ -258,71 +423,185 @@ class ArxivHtmlParser:
             if abstract_element:
                 abstract = abstract_element.get_text(strip=True)
             
-            # 提取正文部分
-            body_sections = self._extract_body_sections(soup)
-            
-            # 提取参考文献
-            bibliography = self._extract_bibliography(soup)
-            
-            # 提取附录
-            appendix_sections = self._extract_appendix_sections(soup)
+            # 一次遍历提取正文、参考文献和附录
+            body_sections, bibliography, references, appendix_sections = self._extract_sections(soup)
             
             return PaperContent(
                 title=title,
                 abstract=abstract,
                 body_sections=body_sections,
                 bibliography=bibliography,
-                appendix_sections=appendix_sections
+                appendix_sections=appendix_sections,
+                references=references
             )
         except Exception as e:
             self.logger.error(f"解析论文详细内容失败: {e}")
             return None
     
-    def _extract_body_sections(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """提取正文部分"""
-        sections = []
-        try:
-            body_sections = soup.find_all("section", {"class": "ltx_section"})
-            for section in body_sections:
-                title_element = section.find("h2", {"class": "ltx_title_section"})
-                if title_element:
-                    section_title = title_element.get_text(strip=True)
-                    section_content = section.get_text(strip=True)
-                    # 移除标题部分
-                    section_content = section_content.replace(section_title, "", 1)
-                    sections.append({section_title: section_content.strip()})
-        except Exception as e:
-            self.logger.error(f"提取正文部分失败: {e}")
+    def parse_archived_content(self, 
+                               archive,
+                               arxiv_id: str,
+                               title: str = "",
+                               version: Optional[int] = None) -> Optional[PaperContent]:
+        """
+        从HTML归档中重新解析论文详细内容，不访问网络
         
-        return sections
+        Args:
+            archive: HtmlArchive实例
+            arxiv_id: ArXiv ID，不带版本时使用归档中的最高版本
+            title: 论文标题
+            version: 可选的版本号
+            
+        Returns:
+            PaperContent对象，归档中不存在时返回None
+        """
+        html = archive.get(arxiv_id, version)
+        if html is None:
+            self.logger.warning(f"归档中不存在: {arxiv_id}")
+            return None
+        return self.parse_paper_content_html(html, title)
     
-    def _extract_bibliography(self, soup: BeautifulSoup) -> List[str]:
-        """提取参考文献"""
-        bibliography = []
-        try:
-            bib_section = soup.find("section", {"class": "ltx_bibliography"})
-            if bib_section:
-                bib_items = bib_section.find_all("li", {"class": "ltx_bibitem"})
-                bibliography = [item.get_text(strip=True) for item in bib_items]
-        except Exception as e:
-            self.logger.error(f"提取参考文献失败: {e}")
+    def parse_paper_content_html(self, html: str, title: str = "") -> Optional[PaperContent]:
+        """
+        从HTML文本解析论文详细内容，配置了缓存时相同页面不再重复解析
+        
+        Args:
+            html: 论文HTML页面文本
+            title: 论文标题
+            
+        Returns:
+            PaperContent对象
+        """
+        def load(data):
+            if data is None:
+                return None
+            content = PaperContent.from_dict(data)
+            # 标题由调用方提供，不属于页面内容
+            content.title = title
+            return content
         
-        return bibliography
+        return self._memoized(
+            "content", html,
+            lambda: self.parse_and_release(html, lambda soup: self.parse_paper_content(soup, title)),
+            lambda content: content.to_dict() if content else None,
+            load
+        )
     
-    def _extract_appendix_sections(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """提取附录部分"""
+    def _memoized(self, 
+                  kind: str, 
+                  html: str, 
+                  parse: Callable[[], Any], 
+                  dump: Callable[[Any], Any], 
+                  load: Callable[[Any], Any]):
+        """
+        查询缓存，未命中时解析并写入缓存
+        
+        缓存中保存JSON字节而不是对象本身，每次命中都得到新的对象，
+        调用方修改结果不会污染缓存。
+        
+        Args:
+            kind: 解析类型
+            html: HTML文本
+            parse: 执行解析的函数
+            dump: 把解析结果转换为可JSON序列化数据的函数
+            load: 把缓存数据还原为解析结果的函数
+        """
+        if self.memo is None:
+            return parse()
+        
+        key = memo_key(kind, html, self._memo_version)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return load(json.loads(cached))
+        
+        result = parse()
+        data = json.dumps(dump(result), ensure_ascii=False, separators=(",", ":"))
+        self.memo.put(key, data.encode("utf-8"))
+        return result
+    
+    def _extract_sections(self, soup: BeautifulSoup):
+        """
+        一次遍历提取正文、参考文献和附录
+        
+        Returns:
+            (正文部分, 参考文献文本, 结构化参考文献, 附录部分)
+        """
+        body_sections = []
+        bibliography = []
+        references = []
         appendix_sections = []
+        
         try:
-            appendix_elements = soup.find_all("section", {"class": "ltx_appendix"})
-            for appendix in appendix_elements:
-                title_element = appendix.find("h2", {"class": "ltx_title_appendix"})
-                if title_element:
-                    appendix_title = title_element.get_text(strip=True)
-                    appendix_content = appendix.get_text(strip=True)
-                    # 移除标题部分
-                    appendix_content = appendix_content.replace(appendix_title, "", 1)
-                    appendix_sections.append({appendix_title: appendix_content.strip()})
+            for section in soup.find_all("section", class_=SECTION_CLASSES):
+                classes = section.get("class", [])
+                if "ltx_bibliography" in classes:
+                    if not bibliography:
+                        self._extract_bibliography(section, bibliography, references)
+                elif "ltx_appendix" in classes:
+                    self._extract_titled_section(section, "ltx_title_appendix", appendix_sections)
+                else:
+                    self._extract_titled_section(section, "ltx_title_section", body_sections)
         except Exception as e:
-            self.logger.error(f"提取附录部分失败: {e}")
+            self.logger.error(f"提取论文章节失败: {e}")
+        
+        return body_sections, bibliography, references, appendix_sections
+    
+    def _extract_titled_section(self, section, title_class: str, sections: List[Dict[str, str]]):
+        """提取带标题的正文或附录部分"""
+        title_element = section.find("h2", {"class": title_class})
+        if title_element:
+            section_title = title_element.get_text(strip=True)
+            section_content = section.get_text(strip=True)
+            # 移除标题部分
+            section_content = section_content.replace(section_title, "", 1)
+            sections.append({section_title: section_content.strip()})
+    
+    def _extract_bibliography(self, bib_section, bibliography: List[str], references: List[Reference]):
+        """提取参考文献，同时生成文本和结构化条目"""
+        for item in bib_section.find_all("li", {"class": "ltx_bibitem"}):
+            bibliography.append(item.get_text(strip=True))
+            try:
+                references.append(self._parse_reference(item))
+            except Exception as e:
+                self.logger.debug(f"解析参考文献条目失败: {e}")
+                references.append(Reference(key=item.get("id", "")))
+    
+    def _parse_reference(self, item) -> Reference:
+        """
+        解析单个 ltx_bibitem
+        
+        优先使用BibTeX生成的语义标记（ltx_bib_author / ltx_bib_title / ltx_bib_year），
+        否则按LaTeXML的分块约定：第一个 ltx_bibblock 为作者，第二个为标题。
+        arXiv ID和DOI先从链接中查找，再从文本中查找。
+        """
+        text = item.get_text(" ", strip=True)
+        
+        authors_element = item.find(class_="ltx_bib_author")
+        title_element = item.find(class_="ltx_bib_title")
+        year_element = item.find(class_="ltx_bib_year")
+        blocks = item.find_all(class_="ltx_bibblock") if not (authors_element and title_element) else []
+        
+        if authors_element is None and blocks:
+            authors_element = blocks[0]
+        if title_element is None and len(blocks) > 1:
+            title_element = blocks[1]
+        
+        authors = split_authors(authors_element.get_text(" ", strip=True)) if authors_element else []
+        title = title_element.get_text(" ", strip=True).rstrip(".,") if title_element else ""
+        year = find_year(year_element.get_text(strip=True) if year_element else text)
+        
+        arxiv_id = None
+        doi = None
+        for link in item.find_all("a", href=True):
+            href = unquote(link["href"])
+            arxiv_id = arxiv_id or find_arxiv_id(href)
+            doi = doi or find_doi(href)
         
-        return appendix_sections 
\ No newline at end of file
+        return Reference(
+            key=item.get("id", ""),
+            authors=authors,
+            title=title,
+            year=year,
+            arxiv_id=arxiv_id or find_arxiv_id(text),
+            doi=doi or find_doi(text)
+        )
@@ -0,0 +1,159 @@
+"""
+解析结果缓存
+
+按HTML内容哈希和解析器版本缓存解析结果，相同的输入直接返回缓存，
+不再构建BeautifulSoup树。
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from config.settings import Config
+
+
+def memo_key(kind: str, html: str, parser_version: str) -> str:
+    """
+    生成缓存键
+    
+    Args:
+        kind: 解析类型，如 list / abstract / content
+        html: HTML文本
+        parser_version: 解析器版本标识
+        
+    Returns:
+        缓存键
+    """
+    digest = hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{kind}:{parser_version}:{digest}"
+
+
+class ParseMemo:
+    """内存中的有界LRU缓存，值为序列化后的字节"""
+    
+    def __init__(self, max_entries: int = Config.PARSE_MEMO_SIZE):
+        """
+        初始化缓存
+        
+        Args:
+            max_entries: 最多缓存的条目数
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """读取缓存，命中时移到最近使用的位置"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: bytes):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskParseMemo:
+    """
+    基于SQLite的磁盘缓存
+    
+    跨进程、跨运行持久保存解析结果。条目数超过上限时按最后使用时间淘汰。
+    """
+    
+    def __init__(self, path: str, max_entries: int = Config.PARSE_MEMO_DISK_SIZE):
+        """
+        打开或创建缓存数据库
+        
+        Args:
+            path: SQLite数据库文件路径
+            max_entries: 最多缓存的条目数
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS memo ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS memo_last_used ON memo(last_used)")
+        self._connection.commit()
+        self._count = self._connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """读取缓存并更新最后使用时间"""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE memo SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, value: bytes):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            now = time.time()
+            # 分成插入和更新两步，才能区分新条目并维护内存中的计数
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO memo (key, value, last_used) VALUES (?, ?, ?)",
+                (key, value, now)
+            )
+            if cursor.rowcount:
+                self._count += 1
+            else:
+                self._connection.execute(
+                    "UPDATE memo SET value = ?, last_used = ? WHERE key = ?", (value, now, key)
+                )
+            if self._count > self.max_entries:
+                # 一次多淘汰一成，避免每次写入都触发删除
+                excess = self._count - int(self.max_entries * 0.9)
+                self._connection.execute(
+                    "DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                # 其他进程也可能写入同一文件，淘汰后重新统计
+                self._count = self._connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+            self._connection.commit()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._connection.execute("DELETE FROM memo")
+            self._connection.commit()
+            self._count = 0
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,9 @@
+"""存储模块"""
+
+from storage.pack_store import PackStore
+from storage.archive import HtmlArchive, split_version, archive_key_from_url
+from storage.content_store import ContentStore
+from storage.corpus import Corpus, CorpusWriter, PaperView, export_corpus
+
+__all__ = ["PackStore", "HtmlArchive", "split_version", "archive_key_from_url", "ContentStore",
+           "Corpus", "CorpusWriter", "PaperView", "export_corpus"]
@@ -0,0 +1,171 @@
+"""
+HTML渲染页归档
+
+按 arxiv_id+版本 保存 /html/ 渲染页原文，解析器修复后可直接从归档重新解析。
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from config.settings import Config
+from models.paper import LazyContent
+from storage.pack_store import PackStore
+from utils.text_utils import split_arxiv_version as split_version
+
+
+def archive_key_from_url(html_url: str) -> str:
+    """从HTML链接中取出归档键，如 https://arxiv.org/html/2301.12345v2 -> 2301.12345v2"""
+    path = html_url.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    marker = "/html/"
+    if marker in path:
+        return path.split(marker, 1)[1]
+    return path.rsplit("/", 1)[-1]
+
+
+class HtmlArchive:
+    """
+    HTML渲染页归档
+    
+    每个版本单独一条记录（键如 2301.12345v2），不带版本号的ID作为别名指向
+    已归档的最高版本。LaTeXML页面高度重复，用样本训练共享字典后压缩率明显提升：
+    
+        archive.train_dictionary(sample_pages)
+    """
+    
+    def __init__(self,
+                 path: str,
+                 compression_level: int = Config.ARCHIVE_COMPRESSION_LEVEL,
+                 readonly: bool = False):
+        """
+        打开或创建归档
+        
+        Args:
+            path: 归档路径前缀，生成 <path>.pack / <path>.idx
+            compression_level: zstd压缩级别
+            readonly: 是否只读打开
+        """
+        self.store = PackStore(path,
+                               compression_level=compression_level,
+                               readonly=readonly,
+                               on_reindex=self._restore_alias)
+    
+    @staticmethod
+    def make_key(arxiv_id: str, version: Optional[int] = None) -> str:
+        """生成归档键，显式版本号优先于ID中的版本后缀"""
+        base, id_version = split_version(arxiv_id)
+        version = version if version is not None else id_version
+        return f"{base}v{version}" if version is not None else base
+    
+    def put(self, arxiv_id: str, html: str, version: Optional[int] = None):
+        """
+        归档一个渲染页
+        
+        Args:
+            arxiv_id: ArXiv ID，可带版本后缀
+            html: 页面HTML文本
+            version: 版本号，未提供时使用ID中的版本后缀
+        """
+        key = self.make_key(arxiv_id, version)
+        base, key_version = split_version(key)
+        alias = None
+        if key_version is not None and self._is_newer(self.store, base, key_version):
+            alias = base
+        self.store.put(key, html.encode("utf-8"), alias=alias)
+    
+    def put_url(self, html_url: str, html: str):
+        """按HTML链接归档渲染页"""
+        self.put(archive_key_from_url(html_url), html)
+    
+    def get(self, arxiv_id: str, version: Optional[int] = None) -> Optional[str]:
+        """
+        读取渲染页
+        
+        Args:
+            arxiv_id: ArXiv ID，不带版本时返回最高版本
+            version: 可选的版本号
+            
+        Returns:
+            HTML文本，不存在时返回None
+        """
+        data = self.store.get(self.make_key(arxiv_id, version))
+        return data.decode("utf-8") if data is not None else None
+    
+    def content_handle(self, arxiv_id: str, title: str = "", parser=None) -> LazyContent:
+        """
+        创建从归档页面解析详细内容的延迟加载句柄
+        
+        赋给 Paper.full_content 后，第一次访问时才读取并解析页面。
+        
+        Args:
+            arxiv_id: ArXiv ID，可带版本后缀
+            title: 论文标题，传给解析器
+            parser: ArxivHtmlParser实例，默认新建一个
+            
+        Returns:
+            LazyContent句柄，页面不存在或解析失败时加载结果为None
+        """
+        if parser is None:
+            from parsers.html_parser import ArxivHtmlParser
+            parser = ArxivHtmlParser()
+        
+        def load(key: str):
+            html = self.get(key)
+            if html is None:
+                return None
+            content = parser.parse_paper_content_html(html, title)
+            return content.to_dict() if content is not None else None
+        
+        return LazyContent(self.make_key(arxiv_id), load)
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return self.make_key(arxiv_id) in self.store
+    
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """遍历所有归档的 (版本键, HTML)"""
+        for key, data in self.store.items():
+            yield key, data.decode("utf-8")
+    
+    def train_dictionary(self, samples, dict_size: int = Config.ARCHIVE_DICT_SIZE) -> int:
+        """
+        用样本页面训练共享zstd字典
+        
+        Args:
+            samples: HTML文本或字节样本
+            dict_size: 字典大小（字节）
+            
+        Returns:
+            字典ID
+        """
+        encoded = (sample.encode("utf-8") if isinstance(sample, str) else sample for sample in samples)
+        return self.store.train_dictionary(encoded, dict_size)
+    
+    def flush(self):
+        """刷新索引到磁盘"""
+        self.store.flush()
+    
+    def close(self):
+        """关闭归档"""
+        self.store.close()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    @staticmethod
+    def _is_newer(store: PackStore, base: str, version: int) -> bool:
+        """判断版本是否不低于别名当前指向的版本"""
+        current = store.record_key(base)
+        if current is None:
+            return True
+        current_version = split_version(current)[1]
+        return current_version is None or version >= current_version
+    
+    @classmethod
+    def _restore_alias(cls, store: PackStore, key: str):
+        """重建索引时恢复不带版本号的别名"""
+        base, version = split_version(key)
+        if version is not None and cls._is_newer(store, base, version):
+            store.link(base, key)
@@ -0,0 +1,129 @@
+"""
+论文详细内容存储
+
+把 Paper.full_content 按 arxiv_id 存入打包存储，论文对象中只保留延迟加载句柄。
+只分析元数据时详细内容不会被读入内存，需要时第一次访问 full_content 才读取。
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from config.settings import Config
+from models.paper import LazyContent, Paper, PaperContent
+from storage.pack_store import PackStore
+from utils.codec import json_codec
+
+
+class ContentStore:
+    """
+    详细内容存储
+    
+    内容以JSON保存在PackStore中，共享PackStore的压缩和mmap索引：
+    
+        store.offload(paper)         # 写入存储，paper.full_content 换成句柄
+        store.attach(papers)         # 为已存储内容的论文挂上句柄
+        paper.full_content           # 第一次访问时读取
+        paper.drop_content()         # 释放，下次访问重新读取
+    """
+    
+    def __init__(self,
+                 path: str,
+                 compression_level: int = Config.ARCHIVE_COMPRESSION_LEVEL,
+                 readonly: bool = False):
+        """
+        打开或创建存储
+        
+        Args:
+            path: 存储路径前缀，生成 <path>.pack / <path>.idx
+            compression_level: zstd压缩级别
+            readonly: 是否只读打开
+        """
+        self.store = PackStore(path, compression_level=compression_level, readonly=readonly)
+        self._codec = json_codec()
+    
+    def put(self, arxiv_id: str, content: Union[Dict[str, Any], PaperContent]):
+        """
+        写入一篇论文的详细内容
+        
+        Args:
+            arxiv_id: ArXiv ID
+            content: 内容字典或PaperContent对象
+        """
+        if isinstance(content, PaperContent):
+            content = content.to_dict()
+        self.store.put(arxiv_id, self._codec.dumps(content))
+    
+    def get(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取详细内容
+        
+        Returns:
+            内容字典，不存在时返回None
+        """
+        data = self.store.get(arxiv_id)
+        return self._codec.loads(data) if data is not None else None
+    
+    def handle(self, arxiv_id: str) -> LazyContent:
+        """创建指向该论文内容的延迟加载句柄，不检查内容是否存在"""
+        return LazyContent(arxiv_id, self.get)
+    
+    def offload(self, paper: Paper) -> bool:
+        """
+        把论文已加载的详细内容写入存储，并换成延迟加载句柄
+        
+        Args:
+            paper: Paper对象
+            
+        Returns:
+            是否写入了内容；没有内容或内容尚未加载时返回False
+        """
+        if not paper.content_loaded:
+            return False
+        self.put(paper.arxiv_id, paper.full_content)
+        paper.full_content = self.handle(paper.arxiv_id)
+        return True
+    
+    def attach(self, papers: Iterable[Paper]) -> int:
+        """
+        为存储中有内容、自身没有内容的论文挂上延迟加载句柄
+        
+        只做索引查找，不读取内容。
+        
+        Args:
+            papers: 论文可迭代对象
+            
+        Returns:
+            挂上句柄的论文数
+        """
+        attached = 0
+        for paper in papers:
+            if not paper.has_content and paper.arxiv_id in self.store:
+                paper.full_content = self.handle(paper.arxiv_id)
+                attached += 1
+        return attached
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return arxiv_id in self.store
+    
+    def __len__(self) -> int:
+        return len(self.store)
+    
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """按写入顺序遍历 (arxiv_id, 内容字典)"""
+        for key, data in self.store.items():
+            yield key, self._codec.loads(data)
+    
+    def flush(self):
+        """刷新索引到磁盘"""
+        self.store.flush()
+    
+    def close(self):
+        """关闭存储"""
+        self.store.close()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
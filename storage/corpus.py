@@ -0,0 +1,452 @@
+"""
+内存映射的只读论文语料文件
+
+面向启动时加载整个语料、之后只读的服务进程。每个字段一张定长偏移表加一个字符串堆，
+读取端 mmap 整个文件，打开时只读文件头和目录，不解析任何记录；PaperView 按需从
+字符串堆中解码字段。多个进程打开同一文件时共享页缓存。
+
+文件布局（整数均为小端）:
+    文件头      魔数, 版本, 字段数, 论文数, 目录偏移, ID索引偏移
+    每个字段    偏移表 (论文数+1) x uint64，字符串堆（UTF-8，按8字节对齐）
+    ID索引      论文数 x uint32，按 arxiv_id 排序的论文序号
+    目录        每个字段: 名称, 偏移表偏移, 字符串堆偏移, 字符串堆长度
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config.taxonomy import TAXONOMY
+from models.paper import Paper
+
+
+CORPUS_MAGIC = b"AXCORP01"
+CORPUS_VERSION = 1
+
+# 文件头: 魔数, 版本, 字段数, 论文数, 目录偏移, ID索引偏移
+CORPUS_HEADER = struct.Struct("<8sIIQQQ")
+
+# 目录项: 字段名, 偏移表偏移, 字符串堆偏移, 字符串堆长度
+CORPUS_DIRECTORY_ENTRY = struct.Struct("<16sQQQ")
+
+# 写入的字段，列表字段以 LIST_SEPARATOR 连接
+CORPUS_FIELDS = (
+    "arxiv_id", "title", "authors", "abstract", "subjects", "comments",
+    "abs_link", "pdf_link", "html_link", "submission_date",
+)
+LIST_FIELDS = frozenset(("authors", "subjects"))
+LIST_SEPARATOR = "\x1f"
+
+# 空字符串读出为None的字段
+OPTIONAL_FIELDS = frozenset(("pdf_link", "html_link", "submission_date"))
+
+
+def _pad(size: int) -> int:
+    """补齐到8字节边界需要的字节数"""
+    return -size % 8
+
+
+def _encode_field(paper: Paper, name: str) -> bytes:
+    """把论文的一个字段编码为字符串堆中的字节"""
+    value = getattr(paper, name)
+    if value is None:
+        return b""
+    if name in LIST_FIELDS:
+        value = LIST_SEPARATOR.join(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return value.encode("utf-8")
+
+
+class CorpusWriter:
+    """
+    语料文件写入器
+    
+    论文逐篇写入，各字段的字符串堆先写入同目录下的临时文件，close时拼接成最终文件，
+    内存中只保留偏移表和ID。
+    """
+    
+    def __init__(self, path: str):
+        """
+        创建写入器
+        
+        Args:
+            path: 语料文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._heaps = {name: tempfile.TemporaryFile(dir=directory) for name in CORPUS_FIELDS}
+        self._offsets = {name: array("Q", [0]) for name in CORPUS_FIELDS}
+        self._ids: List[str] = []
+        self._closed = False
+    
+    def write(self, paper: Paper):
+        """写入一篇论文"""
+        for name in CORPUS_FIELDS:
+            data = _encode_field(paper, name)
+            if data:
+                self._heaps[name].write(data)
+            offsets = self._offsets[name]
+            offsets.append(offsets[-1] + len(data))
+        self._ids.append(paper.arxiv_id)
+    
+    def write_many(self, papers: Iterable[Paper]) -> int:
+        """
+        写入多篇论文
+        
+        Returns:
+            写入的论文数
+        """
+        count = 0
+        for paper in papers:
+            self.write(paper)
+            count += 1
+        return count
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def close(self):
+        """拼接偏移表、字符串堆、ID索引和目录，原子地替换目标文件"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        count = len(self._ids)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(b"\0" * CORPUS_HEADER.size)
+                f.write(b"\0" * _pad(CORPUS_HEADER.size))
+                
+                directory = []
+                for name in CORPUS_FIELDS:
+                    offsets = self._offsets[name]
+                    if sys.byteorder != "little":
+                        offsets.byteswap()
+                    table_offset = f.tell()
+                    offsets.tofile(f)
+                    
+                    heap = self._heaps[name]
+                    heap_offset = f.tell()
+                    heap.seek(0)
+                    while True:
+                        chunk = heap.read(1 << 20)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                    heap_length = f.tell() - heap_offset
+                    f.write(b"\0" * _pad(heap_length))
+                    directory.append((name, table_offset, heap_offset, heap_length))
+                
+                # 按ID排序的序号，相同ID保持写入顺序
+                id_index_offset = f.tell()
+                order = array("I", sorted(range(count), key=self._ids.__getitem__))
+                if sys.byteorder != "little":
+                    order.byteswap()
+                order.tofile(f)
+                f.write(b"\0" * _pad(f.tell()))
+                
+                directory_offset = f.tell()
+                for name, table_offset, heap_offset, heap_length in directory:
+                    f.write(CORPUS_DIRECTORY_ENTRY.pack(name.encode("ascii"), table_offset, heap_offset, heap_length))
+                
+                f.seek(0)
+                f.write(CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, len(directory), count,
+                                           directory_offset, id_index_offset))
+            os.replace(temp_path, self.path)
+        finally:
+            for heap in self._heaps.values():
+                heap.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+
+def export_corpus(papers: Iterable[Paper], path: str) -> int:
+    """
+    把论文流导出为语料文件
+    
+    Args:
+        papers: 论文可迭代对象，如 ArxivScraper.get_papers_generator 的输出
+        path: 语料文件路径
+        
+    Returns:
+        写入的论文数
+    """
+    with CorpusWriter(path) as writer:
+        return writer.write_many(papers)
+
+
+class PaperView:
+    """
+    语料中一篇论文的只读视图
+    
+    与Paper有相同的字段和常用属性，每次访问字段时从字符串堆解码，不缓存。
+    需要可修改的对象时调用 to_paper()。
+    """
+    
+    __slots__ = ("_corpus", "_index")
+    
+    def __init__(self, corpus: "Corpus", index: int):
+        self._corpus = corpus
+        self._index = index
+    
+    @property
+    def index(self) -> int:
+        """论文在语料中的序号"""
+        return self._index
+    
+    @property
+    def arxiv_id(self) -> str:
+        return self._corpus.field(self._index, "arxiv_id")
+    
+    @property
+    def title(self) -> str:
+        return self._corpus.field(self._index, "title")
+    
+    @property
+    def authors(self) -> List[str]:
+        return self._corpus.field(self._index, "authors")
+    
+    @property
+    def abstract(self) -> str:
+        return self._corpus.field(self._index, "abstract")
+    
+    @property
+    def subjects(self) -> List[str]:
+        return self._corpus.field(self._index, "subjects")
+    
+    @property
+    def comments(self) -> str:
+        return self._corpus.field(self._index, "comments")
+    
+    @property
+    def abs_link(self) -> str:
+        return self._corpus.field(self._index, "abs_link")
+    
+    @property
+    def pdf_link(self) -> Optional[str]:
+        return self._corpus.field(self._index, "pdf_link")
+    
+    @property
+    def html_link(self) -> Optional[str]:
+        return self._corpus.field(self._index, "html_link")
+    
+    @property
+    def submission_date(self) -> Optional[datetime]:
+        return self._corpus.field(self._index, "submission_date")
+    
+    @property
+    def full_content(self) -> None:
+        """语料文件不包含详细内容"""
+        return None
+    
+    @property
+    def has_pdf(self) -> bool:
+        """是否有PDF链接"""
+        return bool(self.pdf_link)
+    
+    @property
+    def has_html(self) -> bool:
+        """是否有HTML链接"""
+        return bool(self.html_link)
+    
+    @property
+    def primary_subject(self) -> str:
+        """主要学科的类别代码"""
+        subjects = self.subjects
+        return subjects[0] if subjects else ""
+    
+    @property
+    def subject_names(self) -> List[str]:
+        """学科的显示名称"""
+        return [TAXONOMY.display(code) for code in self.subjects]
+    
+    def to_paper(self) -> Paper:
+        """解码全部字段，生成可修改的Paper对象"""
+        return Paper(**{name: self._corpus.field(self._index, name) for name in CORPUS_FIELDS})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式，与 Paper.to_dict 相同"""
+        return self.to_paper().to_dict()
+    
+    def __repr__(self) -> str:
+        return f"PaperView({self._index}, {self.arxiv_id!r})"
+
+
+class Corpus:
+    """
+    只读语料
+    
+    打开时只读取文件头和目录；偏移表直接以 memoryview 访问 mmap 中的数据。
+    
+        with Corpus("corpus.bin") as corpus:
+            paper = corpus.get("2301.12345")
+            titles = list(corpus.iter_field("title"))
+    """
+    
+    def __init__(self, path: str):
+        """
+        打开语料文件
+        
+        Args:
+            path: 语料文件路径
+            
+        Raises:
+            ValueError: 文件格式无效或版本不受支持
+        """
+        if sys.byteorder != "little":
+            raise ValueError("语料文件只支持小端平台直接映射")
+        self.path = path
+        self._tables: Dict[str, memoryview] = {}
+        self._id_index = None
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"语料文件为空: {path}")
+        self._view = memoryview(self._mmap)
+        
+        magic, version, field_count, count, directory_offset, id_index_offset = \
+            CORPUS_HEADER.unpack_from(self._mmap, 0)
+        if magic != CORPUS_MAGIC:
+            self.close()
+            raise ValueError(f"不是语料文件: {path}")
+        if version != CORPUS_VERSION:
+            self.close()
+            raise ValueError(f"不支持的语料文件版本: {version}")
+        
+        self._count = count
+        self._heaps: Dict[str, int] = {}
+        for position in range(field_count):
+            raw_name, table_offset, heap_offset, _ = CORPUS_DIRECTORY_ENTRY.unpack_from(
+                self._mmap, directory_offset + position * CORPUS_DIRECTORY_ENTRY.size)
+            name = raw_name.rstrip(b"\0").decode("ascii")
+            self._tables[name] = self._view[table_offset:table_offset + (count + 1) * 8].cast("Q")
+            self._heaps[name] = heap_offset
+        self._id_index = self._view[id_index_offset:id_index_offset + count * 4].cast("I")
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index: int) -> PaperView:
+        """按序号获取论文视图，支持负数序号"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("语料序号越界")
+        return PaperView(self, index)
+    
+    def __iter__(self) -> Iterator[PaperView]:
+        """按写入顺序遍历论文视图"""
+        for index in range(self._count):
+            yield PaperView(self, index)
+    
+    def __contains__(self, arxiv_id: str) -> bool:
+        return self._find(arxiv_id) is not None
+    
+    def get(self, arxiv_id: str) -> Optional[PaperView]:
+        """
+        按ArXiv ID查找论文，在ID索引上二分查找
+        
+        Returns:
+            论文视图，不存在时返回None；重复的ID返回最先写入的一篇
+        """
+        index = self._find(arxiv_id)
+        return PaperView(self, index) if index is not None else None
+    
+    def raw(self, index: int, name: str) -> bytes:
+        """读取字段的原始UTF-8字节，字段不存在时返回空字节串"""
+        table = self._tables.get(name)
+        if table is None:
+            return b""
+        base = self._heaps[name]
+        return self._mmap[base + table[index]:base + table[index + 1]]
+    
+    def field(self, index: int, name: str) -> Any:
+        """
+        读取并解码一个字段
+        
+        Args:
+            index: 论文序号
+            name: 字段名
+            
+        Returns:
+            字符串；authors/subjects为列表，submission_date为datetime，
+            可选字段为空时为None
+        """
+        text = self.raw(index, name).decode("utf-8")
+        if name in LIST_FIELDS:
+            if not text:
+                return []
+            values = text.split(LIST_SEPARATOR)
+            return [TAXONOMY.intern(value) for value in values] if name == "subjects" else values
+        if name in OPTIONAL_FIELDS:
+            if not text:
+                return None
+            return datetime.fromisoformat(text) if name == "submission_date" else text
+        return text
+    
+    def iter_field(self, name: str) -> Iterator[Any]:
+        """按写入顺序遍历所有论文的一个字段，只触及该字段的偏移表和字符串堆"""
+        for index in range(self._count):
+            yield self.field(index, name)
+    
+    def papers(self) -> Iterator[Paper]:
+        """按写入顺序生成完整的Paper对象"""
+        for view in self:
+            yield view.to_paper()
+    
+    def _find(self, arxiv_id: str) -> Optional[int]:
+        """在按ID排序的索引上二分查找，返回论文序号"""
+        target = arxiv_id.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.raw(self._id_index[middle], "arxiv_id") < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            index = self._id_index[low]
+            if self.raw(index, "arxiv_id") == target:
+                return index
+        return None
+    
+    def close(self):
+        """关闭文件；之后不能再访问本语料产生的视图"""
+        if self._mmap is None:
+            return
+        for table in self._tables.values():
+            table.release()
+        self._tables = {}
+        if self._id_index is not None:
+            self._id_index.release()
+            self._id_index = None
+        self._view.release()
+        self._mmap.close()
+        self._mmap = None
+        self._file.close()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
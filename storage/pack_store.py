@@ -0,0 +1,505 @@
+"""
+追加写入的键值打包存储
+
+记录依次追加到pack文件，索引是一个mmap映射的开放寻址哈希表，按键随机读取
+只需一次哈希探测和一次pread。数据使用zstd压缩（可选共享字典），
+未安装zstandard时回退到zlib。
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# zstd相关导入（可选）
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from config.settings import Config
+
+
+# 压缩方式
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_ZSTD_DICT = 3
+
+# pack记录头: 魔数, 压缩方式, 保留, 键长度, 数据长度
+RECORD_HEADER = struct.Struct("<4sBBHI")
+RECORD_MAGIC = b"AXPK"
+
+# 索引头: 魔数, 槽位数, 条目数, 已索引的pack长度
+INDEX_HEADER = struct.Struct("<8sQQQ")
+INDEX_MAGIC = b"AXIDX002"
+# 旧格式索引没有槽位标志，可写打开时重新构建，只读打开时只按哈希查找
+LEGACY_INDEX_MAGIC = b"AXIDX001"
+
+# 索引槽位: 键哈希(0表示空), 记录偏移, 记录长度, 标志
+INDEX_SLOT = struct.Struct("<QQII")
+
+# 槽位标志：别名槽位指向其他键的记录，无法与记录键比对，只按哈希匹配
+SLOT_ALIAS = 1
+
+INITIAL_CAPACITY = 1024
+MAX_LOAD_FACTOR = 0.7
+
+
+def key_hash(key: str) -> int:
+    """64位键哈希，最低位置1以区分空槽"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1
+
+
+class PackStore:
+    """
+    追加写入的键值打包存储
+    
+    文件布局:
+        <path>.pack   追加写入的记录
+        <path>.idx    mmap映射的哈希索引
+        <path>.dicts/ 训练得到的zstd字典，按字典ID命名
+    
+    同一个键重复写入时，索引指向最新的记录，旧记录保留在pack中。
+    64位键哈希可能冲突，查找时用pack记录中保存的键确认命中，不一致时继续探测。
+    """
+    
+    def __init__(self,
+                 path: str,
+                 compression_level: int = Config.ARCHIVE_COMPRESSION_LEVEL,
+                 readonly: bool = False,
+                 on_reindex: Optional[Callable[["PackStore", str], None]] = None):
+        """
+        打开或创建存储
+        
+        Args:
+            path: 存储路径前缀
+            compression_level: 压缩级别
+            readonly: 是否只读打开
+            on_reindex: 从pack补齐索引时对每条记录调用，用于恢复别名
+        """
+        self.path = path
+        self.compression_level = compression_level
+        self.readonly = readonly
+        self.on_reindex = on_reindex
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        
+        directory = os.path.dirname(path)
+        if directory and not readonly:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.pack_path = path + ".pack"
+        self.index_path = path + ".idx"
+        self.dict_dir = path + ".dicts"
+        
+        pack_mode = os.O_RDONLY if readonly else os.O_RDWR | os.O_CREAT | os.O_APPEND
+        self._pack_fd = os.open(self.pack_path, pack_mode, 0o644)
+        self._pack_size = os.fstat(self._pack_fd).st_size
+        
+        self._index_file = None
+        self._index = None
+        self._capacity = 0
+        self._count = 0
+        self._verify_keys = True
+        self._open_index()
+        
+        self._dictionaries: Dict[int, bytes] = {}
+        self._active_dict_id: Optional[int] = None
+        self._compressors = threading.local()
+        # 字典对象按ID缓存；解压器不是线程安全的，每个线程按字典ID各持有一个
+        self._dict_objects: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._decompressors = threading.local()
+        self._load_dictionaries()
+    
+    def put(self, key: str, data: bytes, alias: Optional[str] = None):
+        """
+        写入一条记录
+        
+        Args:
+            key: 记录键
+            data: 原始数据
+            alias: 可选的别名键，同样指向该记录
+        """
+        if self.readonly:
+            raise IOError("存储以只读方式打开")
+        
+        codec, payload = self._compress(data)
+        key_bytes = key.encode("utf-8")
+        record = RECORD_HEADER.pack(RECORD_MAGIC, codec, 0, len(key_bytes), len(payload)) + key_bytes + payload
+        
+        with self._lock:
+            offset = self._pack_size
+            os.write(self._pack_fd, record)
+            self._pack_size += len(record)
+            self._index_put(key_hash(key), offset, len(record), name=key)
+            if alias:
+                self._index_put(key_hash(alias), offset, len(record), SLOT_ALIAS, alias)
+            self._set_header()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取记录
+        
+        Args:
+            key: 记录键或别名
+            
+        Returns:
+            解压后的数据，不存在时返回None
+        """
+        for offset, length, flags in self._probe(key):
+            record_key, codec, payload = self._read_record(offset, length)
+            if flags & SLOT_ALIAS or not self._verify_keys or record_key == key:
+                return self._decompress(codec, payload)
+        return None
+    
+    def link(self, alias: str, key: str) -> bool:
+        """
+        让别名指向已有记录
+        
+        Returns:
+            记录存在时返回True
+        """
+        location = self._index_get(key)
+        if location is None:
+            return False
+        with self._lock:
+            self._index_put(key_hash(alias), *location, SLOT_ALIAS, alias)
+            self._set_header()
+        return True
+    
+    def record_key(self, key: str) -> Optional[str]:
+        """返回键或别名实际指向的记录键"""
+        location = self._index_get(key)
+        if location is None:
+            return None
+        return self._read_record(*location)[0]
+    
+    def __contains__(self, key: str) -> bool:
+        return self._index_get(key) is not None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def keys(self) -> Iterator[str]:
+        """按写入顺序遍历记录键（重复写入的键会出现多次），只读取记录头和键"""
+        for _, _, key in self._scan_keys(0):
+            yield key
+    
+    def items(self) -> Iterator[Tuple[str, bytes]]:
+        """按写入顺序遍历 (键, 数据)，每个键只返回索引指向的最新记录"""
+        for offset, _, key, codec, payload in self._scan(0):
+            location = self._index_get(key)
+            if location is not None and location[0] == offset:
+                yield key, self._decompress(codec, payload)
+    
+    def train_dictionary(self, samples: Iterable[bytes], dict_size: int = Config.ARCHIVE_DICT_SIZE) -> int:
+        """
+        用样本训练zstd共享字典，之后写入的记录使用该字典压缩
+        
+        Args:
+            samples: 样本数据，通常是几百个典型页面
+            dict_size: 字典大小（字节）
+            
+        Returns:
+            字典ID
+        """
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("训练字典需要安装zstandard")
+        
+        dictionary = zstandard.train_dictionary(dict_size, list(samples))
+        dict_id = dictionary.dict_id()
+        os.makedirs(self.dict_dir, exist_ok=True)
+        with open(os.path.join(self.dict_dir, f"{dict_id}.zdict"), "wb") as f:
+            f.write(dictionary.as_bytes())
+        
+        with self._lock:
+            self._dictionaries[dict_id] = dictionary.as_bytes()
+            self._active_dict_id = dict_id
+            self._compressors = threading.local()
+        self.logger.info(f"已训练zstd字典 {dict_id}，大小 {len(dictionary.as_bytes())} 字节")
+        return dict_id
+    
+    def flush(self):
+        """把索引刷新到磁盘"""
+        with self._lock:
+            if self._index is not None and not self.readonly:
+                self._index.flush()
+    
+    def close(self):
+        """关闭存储"""
+        with self._lock:
+            if self._index is not None:
+                self.flush()
+                self._index.close()
+                self._index = None
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+            if self._pack_fd is not None:
+                os.close(self._pack_fd)
+                self._pack_fd = None
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    def _compress(self, data: bytes) -> Tuple[int, bytes]:
+        """按可用的最佳方式压缩数据"""
+        if ZSTD_AVAILABLE:
+            compressor = getattr(self._compressors, "compressor", None)
+            if compressor is None:
+                dict_data = None
+                if self._active_dict_id is not None:
+                    dict_data = self._dict_object(self._active_dict_id)
+                compressor = zstandard.ZstdCompressor(level=self.compression_level, dict_data=dict_data)
+                self._compressors.compressor = compressor
+            codec = CODEC_ZSTD_DICT if self._active_dict_id is not None else CODEC_ZSTD
+            return codec, compressor.compress(data)
+        
+        return CODEC_ZLIB, zlib.compress(data, min(self.compression_level, 9))
+    
+    def _decompress(self, codec: int, payload: bytes) -> bytes:
+        """按记录中的压缩方式解压"""
+        if codec == CODEC_RAW:
+            return payload
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(payload)
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("读取zstd压缩的记录需要安装zstandard")
+        
+        dict_id = None
+        if codec == CODEC_ZSTD_DICT:
+            dict_id = zstandard.get_frame_parameters(payload).dict_id
+            if dict_id not in self._dictionaries:
+                raise KeyError(f"缺少zstd字典: {dict_id}")
+        
+        decompressors = getattr(self._decompressors, "by_dict", None)
+        if decompressors is None:
+            decompressors = self._decompressors.by_dict = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dict_data = self._dict_object(dict_id) if dict_id is not None else None
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dict_data)
+        return decompressor.decompress(payload)
+    
+    def _dict_object(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        """按ID返回缓存的字典对象，首次使用时构造"""
+        with self._lock:
+            dict_data = self._dict_objects.get(dict_id)
+            if dict_data is None:
+                dict_data = self._dict_objects[dict_id] = zstandard.ZstdCompressionDict(self._dictionaries[dict_id])
+            return dict_data
+    
+    def _load_dictionaries(self):
+        """加载已训练的字典，最近修改的一个作为写入字典"""
+        if not os.path.isdir(self.dict_dir):
+            return
+        
+        latest = None
+        for name in os.listdir(self.dict_dir):
+            if not name.endswith(".zdict"):
+                continue
+            file_path = os.path.join(self.dict_dir, name)
+            with open(file_path, "rb") as f:
+                self._dictionaries[int(name[:-len(".zdict")])] = f.read()
+            mtime = os.path.getmtime(file_path)
+            if latest is None or mtime > latest[0]:
+                latest = (mtime, int(name[:-len(".zdict")]))
+        
+        if latest is not None and ZSTD_AVAILABLE:
+            self._active_dict_id = latest[1]
+    
+    def _read_record(self, offset: int, length: int) -> Tuple[str, int, bytes]:
+        """读取一条记录，返回 (键, 压缩方式, 负载)"""
+        record = os.pread(self._pack_fd, length, offset)
+        magic, codec, _, key_length, data_length = RECORD_HEADER.unpack_from(record)
+        if magic != RECORD_MAGIC:
+            raise IOError(f"pack记录损坏: 偏移 {offset}")
+        key_end = RECORD_HEADER.size + key_length
+        return record[RECORD_HEADER.size:key_end].decode("utf-8"), codec, record[key_end:key_end + data_length]
+    
+    def _scan(self, start: int) -> Iterator[Tuple[int, int, str, int, bytes]]:
+        """
+        从指定偏移顺序扫描pack记录，遇到不完整的尾部记录时停止
+        
+        Yields:
+            (偏移, 记录长度, 键, 压缩方式, 负载)
+        """
+        for offset, length, _ in self._scan_keys(start):
+            key, codec, payload = self._read_record(offset, length)
+            yield offset, length, key, codec, payload
+    
+    def _scan_keys(self, start: int) -> Iterator[Tuple[int, int, str]]:
+        """
+        从指定偏移顺序扫描pack记录的头和键，跳过负载，遇到不完整的尾部记录时停止
+        
+        Yields:
+            (偏移, 记录长度, 键)
+        """
+        offset = start
+        end = self._pack_size
+        while offset + RECORD_HEADER.size <= end:
+            header = os.pread(self._pack_fd, RECORD_HEADER.size, offset)
+            magic, _, _, key_length, data_length = RECORD_HEADER.unpack(header)
+            length = RECORD_HEADER.size + key_length + data_length
+            if magic != RECORD_MAGIC or offset + length > end:
+                self.logger.warning(f"pack文件在偏移 {offset} 处不完整，忽略之后的数据")
+                return
+            key = os.pread(self._pack_fd, key_length, offset + RECORD_HEADER.size).decode("utf-8")
+            yield offset, length, key
+            offset += length
+    
+    def _open_index(self):
+        """打开索引；索引缺失、损坏或落后于pack时补齐"""
+        indexed_size = 0
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) >= INDEX_HEADER.size:
+            self._map_index(readonly=self.readonly)
+            magic, capacity, count, indexed_size = INDEX_HEADER.unpack_from(self._index, 0)
+            expected_size = INDEX_HEADER.size + capacity * INDEX_SLOT.size
+            legacy = magic == LEGACY_INDEX_MAGIC and self.readonly
+            if ((magic != INDEX_MAGIC and not legacy)
+                    or len(self._index) != expected_size or indexed_size > self._pack_size):
+                self.logger.warning("索引文件无效或格式已过期，重新构建")
+                self._unmap_index()
+                indexed_size = 0
+            else:
+                self._capacity, self._count = capacity, count
+                self._verify_keys = not legacy
+        
+        if self._index is None:
+            if self.readonly:
+                raise IOError(f"索引文件不可用: {self.index_path}")
+            self._create_index(INITIAL_CAPACITY)
+        
+        if indexed_size < self._pack_size:
+            if self.readonly:
+                self.logger.warning("索引落后于pack文件，只读模式下尾部记录不可见")
+            else:
+                self._reindex_from(indexed_size)
+    
+    def _reindex_from(self, start: int):
+        """把pack中尚未索引的记录加入索引"""
+        added = 0
+        for offset, length, key in self._scan_keys(start):
+            self._index_put(key_hash(key), offset, length, name=key)
+            if self.on_reindex is not None:
+                self.on_reindex(self, key)
+            added += 1
+        self._set_header()
+        if added:
+            self.logger.info(f"索引补齐 {added} 条记录")
+    
+    def _map_index(self, readonly: bool = False):
+        """mmap映射索引文件"""
+        self._index_file = open(self.index_path, "rb" if readonly else "r+b")
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=access)
+    
+    def _unmap_index(self):
+        """解除索引映射"""
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+    
+    def _create_index(self, capacity: int, slots: Optional[List[Tuple[int, int, int]]] = None):
+        """创建指定容量的空索引，并写入已有槽位"""
+        self._unmap_index()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.truncate(INDEX_HEADER.size + capacity * INDEX_SLOT.size)
+        os.replace(tmp_path, self.index_path)
+        
+        self._map_index()
+        self._capacity = capacity
+        self._count = 0
+        for slot in slots or []:
+            self._insert_slot(*slot)
+        self._set_header()
+    
+    def _set_header(self):
+        """更新索引头"""
+        INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, self._capacity, self._count, self._pack_size)
+    
+    def _slot_offset(self, position: int) -> int:
+        return INDEX_HEADER.size + position * INDEX_SLOT.size
+    
+    def _insert_slot(self, hash_value: int, offset: int, length: int, flags: int = 0, name: Optional[str] = None):
+        """
+        线性探测插入或覆盖槽位
+        
+        Args:
+            hash_value: 键哈希
+            offset: 记录偏移
+            length: 记录长度
+            flags: 槽位标志
+            name: 槽位对应的键或别名；遇到哈希相同的槽位时只有确认是同一个键才覆盖，
+                  否则继续探测。为None时（扩容重建）只写入空槽位
+        """
+        mask = self._capacity - 1
+        position = hash_value & mask
+        while True:
+            slot_offset = self._slot_offset(position)
+            existing, existing_offset, _, existing_flags = INDEX_SLOT.unpack_from(self._index, slot_offset)
+            if existing == 0:
+                self._count += 1
+                break
+            if existing == hash_value and name is not None and self._slot_matches(name, existing_offset, existing_flags):
+                break
+            position = (position + 1) & mask
+        INDEX_SLOT.pack_into(self._index, slot_offset, hash_value, offset, length, flags)
+    
+    def _index_put(self, hash_value: int, offset: int, length: int, flags: int = 0, name: Optional[str] = None):
+        """写入索引，负载过高时扩容"""
+        if (self._count + 1) > self._capacity * MAX_LOAD_FACTOR:
+            slots = []
+            for position in range(self._capacity):
+                slot = INDEX_SLOT.unpack_from(self._index, self._slot_offset(position))
+                if slot[0]:
+                    slots.append(slot)
+            self._create_index(self._capacity * 2, slots)
+        self._insert_slot(hash_value, offset, length, flags, name)
+    
+    def _probe(self, key: str) -> List[Tuple[int, int, int]]:
+        """探测键哈希相同的全部槽位，返回 (偏移, 长度, 标志) 列表，通常只有一项"""
+        hash_value = key_hash(key)
+        candidates = []
+        with self._lock:
+            mask = self._capacity - 1
+            position = hash_value & mask
+            while True:
+                slot_hash, offset, length, flags = INDEX_SLOT.unpack_from(self._index, self._slot_offset(position))
+                if slot_hash == 0:
+                    return candidates
+                if slot_hash == hash_value:
+                    candidates.append((offset, length, flags))
+                position = (position + 1) & mask
+    
+    def _index_get(self, key: str) -> Optional[Tuple[int, int]]:
+        """查找键对应的 (偏移, 长度)"""
+        for offset, length, flags in self._probe(key):
+            if self._slot_matches(key, offset, flags):
+                return offset, length
+        return None
+    
+    def _slot_matches(self, key: str, offset: int, flags: int) -> bool:
+        """哈希相同的槽位是否属于该键：普通槽位比对pack记录中的键，别名槽位只能按哈希认定"""
+        if flags & SLOT_ALIAS or not self._verify_keys:
+            return True
+        key_bytes = key.encode("utf-8")
+        record = os.pread(self._pack_fd, RECORD_HEADER.size + len(key_bytes), offset)
+        key_length = RECORD_HEADER.unpack_from(record)[3]
+        return key_length == len(key_bytes) and record[RECORD_HEADER.size:] == key_bytes
@@ -1,19 +1,27 @@
 """工具模块"""
 
-from utils.http_client import HttpClient, get_default_client, get_html
+from utils.http_client import HttpClient, RateLimiter, SharedRateLimiter, get_default_client, get_html
 from utils.text_utils import (
     extract_total_count,
     clean_text,
     split_subjects,
     generate_page_params,
     extract_arxiv_id,
+    split_arxiv_version,
+    strip_arxiv_version,
+    parse_arxiv_id,
     normalize_url,
     clean_html_content
 )
+from utils.cancellation import CancellationToken, HarvestCancelled
+from utils.codec import PaperCodec, get_codec, save_papers, load_papers
+from utils.progress import HarvestProgress
 from utils.output_formatter import OutputFormatter, get_default_formatter, set_rich_output
 
 __all__ = [
     "HttpClient",
+    "RateLimiter",
+    "SharedRateLimiter",
     "get_default_client", 
     "get_html",
     "extract_total_count",
@@ -21,8 +29,18 @@ __all__ = [
     "split_subjects",
     "generate_page_params",
     "extract_arxiv_id",
+    "split_arxiv_version",
+    "strip_arxiv_version",
+    "parse_arxiv_id",
     "normalize_url",
     "clean_html_content",
+    "CancellationToken",
+    "HarvestCancelled",
+    "PaperCodec",
+    "get_codec",
+    "save_papers",
+    "load_papers",
+    "HarvestProgress",
     "OutputFormatter",
     "get_default_formatter",
     "set_rich_output"
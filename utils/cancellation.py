@@ -0,0 +1,104 @@
+"""
+协作式取消
+
+CancellationToken 在抓取的各层之间传递：HTTP客户端在发请求和限速等待前检查它，
+并把请求超时缩短到剩余时间；爬虫在每页和每篇论文之间检查它。令牌可以被显式
+取消，也可以设置截止时间到期自动取消。
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class HarvestCancelled(Exception):
+    """抓取被取消或超过时间预算"""
+
+
+class CancellationToken:
+    """
+    线程安全的取消令牌
+    
+    子令牌在父令牌取消时同样视为已取消，可用于给某一步单独设置更短的时限。
+    """
+    
+    def __init__(self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        """
+        创建令牌
+        
+        Args:
+            timeout: 时间预算（秒），None表示不限时
+            parent: 可选的父令牌
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.parent = parent
+        self._event = threading.Event()
+        self._reason = ""
+    
+    def child(self, timeout: Optional[float] = None) -> "CancellationToken":
+        """创建子令牌，截止时间不晚于本令牌"""
+        return CancellationToken(timeout, parent=self)
+    
+    def cancel(self, reason: str = "已取消"):
+        """取消令牌，可从任意线程调用"""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消或超时"""
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("超过时间预算")
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        return False
+    
+    @property
+    def reason(self) -> str:
+        """取消原因，未取消时为空字符串"""
+        return self._reason
+    
+    def remaining(self) -> Optional[float]:
+        """
+        距最近截止时间的剩余秒数
+        
+        Returns:
+            剩余秒数（不小于0），没有截止时间时返回None
+        """
+        remaining = None
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.monotonic())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None:
+                remaining = parent_remaining if remaining is None else min(remaining, parent_remaining)
+        return remaining
+    
+    def raise_if_cancelled(self):
+        """已取消时抛出 HarvestCancelled"""
+        if self.cancelled:
+            raise HarvestCancelled(self.reason)
+    
+    def sleep(self, seconds: float):
+        """
+        可被取消打断的等待
+        
+        Raises:
+            HarvestCancelled: 等待期间被取消，或截止时间早于等待结束
+        """
+        end = time.monotonic() + seconds
+        while True:
+            self.raise_if_cancelled()
+            wait = end - time.monotonic()
+            if wait <= 0:
+                return
+            remaining = self.remaining()
+            if remaining is not None and remaining < wait:
+                wait = remaining
+            # 父令牌被取消时不会唤醒本令牌的事件，因此分段等待
+            self._event.wait(min(wait, 0.5))
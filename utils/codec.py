@@ -0,0 +1,291 @@
+"""
+论文序列化编解码
+
+批量导出和重新加载大量论文时，逐篇调用 Paper.to_dict / from_dict 会为每篇论文构造
+包含计算属性的中间字典，并逐条解析日期。这里按字段顺序把论文编码为行（列表），
+整批只写一次字段名；解码时按行直接填充Paper实例，不经过 from_dict。
+
+支持的编码：
+- orjson：安装了orjson时的默认编码，输出JSON
+- json：标准库JSON，输出与orjson兼容
+- msgpack：二进制格式，体积更小，需要安装msgpack
+"""
+
+import gc
+import json
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import fields
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+from config.settings import Config
+from config.taxonomy import TAXONOMY
+from models.paper import Paper
+
+
+# 批量格式版本
+CODEC_FORMAT_VERSION = 1
+
+# 行中的字段顺序，与Paper的字段定义一致
+PAPER_FIELDS = tuple(field.name for field in fields(Paper))
+
+# 不含详细内容的字段，只导出元数据时使用
+METADATA_FIELDS = tuple(name for name in PAPER_FIELDS if name != "full_content")
+
+_ROW_GETTERS = {PAPER_FIELDS: attrgetter(*PAPER_FIELDS), METADATA_FIELDS: attrgetter(*METADATA_FIELDS)}
+_DATE_INDEX = METADATA_FIELDS.index("submission_date")
+_SUBJECTS_INDEX = METADATA_FIELDS.index("subjects")
+
+
+@contextmanager
+def _gc_paused():
+    """
+    批量创建对象期间暂停循环垃圾回收
+    
+    解码产生数十万个无环的小对象，分代回收会被反复触发却回收不到任何东西。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _default(value: Any) -> Any:
+    """编码器无法直接处理的值"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+class PaperCodec(ABC):
+    """
+    编解码器基类
+    
+    子类只需实现 dumps / loads，行的构造和还原在基类中完成。
+    """
+    
+    name = ""
+    binary = False  # 输出是否为二进制（不能按文本行写入）
+    
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """把由字典、列表和基本类型组成的对象编码为字节串"""
+    
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """解码字节串"""
+    
+    def encode(self, paper: Paper) -> bytes:
+        """编码单篇论文为一行"""
+        return self.dumps(_ROW_GETTERS[PAPER_FIELDS](paper))
+    
+    def decode(self, data: bytes) -> Paper:
+        """解码 encode 的输出"""
+        return self._build(PAPER_FIELDS, self.loads(data), {})
+    
+    def encode_many(self, papers: Iterable[Paper], include_content: bool = True) -> bytes:
+        """
+        批量编码论文
+        
+        Args:
+            papers: 论文可迭代对象
+            include_content: 是否包含详细内容；为False时不会触发延迟内容的加载
+            
+        Returns:
+            包含字段名和全部行的字节串
+        """
+        names = PAPER_FIELDS if include_content else METADATA_FIELDS
+        get_row = _ROW_GETTERS[names]
+        with _gc_paused():
+            rows = [get_row(paper) for paper in papers]
+        return self.dumps({"version": CODEC_FORMAT_VERSION, "fields": names, "rows": rows})
+    
+    def decode_many(self, data: bytes) -> List[Paper]:
+        """
+        批量解码 encode_many 的输出
+        
+        字段名与当前Paper定义不一致时（旧版本写出的数据）按字段名对应，缺少的字段取默认值。
+        
+        Raises:
+            ValueError: 数据格式版本不受支持
+        """
+        with _gc_paused():
+            batch = self.loads(data)
+            if batch.get("version") != CODEC_FORMAT_VERSION:
+                raise ValueError(f"不支持的编码格式版本: {batch.get('version')}")
+            names = tuple(batch["fields"])
+            dates: Dict[str, datetime] = {}
+            return [self._build(names, row, dates) for row in batch["rows"]]
+    
+    @staticmethod
+    def _build(names: Sequence[str], row: Sequence[Any], dates: Dict[str, datetime]) -> Paper:
+        """
+        由行还原Paper
+        
+        行由本模块写出，字段已经过 __post_init__ 清理，因此跳过构造函数直接填充实例；
+        学科重新驻留以共享代码字符串，相同的日期字符串只解析一次。
+        """
+        if names not in _ROW_GETTERS:
+            return Paper.from_dict(dict(zip(names, row)))
+        
+        values = list(row)
+        
+        date = values[_DATE_INDEX]
+        if date is not None:
+            parsed = dates.get(date)
+            if parsed is None:
+                parsed = dates[date] = datetime.fromisoformat(date)
+            values[_DATE_INDEX] = parsed
+        values[_SUBJECTS_INDEX] = [TAXONOMY.intern(subject) for subject in values[_SUBJECTS_INDEX]]
+        
+        paper = Paper.__new__(Paper)
+        paper.__dict__.update(zip(names, values))
+        # full_content 是属性，实例字典中的同名条目不会被读取
+        content = paper.__dict__.pop("full_content", None)
+        if content is not None:
+            paper.full_content = content
+        return paper
+
+
+class JsonCodec(PaperCodec):
+    """标准库JSON编码"""
+    
+    name = "json"
+    
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(PaperCodec):
+    """orjson编码，输出与JsonCodec互相兼容"""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        if not ORJSON_AVAILABLE:
+            raise RuntimeError("orjson编码需要安装orjson")
+    
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(PaperCodec):
+    """msgpack二进制编码"""
+    
+    name = "msgpack"
+    binary = True
+    
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack编码需要安装msgpack")
+    
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[str, Type[PaperCodec]] = {
+    "orjson": OrjsonCodec,
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+_instances: Dict[str, PaperCodec] = {}
+
+
+def get_codec(name: Optional[str] = None) -> PaperCodec:
+    """
+    获取编解码器
+    
+    Args:
+        name: "orjson"、"json"、"msgpack" 或 "auto"；默认取 Config.SERIALIZATION_CODEC。
+              "auto" 在安装了orjson时使用orjson，否则使用标准库json
+              
+    Returns:
+        共享的编解码器实例
+        
+    Raises:
+        ValueError: 未知的编码名称
+        RuntimeError: 所需的库未安装
+    """
+    name = name or Config.SERIALIZATION_CODEC
+    if name == "auto":
+        name = "orjson" if ORJSON_AVAILABLE else "json"
+    codec = _instances.get(name)
+    if codec is None:
+        if name not in CODECS:
+            raise ValueError(f"未知的编码: {name}，可选: {', '.join(CODECS)}")
+        codec = _instances[name] = CODECS[name]()
+    return codec
+
+
+def json_codec() -> PaperCodec:
+    """可用的最快JSON编解码器：orjson，未安装时为标准库json"""
+    return get_codec("orjson" if ORJSON_AVAILABLE else "json")
+
+
+def dumps_text(obj: Any) -> str:
+    """用最快的JSON编码器把对象编码为文本，不转义非ASCII字符"""
+    return json_codec().dumps(obj).decode("utf-8")
+
+
+def save_papers(path: str, papers: Iterable[Paper], codec: Optional[str] = None) -> int:
+    """
+    把论文批量编码后写入文件
+    
+    Args:
+        path: 文件路径
+        papers: 论文可迭代对象
+        codec: 编码名称，默认取 Config.SERIALIZATION_CODEC
+        
+    Returns:
+        写入的字节数
+    """
+    data = get_codec(codec).encode_many(papers)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def load_papers(path: str) -> List[Paper]:
+    """
+    读取 save_papers 写出的文件，按内容自动识别JSON或msgpack
+    
+    Args:
+        path: 文件路径
+        
+    Returns:
+        论文列表
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.lstrip()[:1] == b"{":
+        return json_codec().decode_many(data)
+    return get_codec("msgpack").decode_many(data)
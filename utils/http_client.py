@@ -5,24 +5,202 @@ HTTP客户端
 """
 
 import requests
+import sqlite3
 import time
 import logging
-from typing import Optional, Dict, Any
+import threading
+import weakref
+from typing import Callable, Optional, Dict, Any
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from urllib3 import PoolManager
 from contextlib import contextmanager
 
 from config.settings import Config
+from utils.cancellation import CancellationToken, HarvestCancelled
+
+
+def _sleep(seconds: float, token: Optional[CancellationToken]):
+    """等待指定时间，提供取消令牌时可被取消打断"""
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.sleep(seconds)
+
+
+class RateLimiter:
+    """线程安全的请求速率限制器
+    
+    保证相邻两次请求的发出时间间隔不小于 1/rate 秒，多个线程共享同一个实例时
+    整体速率同样受限。
+    """
+    
+    def __init__(self, rate: Optional[float] = None):
+        """
+        初始化速率限制器
+        
+        Args:
+            rate: 每秒最多请求数，None或<=0表示不限速
+        """
+        self.rate = rate
+        self.min_interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+    
+    def acquire(self, token: Optional[CancellationToken] = None):
+        """
+        阻塞直到允许发出下一个请求
+        
+        Args:
+            token: 可选的取消令牌，等待期间被取消时抛出 HarvestCancelled
+        """
+        if not self.min_interval:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        
+        if wait > 0:
+            _sleep(wait, token)
+
+
+class SharedRateLimiter:
+    """跨进程共享的请求速率限制器
+    
+    下一次允许请求的时间保存在SQLite文件中，每次获取许可在一个写事务内
+    读取并推进该时间，因此同一文件上的所有进程合计速率不超过rate。
+    数据库使用WAL日志模式，文件须位于本机文件系统，只能在单台主机的进程之间共享。
+    """
+    
+    def __init__(self, path: str, rate: Optional[float], name: str = "default"):
+        """
+        初始化速率限制器
+        
+        Args:
+            path: SQLite数据库文件路径，可以与工作队列共用
+            rate: 每秒最多请求数，None或<=0表示不限速
+            name: 限速桶名称，同一文件中可以保存多个互不影响的桶
+        """
+        self.rate = rate
+        self.min_interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.name = name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit (name TEXT PRIMARY KEY, next_allowed REAL NOT NULL)"
+        )
+    
+    def acquire(self, token: Optional[CancellationToken] = None):
+        """
+        阻塞直到允许发出下一个请求
+        
+        Args:
+            token: 可选的取消令牌，等待期间被取消时抛出 HarvestCancelled
+        """
+        if not self.min_interval:
+            return
+        
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT next_allowed FROM rate_limit WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                next_allowed = row[0] if row else 0.0
+                wait = next_allowed - now
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO rate_limit (name, next_allowed) VALUES (?, ?)",
+                    (self.name, max(now, next_allowed) + self.min_interval)
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        
+        if wait > 0:
+            _sleep(wait, token)
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._connection.close()
+
+
+class _CountingPoolManager(PoolManager):
+    """统计连接池中请求数和新建连接数的PoolManager"""
+    
+    def __init__(self, *args, count: Callable[[str], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count = count
+    
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        count = self.count
+        new_conn = pool._new_conn
+        urlopen = pool.urlopen
+        
+        def counted_new_conn():
+            count("connections")
+            return new_conn()
+        
+        def counted_urlopen(*args, **kwargs):
+            # urllib3重试时递归调用实例的urlopen，每次尝试都会计数
+            count("requests")
+            return urlopen(*args, **kwargs)
+        
+        pool._new_conn = counted_new_conn
+        pool.urlopen = counted_urlopen
+        return pool
+
+
+class PooledAdapter(HTTPAdapter):
+    """使用 _CountingPoolManager 的HTTPAdapter，由HttpClient的所有session共用"""
+    
+    def __init__(self, count: Callable[[str], None], **kwargs):
+        """
+        Args:
+            count: 计数回调，参数为 "requests" 或 "connections"
+            **kwargs: 传给HTTPAdapter的参数（pool_connections、pool_maxsize、pool_block、max_retries）
+        """
+        self.count = count
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(num_pools=connections, maxsize=maxsize, block=block,
+                                                count=self.count, **pool_kwargs)
 
 
 class HttpClient:
-    """HTTP客户端类"""
+    """HTTP客户端类
+    
+    连接失败、超时和 RETRY_STATUSES 中的状态码由 get() 自己重试，而不是交给urllib3：
+    每次尝试都经过速率限制和取消令牌，退避等待可以被取消打断。
+    
+    每个线程使用自己的 requests.Session（请求头、cookie等状态不在线程间共享），
+    所有session挂载同一个连接池适配器，因此keep-alive连接可以被任意线程复用。
+    连接池按主机保留最多 pool_maxsize 个连接，应不小于并发请求的线程数，
+    否则多出的连接用完即被丢弃，下一次请求需要重新握手。
+    """
+    
+    # 可重试的HTTP状态码
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
     
     def __init__(self, 
                  timeout: int = Config.REQUEST_TIMEOUT,
                  max_retries: int = Config.MAX_RETRIES,
                  retry_delay: float = Config.RETRY_DELAY,
-                 headers: Optional[Dict[str, str]] = None):
+                 headers: Optional[Dict[str, str]] = None,
+                 rate_limit: Optional[float] = Config.RATE_LIMIT,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 pool_connections: int = Config.HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = Config.HTTP_POOL_MAXSIZE,
+                 pool_block: bool = Config.HTTP_POOL_BLOCK):
         """
         初始化HTTP客户端
         
@@ -31,53 +209,175 @@ class HttpClient:
             max_retries: 最大重试次数
             retry_delay: 重试延迟时间
             headers: 默认请求头
+            rate_limit: 每秒最多请求数，None表示不限速
+            rate_limiter: 共享的速率限制器，提供时忽略rate_limit
+            pool_connections: 缓存连接池的主机数
+            pool_maxsize: 每个主机保留的最大连接数
+            pool_block: 连接全部占用时是否等待空闲连接，而不是新建用完即丢弃的连接
         """
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.rate_limiter = rate_limiter or RateLimiter(rate_limit)
         self.logger = logging.getLogger(__name__)
         
-        # 创建session
-        self.session = requests.Session()
-        
         # 设置默认请求头
-        default_headers = Config.REQUEST_HEADERS.copy()
+        self.headers = Config.REQUEST_HEADERS.copy()
         if headers:
-            default_headers.update(headers)
-        self.session.headers.update(default_headers)
-        
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=retry_delay,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+            self.headers.update(headers)
+        
+        # 连接统计：requests为发出的请求数（含重试），connections为新建的连接数
+        self.stats = {"requests": 0, "connections": 0}
+        self._stats_lock = threading.Lock()
+        
+        # 重试在get()中进行，适配器本身不重试
+        self.adapter = PooledAdapter(self._count,
+                                     pool_connections=pool_connections,
+                                     pool_maxsize=pool_maxsize,
+                                     pool_block=pool_block,
+                                     max_retries=0)
+        
+        # 线程结束后其session随线程局部存储一起释放，这里只保留弱引用用于关闭
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
     
-    def get(self, url: str, **kwargs) -> requests.Response:
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的session，首次使用时创建"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+    
+    def _count(self, key: str):
+        """连接池计数回调"""
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """
+        keep-alive连接复用统计
+        
+        Returns:
+            包含 requests（请求数）、connections（新建连接数）、reused（复用已有连接的请求数）、
+            reuse_rate（复用比例）和 sessions（已创建的线程session数）的字典
+        """
+        with self._stats_lock:
+            requests_sent = self.stats["requests"]
+            connections = self.stats["connections"]
+        reused = max(0, requests_sent - connections)
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": reused,
+            "reuse_rate": reused / requests_sent if requests_sent else 0.0,
+            "sessions": len(self._sessions),
+        }
+    
+    def get(self, url: str, token: Optional[CancellationToken] = None, **kwargs) -> requests.Response:
         """
         发送GET请求
         
+        连接失败、超时和可重试的状态码最多重试 max_retries 次，间隔从 retry_delay 开始
+        指数增长，响应带 Retry-After 秒数时按其等待。提供取消令牌时，每次尝试的超时
+        不超过剩余时间，退避等待随令牌取消而中断，因此包括重试在内的整个请求不会越过
+        时间预算。
+        
         Args:
             url: 请求URL
+            token: 可选的取消令牌
             **kwargs: 其他请求参数
             
         Returns:
             Response对象
             
         Raises:
-            requests.RequestException: 请求失败
+            requests.RequestException: 请求失败且重试次数用尽
+            HarvestCancelled: 请求前、请求期间或重试等待期间被取消、超过时间预算
         """
+        attempt = 0
+        while True:
+            timeout = self.timeout
+            try:
+                if token is not None:
+                    token.raise_if_cancelled()
+                self.rate_limiter.acquire(token)
+                if token is not None:
+                    remaining = token.remaining()
+                    if remaining is not None:
+                        timeout = max(min(timeout, remaining), 0.001)
+                self.logger.debug(f"发送GET请求: {url}")
+                response = self.session.get(url, timeout=timeout, **kwargs)
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                wait = self._retry_after(response)
+                reason = f"HTTP {response.status_code}"
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if token is not None and token.cancelled:
+                    raise HarvestCancelled(token.reason) from e
+                if attempt >= self.max_retries:
+                    self.logger.error(f"请求失败: {url}, 错误: {e}")
+                    raise
+                wait = None
+                reason = str(e)
+            except requests.RequestException as e:
+                if token is not None and token.cancelled:
+                    raise HarvestCancelled(token.reason) from e
+                self.logger.error(f"请求失败: {url}, 错误: {e}")
+                raise
+            
+            attempt += 1
+            if wait is None:
+                wait = self.retry_delay * 2 ** (attempt - 1)
+            self.logger.warning(f"请求失败，{wait:.1f}秒后第{attempt}次重试: {url}, 原因: {reason}")
+            _sleep(wait, token)
+    
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """响应头 Retry-After 中的等待秒数，没有或不是秒数时返回None"""
+        value = response.headers.get("Retry-After")
         try:
-            self.logger.debug(f"发送GET请求: {url}")
-            response = self.session.get(url, timeout=self.timeout, **kwargs)
-            response.raise_for_status()
-            return response
-        except requests.RequestException as e:
-            self.logger.error(f"请求失败: {url}, 错误: {e}")
-            raise
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None
+    
+    def get_conditional(self, 
+                        url: str,
+                        etag: Optional[str] = None,
+                        last_modified: Optional[str] = None,
+                        **kwargs) -> Optional[requests.Response]:
+        """
+        发送条件GET请求
+        
+        Args:
+            url: 请求URL
+            etag: 上次响应的ETag
+            last_modified: 上次响应的Last-Modified
+            **kwargs: 其他请求参数
+            
+        Returns:
+            Response对象，内容未修改(304)时返回None
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
+        response = self.get(url, headers=headers, **kwargs)
+        if response.status_code == 304:
+            self.logger.debug(f"内容未修改: {url}")
+            return None
+        return response
     
     def get_text(self, url: str, **kwargs) -> str:
         """
@@ -94,8 +394,14 @@ class HttpClient:
         return response.text
     
     def close(self):
-        """关闭session"""
-        self.session.close()
+        """关闭所有线程的session和连接池"""
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+            self._sessions = weakref.WeakSet()
+        for session in sessions:
+            session.close()
+        self.adapter.close()
+        self._local = threading.local()
     
     def __enter__(self):
         """上下文管理器入口"""
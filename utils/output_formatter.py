@@ -6,7 +6,10 @@
 
 import os
 import sys
-from typing import List, Dict, Any, Optional, Union
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Iterable, Optional, Union
 from datetime import datetime
 
 # Rich相关导入（可选）
@@ -16,26 +19,29 @@ try:
     from rich.panel import Panel
     from rich.text import Text
     from rich.tree import Tree
-    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
     from rich.columns import Columns
     from rich.align import Align
+    from rich.live import Live
     RICH_AVAILABLE = True
 except ImportError:
     RICH_AVAILABLE = False
 
 from config.settings import Config, get_env_config
 from models.paper import Paper, PaperContent
+from utils.progress import HarvestProgress, RateMeter, format_eta
 
 
 class OutputFormatter:
     """输出格式化器"""
     
-    def __init__(self, enable_rich: Optional[bool] = None):
+    def __init__(self, enable_rich: Optional[bool] = None, file=None):
         """
         初始化输出格式化器
         
         Args:
             enable_rich: 是否启用Rich输出，None时从配置读取
+            file: Rich控制台的输出流，None时为标准输出
         """
         env_config = get_env_config()
         
@@ -55,7 +61,7 @@ class OutputFormatter:
         
         # 初始化Rich控制台
         if self.enable_rich and RICH_AVAILABLE:
-            self.console = Console(width=Config.TABLE_MAX_WIDTH)
+            self.console = Console(width=Config.TABLE_MAX_WIDTH, file=file)
         else:
             self.console = None
             self.enable_rich = False  # 如果Rich不可用，强制关闭
@@ -188,48 +194,9 @@ class OutputFormatter:
             return
         
         if self.enable_rich:
-            table = Table(title=title, show_header=True, header_style="bold magenta")
-            table.add_column("ArXiv ID", style="cyan", no_wrap=True)
-            table.add_column("标题", style="green", max_width=Config.TRUNCATE_TITLE_LENGTH)
-            table.add_column("作者", style="yellow", max_width=30)
-            table.add_column("学科", style="blue", max_width=20)
-            
-            if self.show_detailed_info:
-                table.add_column("PDF", style="magenta", justify="center")
-                table.add_column("HTML", style="red", justify="center")
-                table.add_column("评论", style="dim", max_width=30)
-            
+            table = self._papers_table(title)
             for paper in papers:
-                # 处理标题
-                title_text = paper.title
-                if len(title_text) > Config.TRUNCATE_TITLE_LENGTH:
-                    title_text = title_text[:Config.TRUNCATE_TITLE_LENGTH-3] + "..."
-                
-                # 处理作者
-                authors_text = ", ".join(paper.authors[:3])
-                if len(paper.authors) > 3:
-                    authors_text += f" (+{len(paper.authors)-3})"
-                
-                # 处理学科
-                subjects_text = paper.primary_subject
-                if len(paper.subjects) > 1:
-                    subjects_text += f" (+{len(paper.subjects)-1})"
-                
-                row_data = [
-                    paper.arxiv_id,
-                    title_text,
-                    authors_text,
-                    subjects_text
-                ]
-                
-                if self.show_detailed_info:
-                    row_data.extend([
-                        "✓" if paper.has_pdf else "✗",
-                        "✓" if paper.has_html else "✗",
-                        paper.comments[:27] + "..." if len(paper.comments) > 30 else paper.comments
-                    ])
-                
-                table.add_row(*row_data)
+                table.add_row(*self._paper_row(paper))
             
             self.console.print(table)
         else:
@@ -237,12 +204,121 @@ class OutputFormatter:
             print(f"\n{title}")
             print("-" * 80)
             for i, paper in enumerate(papers, 1):
-                print(f"{i}. {paper.arxiv_id}: {paper.title}")
-                if self.show_detailed_info:
-                    print(f"   作者: {', '.join(paper.authors[:3])}")
-                    print(f"   学科: {paper.primary_subject}")
-                    print(f"   PDF: {'有' if paper.has_pdf else '无'}, HTML: {'有' if paper.has_html else '无'}")
-                print()
+                self._print_paper_text(i, paper)
+    
+    def print_papers_stream(self, papers: Iterable[Paper], title: str = "论文列表",
+                            max_rows: int = Config.STREAM_TABLE_MAX_ROWS) -> int:
+        """
+        边迭代边显示论文，适用于 get_papers_generator 等生成器
+        
+        Rich模式下显示实时刷新的表格：只保留最近 max_rows 行的滚动窗口，表格下方显示累计篇数
+        和吞吐量。表格由后台线程按 Config.STREAM_TABLE_REFRESH_PER_SECOND 重绘，渲染开销
+        与论文数无关，等待网络时吞吐量也会持续更新。纯文本和静默模式下每到一篇打印一篇。
+        
+        Args:
+            papers: 论文可迭代对象，按到达顺序消费
+            title: 表格标题
+            max_rows: 屏幕上最多保留的行数
+            
+        Returns:
+            显示的论文总数
+        """
+        count = 0
+        
+        if self.quiet_mode or not self.enable_rich:
+            if not self.quiet_mode:
+                print(f"\n{title}")
+                print("-" * 80)
+            for count, paper in enumerate(papers, 1):
+                if self.quiet_mode:
+                    print(f"{paper.arxiv_id}: {paper.title}", flush=True)
+                else:
+                    self._print_paper_text(count, paper)
+                    sys.stdout.flush()
+            return count
+        
+        # 只保存格式化后的行，已滚出窗口的论文不再被引用
+        rows = deque(maxlen=max(1, max_rows))
+        lock = threading.Lock()
+        start = time.perf_counter()
+        
+        def render() -> "Table":
+            with lock:
+                shown = list(rows)
+                total = count
+            elapsed = time.perf_counter() - start
+            rate = total / elapsed if elapsed > 0 else 0.0
+            caption = f"共 {total} 篇 · {rate:.1f} 篇/秒"
+            if total > len(shown):
+                caption += f" · 显示最近 {len(shown)} 篇"
+            table = self._papers_table(title, caption)
+            for row in shown:
+                table.add_row(*row)
+            return table
+        
+        with Live(get_renderable=render, console=self.console,
+                  refresh_per_second=Config.STREAM_TABLE_REFRESH_PER_SECOND):
+            for paper in papers:
+                row = self._paper_row(paper)
+                with lock:
+                    rows.append(row)
+                    count += 1
+        return count
+    
+    def _papers_table(self, title: str, caption: Optional[str] = None) -> "Table":
+        """创建论文表格并添加列"""
+        table = Table(title=title, caption=caption, show_header=True, header_style="bold magenta")
+        table.add_column("ArXiv ID", style="cyan", no_wrap=True)
+        table.add_column("标题", style="green", max_width=Config.TRUNCATE_TITLE_LENGTH)
+        table.add_column("作者", style="yellow", max_width=30)
+        table.add_column("学科", style="blue", max_width=20)
+        
+        if self.show_detailed_info:
+            table.add_column("PDF", style="magenta", justify="center")
+            table.add_column("HTML", style="red", justify="center")
+            table.add_column("评论", style="dim", max_width=30)
+        return table
+    
+    def _paper_row(self, paper: Paper) -> List[str]:
+        """把论文格式化为表格的一行"""
+        # 处理标题
+        title_text = paper.title
+        if len(title_text) > Config.TRUNCATE_TITLE_LENGTH:
+            title_text = title_text[:Config.TRUNCATE_TITLE_LENGTH-3] + "..."
+        
+        # 处理作者
+        authors_text = ", ".join(paper.authors[:3])
+        if len(paper.authors) > 3:
+            authors_text += f" (+{len(paper.authors)-3})"
+        
+        # 处理学科
+        subjects_text = paper.primary_subject
+        if len(paper.subjects) > 1:
+            subjects_text += f" (+{len(paper.subjects)-1})"
+        
+        row_data = [
+            paper.arxiv_id,
+            title_text,
+            authors_text,
+            subjects_text
+        ]
+        
+        if self.show_detailed_info:
+            row_data.extend([
+                "✓" if paper.has_pdf else "✗",
+                "✓" if paper.has_html else "✗",
+                paper.comments[:27] + "..." if len(paper.comments) > 30 else paper.comments
+            ])
+        return row_data
+    
+    def _print_paper_text(self, index: int, paper: Paper):
+        """以纯文本打印一篇论文"""
+        print(f"{index}. {paper.arxiv_id}: {paper.title}")
+        if self.show_detailed_info:
+            print(f"   作者: {', '.join(paper.authors[:3])}")
+            print(f"   学科: {paper.primary_subject}")
+            print(f"   PDF: {'有' if paper.has_pdf else '无'}, HTML: {'有' if paper.has_html else '无'}")
+        print()
     
     def print_paper_detail(self, paper: Paper):
         """打印单个论文的详细信息"""
@@ -256,7 +332,7 @@ class OutputFormatter:
             info_text = f"[bold]ArXiv ID:[/bold] {paper.arxiv_id}\n"
             info_text += f"[bold]标题:[/bold] {paper.title}\n"
             info_text += f"[bold]作者:[/bold] {', '.join(paper.authors)}\n"
-            info_text += f"[bold]学科:[/bold] {', '.join(paper.subjects)}\n"
+            info_text += f"[bold]学科:[/bold] {', '.join(paper.subject_names)}\n"
             
             if paper.comments:
                 info_text += f"[bold]评论:[/bold] {paper.comments}\n"
@@ -295,7 +371,7 @@ class OutputFormatter:
             print(f"ArXiv ID: {paper.arxiv_id}")
             print(f"标题: {paper.title}")
             print(f"作者: {', '.join(paper.authors)}")
-            print(f"学科: {', '.join(paper.subjects)}")
+            print(f"学科: {', '.join(paper.subject_names)}")
             if paper.comments:
                 print(f"评论: {paper.comments}")
             print(f"摘要链接: {paper.abs_link}")
@@ -422,6 +498,23 @@ class OutputFormatter:
             return progress
         return None
     
+    def create_harvest_progress(self, tracker: HarvestProgress) -> Optional["HarvestProgressDisplay"]:
+        """
+        创建显示抓取进度的多行进度条
+        
+        Args:
+            tracker: 传给 ArxivScraper(progress=...) 的进度记录
+            
+        Returns:
+            HarvestProgressDisplay对象，静默模式、关闭进度或未启用Rich时返回None
+        """
+        if self.quiet_mode:
+            return None  # 静默模式下不显示进度条
+        
+        if self.enable_rich and self.show_progress:
+            return HarvestProgressDisplay(tracker, self.console)
+        return None
+    
     def print_config_info(self, config_dict: Dict[str, Any]):
         """打印配置信息"""
         if self.quiet_mode:
@@ -450,6 +543,119 @@ class OutputFormatter:
             print(*args, **kwargs)
 
 
+class HarvestProgressDisplay:
+    """
+    抓取进度的多行进度条
+    
+    后台线程每秒读取 refresh_per_second 次 HarvestProgress 快照并重绘，抓取线程只累加计数，
+    不触发渲染：
+    
+        页面 cs_new  ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━   12/40  2.1 页/秒 · 1.35 MB/秒  剩余 0:00:13
+        论文         ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━ 590/2000  48.3 篇/秒             剩余 0:00:29
+        富化队列     ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━       25
+    
+    富化队列的进度条以出现过的最大深度为满格。
+    """
+    
+    def __init__(self,
+                 tracker: HarvestProgress,
+                 console: Optional["Console"] = None,
+                 refresh_per_second: float = Config.PROGRESS_REFRESH_PER_SECOND):
+        """
+        Args:
+            tracker: 进度记录
+            console: Rich控制台
+            refresh_per_second: 每秒刷新次数
+        """
+        self.tracker = tracker
+        self.interval = 1.0 / refresh_per_second
+        self.progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.fields[count]}", justify="right"),
+            TextColumn("[cyan]{task.fields[rate]}"),
+            TextColumn("[dim]{task.fields[eta]}"),
+            console=console,
+            auto_refresh=False,
+        )
+        self._pages = self.progress.add_task("页面", total=None, count="", rate="", eta="")
+        self._papers = self.progress.add_task("论文", total=None, count="", rate="", eta="")
+        self._queue = self.progress.add_task("富化队列", total=None, count="", rate="", eta="")
+        self._page_rate = RateMeter()
+        self._paper_rate = RateMeter()
+        self._byte_rate = RateMeter()
+        self._max_queue = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """开始显示并启动刷新线程"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self.progress.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止刷新线程，以最终进度重绘一次后结束显示"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.refresh()
+        self.progress.stop()
+    
+    def refresh(self):
+        """读取一次快照，更新各行并重绘"""
+        snapshot = self.tracker.snapshot()
+        now = snapshot.elapsed
+        page_rate = self._page_rate.update(snapshot.pages_done, now)
+        paper_rate = self._paper_rate.update(snapshot.papers_done, now)
+        byte_rate = self._byte_rate.update(snapshot.bytes_received, now)
+        
+        self.progress.update(
+            self._pages,
+            description=f"页面 {snapshot.category}",
+            total=snapshot.pages_total or None,
+            completed=snapshot.pages_done,
+            count=f"{snapshot.pages_done}/{snapshot.pages_total}",
+            rate=f"{page_rate:.1f} 页/秒 · {byte_rate / 1e6:.2f} MB/秒",
+            eta=f"剩余 {format_eta(snapshot.pages_total - snapshot.pages_done, page_rate)}",
+        )
+        self.progress.update(
+            self._papers,
+            total=snapshot.papers_total or None,
+            completed=snapshot.papers_done,
+            count=f"{snapshot.papers_done}/{snapshot.papers_total}",
+            rate=f"{paper_rate:.1f} 篇/秒",
+            eta=f"剩余 {format_eta(snapshot.papers_total - snapshot.papers_done, paper_rate)}",
+        )
+        self._max_queue = max(self._max_queue, snapshot.enrich_queue)
+        self.progress.update(
+            self._queue,
+            total=self._max_queue or None,
+            completed=snapshot.enrich_queue,
+            count=str(snapshot.enrich_queue),
+        )
+        self.progress.refresh()
+    
+    def _run(self):
+        """刷新线程"""
+        while not self._stopped.wait(self.interval):
+            self.refresh()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.stop()
+
+
 # 全局格式化器实例
 _default_formatter = None
 
@@ -0,0 +1,169 @@
+"""
+抓取进度
+
+ArxivScraper 在抓取过程中把进度事件记录到 HarvestProgress：列表页总数和已处理页数、
+解析出的论文数、富化队列深度以及接收的数据量。记录只是加锁累加计数，与网络请求相比
+开销可以忽略；显示端按固定频率读取快照并由 RateMeter 计算速率，渲染频率与抓取速度无关。
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config.settings import Config
+
+
+@dataclass
+class ProgressSnapshot:
+    """某一时刻的抓取进度"""
+    
+    category: str = ""          # 当前类别
+    pages_total: int = 0        # 已知的列表页总数（所有已开始的类别）
+    pages_done: int = 0         # 已处理的列表页数，含失败的页
+    papers_total: int = 0       # 已知的论文总数
+    papers_parsed: int = 0      # 列表页解析出的论文数
+    papers_done: int = 0        # 已产出的论文数
+    enrich_queue: int = 0       # 等待或正在富化的论文数
+    bytes_received: int = 0     # 接收的页面文本长度
+    elapsed: float = 0.0        # 开始记录以来的秒数
+
+
+class HarvestProgress:
+    """
+    线程安全的抓取进度记录
+    
+    把实例传给 ArxivScraper(progress=...) 后由爬虫调用各事件方法；
+    显示端只调用 snapshot()。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._state = ProgressSnapshot()
+    
+    def start_category(self, category: str, papers_total: int, pages_total: int,
+                       papers_done: int = 0, pages_done: int = 0):
+        """
+        开始一个类别，总数累加到已有的总数上
+        
+        Args:
+            category: 类别名称
+            papers_total: 本类别要抓取的论文数
+            pages_total: 本类别的列表页数
+            papers_done: 续抓时已完成的论文数
+            pages_done: 续抓时已完成的页数
+        """
+        with self._lock:
+            state = self._state
+            state.category = category
+            state.papers_total += papers_total
+            state.pages_total += pages_total
+            state.papers_done += papers_done
+            state.pages_done += pages_done
+    
+    def page_done(self, papers: int = 0):
+        """处理完一个列表页，papers为解析出的论文数；获取或解析失败时为0"""
+        with self._lock:
+            self._state.pages_done += 1
+            self._state.papers_parsed += papers
+    
+    def received(self, size: int):
+        """接收了一个页面，size为页面文本长度"""
+        with self._lock:
+            self._state.bytes_received += size
+    
+    def enrich_queued(self, count: int = 1):
+        """论文进入富化队列"""
+        with self._lock:
+            self._state.enrich_queue += count
+    
+    def enrich_finished(self, count: int = 1):
+        """论文离开富化队列（产出、失败或取消）"""
+        with self._lock:
+            self._state.enrich_queue -= count
+    
+    def paper_done(self):
+        """产出一篇论文"""
+        with self._lock:
+            self._state.papers_done += 1
+    
+    def snapshot(self) -> ProgressSnapshot:
+        """返回当前进度的副本"""
+        with self._lock:
+            state = self._state
+            return ProgressSnapshot(
+                category=state.category,
+                pages_total=state.pages_total,
+                pages_done=state.pages_done,
+                papers_total=state.papers_total,
+                papers_parsed=state.papers_parsed,
+                papers_done=state.papers_done,
+                enrich_queue=max(0, state.enrich_queue),
+                bytes_received=state.bytes_received,
+                elapsed=time.monotonic() - self._start,
+            )
+
+
+class RateMeter:
+    """
+    由累计计数的采样计算速率
+    
+    使用时间常数为 window 秒的指数滑动平均：突发不会让速率剧烈跳动，
+    停顿时速率在几个时间常数内衰减到零。
+    """
+    
+    def __init__(self, window: float = Config.PROGRESS_RATE_WINDOW):
+        """
+        Args:
+            window: 平滑时间常数（秒）
+        """
+        self.window = window
+        self.rate: Optional[float] = None
+        self._last_value = 0.0
+        self._last_time: Optional[float] = None
+    
+    def update(self, value: float, now: float) -> float:
+        """
+        加入一次采样
+        
+        Args:
+            value: 累计计数
+            now: 采样时间（秒，单调递增）
+            
+        Returns:
+            平滑后的每秒速率
+        """
+        if self._last_time is None:
+            # 第一次采样以开始以来的平均速率为初值
+            self.rate = value / now if now > 0 else 0.0
+        else:
+            interval = now - self._last_time
+            if interval <= 0:
+                return self.rate
+            instant = (value - self._last_value) / interval
+            weight = 1.0 - math.exp(-interval / self.window)
+            self.rate += weight * (instant - self.rate)
+        self._last_value = value
+        self._last_time = now
+        return self.rate
+
+
+def format_eta(remaining: float, rate: Optional[float]) -> str:
+    """
+    按速率估算剩余时间
+    
+    Args:
+        remaining: 剩余数量
+        rate: 每秒速率
+        
+    Returns:
+        H:MM:SS 形式的剩余时间，无法估算时为 "-:--:--"
+    """
+    if remaining <= 0:
+        return "0:00:00"
+    if not rate or rate <= 0:
+        return "-:--:--"
+    seconds = int(remaining / rate)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,129 @@
+"""
+流式输出写入器
+
+逐篇写出论文数据，无需先收集完整列表即可输出到标准输出或文件。
+"""
+
+import csv
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Type
+
+from models.paper import Paper
+from utils.codec import dumps_text
+
+
+class PaperWriter(ABC):
+    """论文流式写入器基类，子类实现 _write"""
+    
+    def __init__(self, stream: IO[str]):
+        """
+        初始化写入器
+        
+        Args:
+            stream: 文本输出流
+        """
+        self.stream = stream
+        self.count = 0
+    
+    def write(self, paper: Paper):
+        """写出单篇论文"""
+        self._write(paper)
+        self.count += 1
+    
+    @abstractmethod
+    def _write(self, paper: Paper):
+        """写出单篇论文的具体格式"""
+    
+    def close(self):
+        """结束输出，写出尾部并刷新缓冲"""
+        self.stream.flush()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+
+class JsonLinesWriter(PaperWriter):
+    """JSON Lines写入器，每行一篇论文"""
+    
+    def _write(self, paper: Paper):
+        self.stream.write(dumps_text(paper.to_dict()))
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class JsonArrayWriter(PaperWriter):
+    """JSON数组写入器，逐个写出数组元素"""
+    
+    def __init__(self, stream: IO[str]):
+        super().__init__(stream)
+        self.stream.write("[")
+    
+    def _write(self, paper: Paper):
+        if self.count:
+            self.stream.write(",")
+        self.stream.write("\n  ")
+        self.stream.write(dumps_text(paper.to_dict()))
+    
+    def close(self):
+        self.stream.write("\n]\n" if self.count else "]\n")
+        super().close()
+
+
+class CsvWriter(PaperWriter):
+    """CSV写入器，列表字段以分号连接；追加到已有内容的文件时不重复写表头"""
+    
+    FIELDS = [
+        "arxiv_id", "title", "authors", "abstract", "subjects", "comments",
+        "abs_link", "pdf_link", "html_link", "submission_date"
+    ]
+    
+    def __init__(self, stream: IO[str]):
+        super().__init__(stream)
+        self.writer = csv.DictWriter(stream, fieldnames=self.FIELDS, extrasaction="ignore")
+        if not (stream.seekable() and stream.tell() > 0):
+            self.writer.writeheader()
+    
+    def _write(self, paper: Paper):
+        row = paper.to_dict()
+        row["authors"] = "; ".join(paper.authors)
+        row["subjects"] = "; ".join(paper.subjects)
+        self.writer.writerow(row)
+        self.stream.flush()
+
+
+class TextWriter(PaperWriter):
+    """纯文本写入器，每行输出ID和标题"""
+    
+    def _write(self, paper: Paper):
+        self.stream.write(f"{paper.arxiv_id}: {paper.title}\n")
+        self.stream.flush()
+
+
+WRITERS: Dict[str, Type[PaperWriter]] = {
+    "jsonl": JsonLinesWriter,
+    "json": JsonArrayWriter,
+    "csv": CsvWriter,
+    "text": TextWriter,
+}
+
+
+def get_writer(output_format: str, stream: IO[str]) -> PaperWriter:
+    """
+    根据格式名创建写入器
+    
+    Args:
+        output_format: 输出格式 (jsonl, json, csv, text)
+        stream: 文本输出流
+        
+    Returns:
+        PaperWriter实例
+    """
+    writer_class = WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"不支持的输出格式: {output_format}")
+    return writer_class(stream)
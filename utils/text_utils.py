@@ -6,7 +6,45 @@
 
 import re
 import math
-from typing import Optional, List, Generator
+from typing import Optional, List, Generator, Tuple
+
+
+# ArXiv ID：新式 YYMM.NNNN(N)，旧式 archive(.XX)/YYMMNNN，如 hep-th/9901001、math.AG/0309136
+ARXIV_ID_REGEX = (
+    r'\d{2}(?:0[1-9]|1[0-2])\.\d{4,5}'
+    r'|[a-z]+(?:-[a-z]+)*(?:\.[A-Z]{2})?/\d{2}(?:0[1-9]|1[0-2])\d{3}'
+)
+ARXIV_ID_PATTERN = re.compile(
+    r'(?:arXiv:)?(?P<base>' + ARXIV_ID_REGEX + r')(?:v(?P<version>\d+))?',
+    re.ASCII
+)
+
+# 链接路径中ID之前的部分
+ARXIV_LINK_MARKERS = ("/abs/", "/pdf/", "/html/")
+
+# 列表页的总数文本，按优先级排序：
+# "Total of 123 entries"、"showing first 50 of 768 entries"、"of 123 entries"、"123 entries"
+# 每个模式以字面量开头，正则引擎可以快速跳过不匹配的位置；合并成一个带可选前缀的
+# 模式反而要在每个数字处回溯，大页面上慢一个数量级
+TOTAL_COUNT_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'Total of (\d+) entries',
+        r'showing first \d+ of (\d+) entries',
+        r'of (\d+) entries',
+        r'(\d+) entries',
+    )
+)
+
+# 参考文献中的标识符模式
+REFERENCE_ARXIV_PATTERN = re.compile(
+    r'(?:arXiv:\s*|arxiv\.org/(?:abs|pdf)/)'
+    r'(\d{4}\.\d{4,5}|[a-z]+(?:-[a-z]+)*(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?',
+    re.IGNORECASE
+)
+REFERENCE_DOI_PATTERN = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)')
+REFERENCE_YEAR_PATTERN = re.compile(r'(?<![\d./])((?:19|20)\d{2})[a-z]?(?![\d/]|\.\d)')
+AUTHOR_SEPARATOR_PATTERN = re.compile(r'\s*(?:,\s*and\s+|\s+and\s+|\s*&\s*|;|,)\s*')
+AUTHOR_INITIALS_PATTERN = re.compile(r'^(?:[A-Z][a-z]?\.\s*-?)+$')
 
 
 def extract_total_count(text: str) -> Optional[int]:
@@ -29,22 +67,14 @@ def extract_total_count(text: str) -> Optional[int]:
         123
         >>> extract_total_count("showing first 50 of 768 entries")
         768
-        >>> extract_total_count("No entries found")
-        None
+        >>> extract_total_count("No entries found") is None
+        True
     """
     if not text:
         return None
     
-    # 正则表达式模式列表，按优先级排序
-    patterns = [
-        r'Total of (\d+) entries',  # "Total of 123 entries"
-        r'showing first \d+ of (\d+) entries',  # "showing first 50 of 768 entries"
-        r'of (\d+) entries',  # "of 123 entries"
-        r'(\d+) entries',  # "123 entries"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in TOTAL_COUNT_PATTERNS:
+        match = pattern.search(text)
         if match:
             return int(match.group(1))
     
@@ -118,24 +148,103 @@ def generate_page_params(total_count: int,
         yield f"?skip={skip}&show={papers_per_page}"
 
 
-def extract_arxiv_id(abs_link: str) -> str:
+def extract_arxiv_id(abs_link: str, strip_version: bool = False) -> str:
     """
     从摘要链接中提取ArXiv ID
     
     Args:
         abs_link: 摘要链接
+        strip_version: 是否去掉版本后缀
         
     Returns:
         ArXiv ID
         
     Examples:
         >>> extract_arxiv_id("https://arxiv.org/abs/2301.12345")
-        "2301.12345"
+        '2301.12345'
+        >>> extract_arxiv_id("https://arxiv.org/abs/2301.12345v2", strip_version=True)
+        '2301.12345'
     """
     if not abs_link:
         return ""
     
-    return abs_link.split("/")[-1]
+    path = abs_link.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    # 旧式ID本身包含斜杠，如 /abs/hep-th/9901001，因此取标记之后的整段路径
+    _, marker, arxiv_id = path.partition("/abs/")
+    if not marker:
+        for marker in ARXIV_LINK_MARKERS[1:]:
+            if marker in path:
+                arxiv_id = path.split(marker, 1)[1]
+                break
+        else:
+            arxiv_id = path.rsplit("/", 1)[-1]
+        if arxiv_id.endswith(".pdf"):
+            arxiv_id = arxiv_id[:-4]
+    
+    if strip_version:
+        return strip_arxiv_version(arxiv_id)
+    return arxiv_id
+
+
+def split_arxiv_version(arxiv_id: str) -> Tuple[str, Optional[int]]:
+    """
+    拆分ArXiv ID和版本号
+    
+    Examples:
+        >>> split_arxiv_version("2301.12345v2")
+        ('2301.12345', 2)
+        >>> split_arxiv_version("hep-th/9901001")
+        ('hep-th/9901001', None)
+    """
+    index = arxiv_id.rfind("v")
+    if index > 0:
+        version = arxiv_id[index + 1:]
+        if version.isascii() and version.isdigit():
+            return arxiv_id[:index], int(version)
+    return arxiv_id, None
+
+
+def strip_arxiv_version(arxiv_id: str) -> str:
+    """
+    去掉ArXiv ID的版本后缀
+    
+    Examples:
+        >>> strip_arxiv_version("2301.12345v2")
+        '2301.12345'
+    """
+    index = arxiv_id.rfind("v")
+    if index > 0 and arxiv_id[index + 1:].isdigit() and arxiv_id.isascii():
+        return arxiv_id[:index]
+    return arxiv_id
+
+
+def parse_arxiv_id(text: str) -> Optional[Tuple[str, Optional[int]]]:
+    """
+    严格解析ArXiv ID
+    
+    只接受完整的新式或旧式ID（可带 arXiv: 前缀和版本号），年月必须合法。
+    
+    Args:
+        text: 待解析的文本
+        
+    Returns:
+        (不含版本号的ID, 版本号)，不是合法ID时返回None
+        
+    Examples:
+        >>> parse_arxiv_id("arXiv:2301.12345v2")
+        ('2301.12345', 2)
+        >>> parse_arxiv_id("hep-th/9901001")
+        ('hep-th/9901001', None)
+        >>> parse_arxiv_id("2313.12345") is None
+        True
+    """
+    if not text:
+        return None
+    match = ARXIV_ID_PATTERN.fullmatch(text.strip())
+    if not match:
+        return None
+    version = match.group("version")
+    return match.group("base"), int(version) if version else None
 
 
 def normalize_url(url: str, base_url: str = "https://arxiv.org") -> str:
@@ -155,6 +264,10 @@ def normalize_url(url: str, base_url: str = "https://arxiv.org") -> str:
     if url.startswith("http"):
         return url
     
+    if url.startswith("//"):
+        # 省略协议的链接
+        return "https:" + url
+    
     if url.startswith("/"):
         return base_url + url
     
@@ -177,7 +290,82 @@ def clean_html_content(content: str) -> str:
     # 移除特定的无用文本
     content = content.replace("Report issue for preceding element", "")
     
-    # 清理多余的空白字符
-    content = re.sub(r'\s+', ' ', content)
+    # 合并空白字符，str.split 的空白定义与 \s 相同且比正则替换快
+    return " ".join(content.split())
+
+
+def find_arxiv_id(text: str) -> Optional[str]:
+    """
+    从参考文献文本或链接中查找被引用论文的ArXiv ID（不含版本号）
+    
+    只识别带 arXiv: 前缀或 arxiv.org 链接的ID，避免把普通数字误判为ID。
+    
+    Examples:
+        >>> find_arxiv_id("Preprint, arXiv:2301.12345v2, 2023.")
+        '2301.12345'
+        >>> find_arxiv_id("https://arxiv.org/abs/hep-th/9901001")
+        'hep-th/9901001'
+    """
+    if not text:
+        return None
+    match = REFERENCE_ARXIV_PATTERN.search(text)
+    return match.group(1) if match else None
+
+
+def find_doi(text: str) -> Optional[str]:
+    """
+    从参考文献文本或链接中查找DOI
+    
+    Examples:
+        >>> find_doi("Nature 521, 436 (2015). doi:10.1038/nature14539.")
+        '10.1038/nature14539'
+    """
+    if not text:
+        return None
+    match = REFERENCE_DOI_PATTERN.search(text)
+    return match.group(1).rstrip(".,;)]") if match else None
+
+
+def find_year(text: str) -> Optional[int]:
+    """
+    从参考文献文本中查找出版年份
+    
+    Examples:
+        >>> find_year("J. Smith. A title. In Proc. ICML, 2020.")
+        2020
+    """
+    if not text:
+        return None
+    match = REFERENCE_YEAR_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def split_authors(authors_text: str) -> List[str]:
+    """
+    分割参考文献中的作者字符串
+    
+    "Smith, J." 这类姓在前的写法中，单独的缩写会并回前一个作者。
+    
+    Examples:
+        >>> split_authors("A. Smith, B. Jones, and C. Lee")
+        ['A. Smith', 'B. Jones', 'C. Lee']
+        >>> split_authors("Smith, J. and Jones, K. L.")
+        ['Smith, J.', 'Jones, K. L.']
+    """
+    if not authors_text:
+        return []
+    
+    authors = []
+    for part in AUTHOR_SEPARATOR_PATTERN.split(authors_text.strip()):
+        part = part.strip()
+        if not part or part.lower() in ("et al", "et al.", "others"):
+            continue
+        if authors and AUTHOR_INITIALS_PATTERN.match(part) and ", " not in authors[-1]:
+            authors[-1] = f"{authors[-1]}, {part}"
+        else:
+            authors.append(part)
     
-    return content.strip() 
\ No newline at end of file
+    # 末尾作者后的句点属于句子而不是缩写
+    if authors and not AUTHOR_INITIALS_PATTERN.match(authors[-1].split(", ")[-1]):
+        authors[-1] = authors[-1].rstrip(".")
+    return authors